@@ -64,6 +64,20 @@ if __name__ == "__main__":
                                 to look for 'OPENWEATHERMAP_API_KEY' \
                                     in OS environment")
 
+    parser.add_argument(
+        "--precise",
+        action="store_true",
+        help="Calculate without rounding intermediate values,\
+            results are only rounded for the output")
+
+    parser.add_argument(
+        "--engine",
+        type=str,
+        choices=["simple", "spa"],
+        default="simple",
+        help="Solar position engine, 'spa' uses the \
+            NREL solar position algorithm")
+
     args = parser.parse_args()
     build(city=args.city,
           time=args.time,
@@ -72,4 +86,6 @@ if __name__ == "__main__":
           timezone=args.timezone,
           api_key_path=args.key_path,
           api_key=args.api_key,
-          text=args.print)
+          text=args.print,
+          precise=args.precise,
+          engine=args.engine)
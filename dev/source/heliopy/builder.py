@@ -15,7 +15,9 @@ def main(city: str,
          country: str = None,
          timezone: str = None,
          api_key_path: str = None,
-         api_key: str = None
+         api_key: str = None,
+         precise: bool = False,
+         engine: str = 'simple'
          ):
     """ Main function:
     Creates an object 'helios' that generates, stores and 
@@ -28,6 +30,8 @@ def main(city: str,
         day=[date as YYYY-MM-DD]
         time=[time as HH:MM:SS]
         timezone=[timezone as 'REGION/CITY']
+        precise=[True to calculate without intermediate rounding]
+        engine=['simple' or 'spa' for the NREL solar position algorithm]
     If no arguments for day, time and timezone are provided
     the system time, date and timezoe will be used.
 
@@ -74,7 +78,9 @@ def main(city: str,
                                requested_hour=time,
                                requested_timezone=timezone,
                                api_key_path=api_key_path,
-                               api_key=api_key)
+                               api_key=api_key,
+                               precise=precise,
+                               engine=engine)
     if text:
         print(helios)
     else:
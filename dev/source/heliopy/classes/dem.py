@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Site elevation from local digital elevation model (DEM) tiles.
+
+Tiles are SRTM-style .hgt files: one per 1 x 1 degree cell, named
+after the south-west corner (N47E011.hgt covers 47-48 N, 11-12 E),
+with 1201 x 1201 (3 arc-second) or 3601 x 3601 (1 arc-second)
+big-endian int16 heights in metres, north row first, -32768 for
+voids. Tiles are opened as np.memmap and kept in a small LRU cache,
+so a lookup only reads the pages around the sampled points, never
+whole tiles.
+
+The shared tile set is the directory `HELIOPY_DEM`.
+
+Classes:
+- DemTiles: Memory-mapped DEM tiles with bilinear sampling.
+
+Functions:
+- tile_name: .hgt file name of the tile of a point.
+- default_tiles: The shared tiles of HELIOPY_DEM.
+- elevation_at: Elevation of points from the shared tiles.
+"""
+import collections
+import functools
+import logging
+import os
+import threading
+import numpy as np
+
+
+DEM_ENV = 'HELIOPY_DEM'
+VOID = -32768
+TILE_SIZES = (1201, 3601)
+
+
+def tile_name(latitude: float, longitude: float) -> str:
+    """
+    Return the .hgt file name of the tile containing a point.
+    """
+    _lat, _lon = int(np.floor(latitude)), int(np.floor(longitude))
+    return (f"{'N' if _lat >= 0 else 'S'}{abs(_lat):02d}"
+            f"{'E' if _lon >= 0 else 'W'}{abs(_lon):03d}.hgt")
+
+
+class DemTiles:
+    """
+    Class DemTiles:
+    Thread-safe LRU cache of memory-mapped DEM tiles of a directory,
+    see module docstring.
+
+    Args:
+        directory (str): The directory of the .hgt tiles.
+        maxsize (int): Maximum number of tiles kept open.
+    """
+
+    def __init__(self, directory: str, maxsize: int = 16):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.directory = directory
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._tiles = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _open(self, name: str):
+        _path = os.path.join(self.directory, name)
+        if not os.path.isfile(_path):
+            logging.warning(f"no DEM tile {_path}")
+            return None
+        _samples = int(round(np.sqrt(os.path.getsize(_path) / 2)))
+        if _samples not in TILE_SIZES:
+            raise ValueError(f"Not an SRTM tile: {_path}")
+        return np.memmap(_path, dtype='>i2', mode='r',
+                         shape=(_samples, _samples))
+
+    def tile(self, latitude: float, longitude: float) -> np.memmap:
+        """
+        Returns the memory-mapped heights of the tile containing a
+        point, or None if there is no such tile.
+        """
+        _name = tile_name(latitude, longitude)
+        with self._lock:
+            if _name in self._tiles:
+                self._tiles.move_to_end(_name)
+                self.hits += 1
+                return self._tiles[_name]
+            self.misses += 1
+        _tile = self._open(_name)
+        with self._lock:
+            self._tiles[_name] = _tile
+            self._tiles.move_to_end(_name)
+            while len(self._tiles) > self.maxsize:
+                self._tiles.popitem(last=False)
+        return _tile
+
+    def elevation(self, latitude, longitude) -> np.ndarray:
+        """
+        Bilinear elevation in metres for arrays of coordinates.
+        Voids are left out of the interpolation; points without a
+        tile or with four void neighbours are NaN.
+        """
+        _latitude, _longitude = np.broadcast_arrays(
+            np.asarray(latitude, dtype=float),
+            np.asarray(longitude, dtype=float))
+        _result = np.full(_latitude.shape, np.nan)
+        _flat_lat, _flat_lon = _latitude.ravel(), _longitude.ravel()
+        _flat_result = _result.reshape(-1)
+        _south, _west = np.floor(_flat_lat), np.floor(_flat_lon)
+        _cells = np.stack([_south, _west], axis=-1)
+        _unique, _inverse = np.unique(_cells, axis=0, return_inverse=True)
+        for _index, (_lat0, _lon0) in enumerate(_unique):
+            _tile = self.tile(_lat0, _lon0)
+            if _tile is None:
+                continue
+            _points = np.flatnonzero(_inverse.ravel() == _index)
+            _last = _tile.shape[0] - 1
+            _row = (_lat0 + 1 - _flat_lat[_points]) * _last
+            _column = (_flat_lon[_points] - _lon0) * _last
+            _row0 = np.clip(np.floor(_row).astype(np.int64), 0, _last - 1)
+            _column0 = np.clip(np.floor(_column).astype(np.int64), 0,
+                               _last - 1)
+            _dy, _dx = _row - _row0, _column - _column0
+            _total = np.zeros(_points.size)
+            _weights = np.zeros(_points.size)
+            for _r, _c, _weight in (
+                    (_row0, _column0, (1 - _dy) * (1 - _dx)),
+                    (_row0, _column0 + 1, (1 - _dy) * _dx),
+                    (_row0 + 1, _column0, _dy * (1 - _dx)),
+                    (_row0 + 1, _column0 + 1, _dy * _dx)):
+                _heights = np.asarray(_tile[_r, _c], dtype=float)
+                _valid = _heights != VOID
+                _total += np.where(_valid, _weight * _heights, 0.0)
+                _weights += np.where(_valid, _weight, 0.0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                _flat_result[_points] = np.where(
+                    _weights > 0, _total / _weights, np.nan)
+        return _result
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and fill level of the tile cache.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._tiles),
+                'maxsize': self.maxsize,
+            }
+
+
+@functools.lru_cache(maxsize=None)
+def default_tiles() -> DemTiles:
+    """
+    Return the shared tiles of HELIOPY_DEM, or None if it is not set.
+    """
+    _directory = os.environ.get(DEM_ENV)
+    return DemTiles(_directory) if _directory else None
+
+
+def elevation_at(latitude, longitude):
+    """
+    Return the elevation of points from the shared tiles (see
+    `DemTiles.elevation`), or None if HELIOPY_DEM is not set.
+    """
+    _tiles = default_tiles()
+    return _tiles.elevation(latitude, longitude) \
+        if _tiles is not None else None
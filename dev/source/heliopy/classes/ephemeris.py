@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Day-level ephemeris values and a shared cache for them.
+
+The extraterrestrial illuminance, the equation of time and the
+solar declination only depend on the day of the year, so they are
+calculated once per (year, day_of_the_year) and shared by every
+`solardata.Sun`, regardless of hour or location. The formulas are
+the ones of `solarseries`, so Sun and SunSeries agree.
+"""
+import collections
+import logging
+import threading
+from classes import solarseries
+
+
+Ephemeris = collections.namedtuple(
+    'Ephemeris',
+    ['et_illuminance', 'equation_of_time_rad', 'declination_angle_rad'])
+
+
+def day_ephemeris(day_of_the_year: int) -> Ephemeris:
+    """
+    Calculate the day-level ephemeris values for a day of the year.
+
+    Args:
+        day_of_the_year (int): The day of the year (1-366).
+
+    Returns:
+        Ephemeris: extraterrestrial illuminance, equation of time
+        and declination angle.
+    """
+    _doy = day_of_the_year
+    return Ephemeris(float(solarseries.et_illuminance(_doy)),
+                     float(solarseries.equation_of_time(_doy)),
+                     float(solarseries.declination_angle(_doy)))
+
+
+class EphemerisCache:
+    """
+    Class EphemerisCache:
+    Bounded, thread-safe LRU cache of day-level ephemeris values
+    keyed by (year, day_of_the_year).
+
+    Args:
+        maxsize (int): Maximum number of days kept in the cache.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, year: int, day_of_the_year: int) -> Ephemeris:
+        """
+        Returns the ephemeris values of the given day,
+        calculating and storing them on a miss.
+        """
+        _key = (year, day_of_the_year)
+        with self._lock:
+            if _key in self._entries:
+                self._entries.move_to_end(_key)
+                self.hits += 1
+                return self._entries[_key]
+            self.misses += 1
+        _ephemeris = day_ephemeris(day_of_the_year)
+        logging.info(f"calculated ephemeris for {_key}: {_ephemeris}")
+        with self._lock:
+            self._entries[_key] = _ephemeris
+            self._entries.move_to_end(_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return _ephemeris
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and fill level of the cache.
+        """
+        with self._lock:
+            _lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hit_ratio': self.hits / _lookups if _lookups else 0.0,
+            }
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+default_cache = EphemerisCache()
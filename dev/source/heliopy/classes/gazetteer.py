@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Offline geocoding from a GeoNames gazetteer.
+
+A GeoNames cities file (cities500.txt, cities15000.zip, ..., tab
+separated, see https://download.geonames.org/export/dump/) is compiled
+once into a directory of .npy files: a sorted array of normalized
+names with the row of their city, and a table of the cities. The
+arrays are memory-mapped on first use, so opening a gazetteer costs
+nothing and a lookup is a binary search with no network.
+
+Names are matched exactly, then by prefix, then fuzzy (difflib) among
+names starting with the same two letters; ties are broken by
+population, so "Paris" is the French capital and "Paris, US" the
+largest Paris in the United States. Countries are ISO 3166 codes, or
+names if a GeoNames countryInfo.txt was compiled with the cities
+(it is picked up automatically from the directory of the cities file).
+
+A `Gazetteer` can replace Nominatim in `geodata.Geo`; the shared one
+is built from `HELIOPY_GAZETTEER` (a cities file or a compiled index
+directory).
+
+Classes:
+- Gazetteer: Memory-mapped city index with geopy-like geocode().
+
+Functions:
+- normalize: Match key of a place name.
+- read_geonames: Read the cities of a GeoNames file.
+- read_country_info: Read the country names of a GeoNames countryInfo.txt.
+- compile_index: Compile a GeoNames file into an index directory.
+- default_gazetteer: The shared gazetteer from HELIOPY_GAZETTEER.
+"""
+import collections
+import contextlib
+import difflib
+import functools
+import io
+import json
+import logging
+import os
+import sys
+import time
+import unicodedata
+import zipfile
+import numpy as np
+
+
+GAZETTEER_ENV = 'HELIOPY_GAZETTEER'
+INDEX_VERSION = 2
+KEY_LENGTH_MAX = 64
+FUZZY_CUTOFF = 0.8
+# normalized country values that mean no country, e.g. str(None)
+NO_COUNTRY = ('', 'none')
+
+CITY_DTYPE = np.dtype([
+    ('geonameid', 'i4'),
+    ('latitude', 'f8'),
+    ('longitude', 'f8'),
+    ('population', 'i8'),
+    ('elevation', 'i4'),
+    ('country_code', 'S2'),
+    ('name', 'S100'),
+    ('timezone', 'S40'),
+])
+
+# GeoNames 'geoname' table columns used here
+_COLUMNS = {'geonameid': 0, 'name': 1, 'asciiname': 2, 'alternatenames': 3,
+            'latitude': 4, 'longitude': 5, 'country_code': 8,
+            'population': 14, 'elevation': 15, 'dem': 16, 'timezone': 17}
+
+Place = collections.namedtuple(
+    'Place', ['address', 'latitude', 'longitude', 'raw'])
+
+
+def normalize(text) -> str:
+    """
+    Return the match key of a place name: accents removed, case
+    folded, punctuation and repeated whitespace collapsed to one space.
+    """
+    _text = unicodedata.normalize('NFKD', str(text))
+    _text = ''.join(_c for _c in _text if not unicodedata.combining(_c))
+    _text = ''.join(_c if _c.isalnum() else ' ' for _c in _text.casefold())
+    return ' '.join(_text.split())
+
+
+def _encode(text: str, length: int) -> bytes:
+    """
+    UTF-8 encode text, cut to at most length bytes on a character
+    boundary, so the bytes always decode again.
+    """
+    return text.encode()[:length].decode('utf-8', 'ignore').encode()
+
+
+@contextlib.contextmanager
+def _open_text(path: str):
+    if not zipfile.is_zipfile(path):
+        with open(path, encoding='utf-8') as _file:
+            yield _file
+        return
+    with zipfile.ZipFile(path) as _archive:
+        _member = next(_n for _n in _archive.namelist() if _n.endswith('.txt'))
+        with io.TextIOWrapper(_archive.open(_member),
+                              encoding='utf-8') as _file:
+            yield _file
+
+
+def read_geonames(path: str, alternate_names: bool = False) -> tuple:
+    """
+    Read the cities of a GeoNames file (.txt or .zip).
+
+    Args:
+        path (str): The GeoNames file.
+        alternate_names (bool): Index the alternate names as well,
+            e.g. "Wien" for Vienna. Makes the index several times larger.
+
+    Returns:
+        tuple: The cities as CITY_DTYPE array and a list of
+        (key, city row) pairs.
+    """
+    _cities = []
+    _names = []
+    with _open_text(path) as _file:
+        for _line in _file:
+            _fields = _line.rstrip('\n').split('\t')
+            if len(_fields) <= _COLUMNS['timezone']:
+                continue
+            _row = len(_cities)
+            _elevation = _fields[_COLUMNS['elevation']] or \
+                _fields[_COLUMNS['dem']] or 0
+            _cities.append((
+                int(_fields[_COLUMNS['geonameid']]),
+                float(_fields[_COLUMNS['latitude']]),
+                float(_fields[_COLUMNS['longitude']]),
+                int(_fields[_COLUMNS['population']] or 0),
+                int(_elevation),
+                _fields[_COLUMNS['country_code']].encode(),
+                _encode(_fields[_COLUMNS['name']], 100),
+                _encode(_fields[_COLUMNS['timezone']], 40)))
+            _aliases = [_fields[_COLUMNS['name']], _fields[_COLUMNS['asciiname']]]
+            if alternate_names and _fields[_COLUMNS['alternatenames']]:
+                _aliases += _fields[_COLUMNS['alternatenames']].split(',')
+            for _key in {normalize(_alias) for _alias in _aliases}:
+                if _key:
+                    _names.append((_key, _row))
+    return np.array(_cities, dtype=CITY_DTYPE), _names
+
+
+def read_country_info(path: str) -> dict:
+    """
+    Read a GeoNames countryInfo.txt into a dict of normalized
+    country names and ISO3 codes to ISO 3166 alpha-2 codes.
+    """
+    _codes = {}
+    with _open_text(path) as _file:
+        for _line in _file:
+            if _line.startswith('#'):
+                continue
+            _fields = _line.rstrip('\n').split('\t')
+            if len(_fields) > 4:
+                _codes[normalize(_fields[1])] = _fields[0]
+                _codes[normalize(_fields[4])] = _fields[0]
+    return _codes
+
+
+def compile_index(source: str,
+                  target: str,
+                  alternate_names: bool = False,
+                  country_info: str = None) -> str:
+    """
+    Compile a GeoNames file into an index directory of keys.npy
+    (sorted, fixed width), rows.npy, cities.npy, countries.json
+    and meta.json. country_info defaults to a countryInfo.txt next
+    to the source, if there is one.
+
+    Returns:
+        str: The target directory.
+    """
+    _start = time.perf_counter()
+    _cities, _names = read_geonames(source, alternate_names)
+    _keys = np.array([_encode(_key, KEY_LENGTH_MAX) for _key, _ in _names],
+                     dtype=f'S{KEY_LENGTH_MAX}')
+    _rows = np.array([_row for _, _row in _names], dtype=np.int32)
+    # sort by key, then by descending population within a key
+    _order = np.lexsort((-_cities['population'][_rows], _keys))
+    _width = int(np.char.str_len(_keys).max(initial=1))
+    _keys = _keys[_order].astype(f'S{max(_width, 1)}')
+    os.makedirs(target, exist_ok=True)
+    np.save(os.path.join(target, 'keys.npy'), _keys)
+    np.save(os.path.join(target, 'rows.npy'), _rows[_order])
+    np.save(os.path.join(target, 'cities.npy'), _cities)
+    if country_info is None:
+        country_info = os.path.join(os.path.dirname(source), 'countryInfo.txt')
+    _countries = read_country_info(country_info) \
+        if os.path.isfile(country_info) else {}
+    with open(os.path.join(target, 'countries.json'), 'w',
+              encoding='utf-8') as _file:
+        json.dump(_countries, _file)
+    with open(os.path.join(target, 'meta.json'), 'w', encoding='utf-8') as _file:
+        json.dump({'version': INDEX_VERSION,
+                   'source': os.path.abspath(source),
+                   'source_mtime': os.path.getmtime(source),
+                   'alternate_names': alternate_names,
+                   'cities': len(_cities),
+                   'names': len(_keys)}, _file)
+    logging.info(f"compiled gazetteer {source} into {target}: {len(_cities)} "
+                 f"cities, {len(_keys)} names in "
+                 f"{time.perf_counter() - _start:.1f} s")
+    return target
+
+
+class Gazetteer:
+    """
+    Class Gazetteer:
+    Offline geocoder on a compiled GeoNames index. The index is
+    memory-mapped on the first lookup.
+
+    Args:
+        path (str): A compiled index directory, or a GeoNames file
+            that is compiled (once, and again when it changes) into
+            index_path.
+        index_path (str, optional): Index directory for a GeoNames file.
+            Defaults to the file name without extension next to the
+            geocode cache (see `geocache.default_path`).
+        alternate_names (bool): See `read_geonames`.
+    """
+
+    def __init__(self,
+                 path: str,
+                 index_path: str = None,
+                 alternate_names: bool = False):
+        self.path = path
+        self.alternate_names = alternate_names
+        if os.path.isdir(path):
+            self.index_path = path
+        elif index_path is not None:
+            self.index_path = index_path
+        else:
+            from classes import geocache
+            self.index_path = os.path.join(
+                os.path.dirname(geocache.default_path()), 'gazetteer',
+                os.path.splitext(os.path.basename(path))[0])
+
+    def _compiled(self) -> bool:
+        try:
+            with open(os.path.join(self.index_path, 'meta.json'),
+                      encoding='utf-8') as _file:
+                _meta = json.load(_file)
+        except (OSError, ValueError):
+            return False
+        return _meta.get('version') == INDEX_VERSION and (
+            os.path.isdir(self.path)
+            or (_meta.get('source_mtime') == os.path.getmtime(self.path)
+                and _meta.get('alternate_names') == self.alternate_names))
+
+    @functools.cached_property
+    def index(self) -> tuple:
+        """
+        The memory-mapped keys, rows and cities arrays.
+        """
+        if not self._compiled():
+            if os.path.isdir(self.path):
+                raise ValueError(f"Not a gazetteer index: {self.path}")
+            compile_index(self.path, self.index_path, self.alternate_names)
+        return tuple(np.load(os.path.join(self.index_path, f'{_name}.npy'),
+                             mmap_mode='r')
+                     for _name in ('keys', 'rows', 'cities'))
+
+    @functools.cached_property
+    def countries(self) -> dict:
+        """
+        Normalized country names of the index to ISO 3166 codes.
+        """
+        self.index
+        try:
+            with open(os.path.join(self.index_path, 'countries.json'),
+                      encoding='utf-8') as _file:
+                return json.load(_file)
+        except OSError:
+            return {}
+
+    def _country_code(self, country: str) -> bytes:
+        _key = normalize(country)
+        if _key in NO_COUNTRY:
+            return None
+        if len(_key) == 2:
+            return _key.upper().encode()
+        _code = self.countries.get(_key)
+        if _code is None and self.countries:
+            raise ValueError(f"Unknown country: {country}")
+        if _code is None:
+            logging.warning(f"no country names in {self.index_path}, "
+                            f"ignoring country {country}")
+            return None
+        return _code.encode()
+
+    def _key_range(self, key: bytes, prefix: bool = False) -> tuple:
+        _keys = self.index[0]
+        _first = np.searchsorted(_keys, key, side='left')
+        _last = np.searchsorted(_keys, key + b'\xff' if prefix else key,
+                                side='right')
+        return int(_first), int(_last)
+
+    def _fuzzy_rows(self, key: str, limit: int) -> np.ndarray:
+        _keys, _rows, _ = self.index
+        _first, _last = self._key_range(key[:2].encode(), prefix=True)
+        _candidates = [_k.decode() for _k in _keys[_first:_last]]
+        _matches = difflib.get_close_matches(
+            key, dict.fromkeys(_candidates), n=limit, cutoff=FUZZY_CUTOFF)
+        return np.concatenate(
+            [_rows[slice(*self._key_range(_match.encode()))]
+             for _match in _matches] or [np.empty(0, dtype=np.int32)])
+
+    def search(self,
+               name: str,
+               country: str = None,
+               limit: int = 10,
+               prefix: bool = True,
+               fuzzy: bool = True) -> np.ndarray:
+        """
+        Find the cities of a name: exact matches if any, otherwise
+        prefix matches, otherwise fuzzy matches, each ordered by
+        descending population.
+
+        Args:
+            name (str): The city name.
+            country (str, optional): ISO 3166 alpha-2 code (or country
+                name, see `countries`) to restrict the search to.
+                Empty values and "None" search all countries.
+            limit (int): Maximum number of results.
+            prefix (bool): Fall back to prefix matches.
+            fuzzy (bool): Fall back to fuzzy matches.
+
+        Returns:
+            np.ndarray: The matching cities as CITY_DTYPE records.
+        """
+        _keys, _rows, _cities = self.index
+        _key = normalize(name)
+        if not _key:
+            return _cities[:0]
+        _code = self._country_code(country) if country is not None else None
+        _encoded = _encode(_key, KEY_LENGTH_MAX)
+        # exact matches are unique and sorted by population in the index
+        _stages = [(lambda: _rows[slice(*self._key_range(_encoded))], True)]
+        if prefix:
+            _stages.append((lambda: np.unique(
+                _rows[slice(*self._key_range(_encoded, prefix=True))]), False))
+        if fuzzy:
+            _stages.append(
+                (lambda: np.unique(self._fuzzy_rows(_key, limit)), False))
+        for _stage, _ordered in _stages:
+            _found = _cities[_stage()]
+            if _code is not None:
+                _found = _found[_found['country_code'] == _code]
+            if _found.size:
+                if not _ordered:
+                    _found = _found[np.argsort(-_found['population'],
+                                               kind='stable')]
+                return _found[:limit]
+        return _cities[:0]
+
+    def geocode(self, query: str, exactly_one: bool = True, **kwargs):
+        """
+        geopy-like geocode: "City" or "City, Country" to a Place (or
+        a list of them) with latitude, longitude and the GeoNames
+        fields in raw; None if nothing matches. As in
+        `geocache.normalize`, the country follows the last comma;
+        parts in between (e.g. "Springfield, Illinois, US") are ignored. Further keyword
+        arguments (e.g. addressdetails) are accepted and ignored.
+        """
+        _parts = str(query).split(',')
+        _country = _parts[-1].strip() if len(_parts) > 1 else None
+        _found = self.search(_parts[0], _country or None,
+                             limit=1 if exactly_one else 10)
+        _places = [Place(
+            f"{_city['name'].decode()}, {_city['country_code'].decode()}",
+            float(_city['latitude']), float(_city['longitude']),
+            {'geonameid': int(_city['geonameid']),
+             'population': int(_city['population']),
+             'elevation': int(_city['elevation']),
+             'timezone': _city['timezone'].decode(),
+             'address': {'country_code': _city['country_code'].decode()}})
+            for _city in _found]
+        if exactly_one:
+            return _places[0] if _places else None
+        return _places or None
+
+
+@functools.lru_cache(maxsize=None)
+def default_gazetteer() -> Gazetteer:
+    """
+    Return the shared gazetteer of HELIOPY_GAZETTEER, or None if it
+    is not set.
+    """
+    _path = os.environ.get(GAZETTEER_ENV)
+    return Gazetteer(_path) if _path else None
+
+
+if __name__ == '__main__':
+    # python -m classes.gazetteer cities15000.zip [index_dir]
+    logging.basicConfig(level=logging.INFO)
+    _source = sys.argv[1]
+    _target = sys.argv[2] if len(sys.argv) > 2 else Gazetteer(_source).index_path
+    compile_index(_source, _target)
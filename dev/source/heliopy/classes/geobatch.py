@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Batch geocoding of many sites under a rate limit.
+
+Onboarding many sites with one `geodata.Geo` each geocodes every
+site on its own, duplicates included, as fast as the loop runs.
+`BatchGeocoder` instead normalizes and deduplicates the queries
+(see `geocache.normalize`), answers what it can from the geocode
+cache, and sends every remaining distinct query once, spaced by a
+shared rate limiter and retried with exponential backoff on
+timeouts, unavailability and rate limiting. Results are yielded as
+they complete, one per input, and stored in the cache, so later
+`Geo` objects for the same cities do not touch the network.
+
+For tests, `domain` and `scheme` point Nominatim at a local stub
+server, e.g. BatchGeocoder(domain='localhost:8080', scheme='http').
+
+Classes:
+- RateLimiter: Minimum spacing between calls, shared by threads.
+- BatchGeocoder: Deduplicating, rate-limited batch geocoder.
+"""
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+import geopy
+import numpy as np
+from classes import geocache
+
+
+NOMINATIM_RATE = 1.0
+
+# errors worth another try; anything else fails the query at once
+RETRY_ERRORS = (geopy.exc.GeocoderTimedOut,
+                geopy.exc.GeocoderUnavailable,
+                geopy.exc.GeocoderRateLimited)
+
+GeocodeResult = collections.namedtuple(
+    'GeocodeResult', ['index', 'city', 'country', 'latitude', 'longitude',
+                      'found', 'source', 'error'])
+
+
+class RateLimiter:
+    """
+    Class RateLimiter:
+    Blocks wait() callers so that successive calls are at least
+    1 / rate seconds apart, across threads.
+
+    Args:
+        rate (float): Maximum calls per second.
+        clock, sleep (optional): Time source and sleep function,
+            time.monotonic and time.sleep by default.
+    """
+
+    def __init__(self,
+                 rate: float = NOMINATIM_RATE,
+                 clock=time.monotonic,
+                 sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.interval = 1 / rate
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, delay: float = 0.0):
+        """
+        Waits for the next free slot, at least delay seconds from
+        now (e.g. the backoff or Retry-After of a failed request);
+        later calls follow at the usual interval after it.
+        """
+        with self._lock:
+            _now = self.clock()
+            _slot = max(self._next, _now) + delay
+            self._next = _slot + self.interval
+        if _slot > _now:
+            self.sleep(_slot - _now)
+
+
+class BatchGeocoder:
+    """
+    Class BatchGeocoder:
+    Geocode many (city, country) queries with deduplication,
+    caching, a rate limit and retries.
+
+    Args:
+        geocoder (optional): Any object with a geopy-like
+            geocode(query). Defaults to Nominatim on domain/scheme.
+        geocode_cache (geocache.GeocodeCache, optional): Defaults to
+            geocache.default_cache.
+        use_cache (bool): Look up and store results in the cache.
+        rate (float): Maximum requests per second (Nominatim allows 1).
+        workers (int): Requests in flight at the same time.
+        retries (int): Further attempts after a retryable error.
+        backoff (float): Wait before the first retry in seconds,
+            doubled for every further one.
+        timeout (float): Timeout of a single request in seconds.
+        domain (str, optional): Nominatim host, e.g. 'localhost:8080'.
+        scheme (str, optional): 'https' or 'http'.
+    """
+
+    def __init__(self,
+                 geocoder=None,
+                 geocode_cache: geocache.GeocodeCache = None,
+                 use_cache: bool = True,
+                 rate: float = NOMINATIM_RATE,
+                 workers: int = 1,
+                 retries: int = 3,
+                 backoff: float = 2.0,
+                 timeout: float = 10,
+                 domain: str = None,
+                 scheme: str = None):
+        if geocoder is None:
+            _options = {'domain': domain} if domain is not None else {}
+            geocoder = geopy.Nominatim(user_agent="heliopy", timeout=timeout,
+                                       scheme=scheme, **_options)
+        self.geocoder = geocoder
+        self.geocode_cache = (geocode_cache if geocode_cache is not None
+                              else geocache.default_cache) if use_cache \
+            else None
+        self.rate_limiter = RateLimiter(rate)
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _request(self, city: str, country: str):
+        """
+        Geocodes one query under the rate limit with retries.
+
+        Returns:
+            tuple: The geopy location (None if not found) and the error
+            of the last attempt (None on success).
+        """
+        _query = city if not country else f"{city}, {country}"
+        _delay = 0.0
+        for _attempt in range(self.retries + 1):
+            self.rate_limiter.wait(_delay)
+            with self._lock:
+                self.requests += 1
+            try:
+                return self.geocoder.geocode(
+                    _query, addressdetails=True, language='en'), None
+            except RETRY_ERRORS as exc:
+                _error = exc
+                _delay = self.backoff * 2 ** _attempt
+                if getattr(exc, 'retry_after', None):
+                    _delay = max(_delay, exc.retry_after)
+                logging.warning(f"geocoding {_query!r} failed ({exc!r}), "
+                                f"attempt {_attempt + 1}/{self.retries + 1}")
+            except geopy.exc.GeopyError as exc:
+                return None, exc
+        return None, _error
+
+    def geocode(self, queries):
+        """
+        Geocode the queries, yielding one GeocodeResult per query as
+        soon as it is known: cached ones first, the others in order of
+        completion. index is the position of the query in the input.
+
+        Args:
+            queries: Iterable of "City", "City, Country" or
+                (city, country) items.
+
+        Yields:
+            GeocodeResult: source is 'cache', 'geocoder' or 'error'
+            (with the exception in error; errors are not cached).
+        """
+        _pending = collections.OrderedDict()
+        for _index, _query in enumerate(queries):
+            _city, _country = (_query, None) if isinstance(_query, str) \
+                else _query
+            _location = self.geocode_cache.get(_city, _country) \
+                if self.geocode_cache is not None else None
+            if _location is not None:
+                yield GeocodeResult(_index, _city, _country,
+                                    _location.latitude, _location.longitude,
+                                    _location.found, 'cache', None)
+                continue
+            _key = geocache.normalize(_city, _country)
+            _pending.setdefault(_key, []).append((_index, _city, _country))
+        if not _pending:
+            return
+        logging.info(f"geocoding {len(_pending)} distinct queries")
+        with concurrent.futures.ThreadPoolExecutor(self.workers) as _executor:
+            _futures = {_executor.submit(self._request, *_items[0][1:]): _items
+                        for _items in _pending.values()}
+            for _future in concurrent.futures.as_completed(_futures):
+                _items = _futures[_future]
+                _location, _error = _future.result()
+                if _error is None and self.geocode_cache is not None:
+                    self.geocode_cache.put(*_items[0][1:], _location)
+                for _index, _city, _country in _items:
+                    yield GeocodeResult(
+                        _index, _city, _country,
+                        getattr(_location, 'latitude', None),
+                        getattr(_location, 'longitude', None),
+                        _location is not None,
+                        'geocoder' if _error is None else 'error', _error)
+
+    def coordinates(self, queries) -> tuple:
+        """
+        Geocode the queries and return latitude and longitude arrays
+        in input order, NaN where a query was not found or failed,
+        e.g. for `solarsites.SunSites`.
+        """
+        _queries = list(queries)
+        _latitude = np.full(len(_queries), np.nan)
+        _longitude = np.full(len(_queries), np.nan)
+        for _result in self.geocode(_queries):
+            if _result.found:
+                _latitude[_result.index] = _result.latitude
+                _longitude[_result.index] = _result.longitude
+        return _latitude, _longitude
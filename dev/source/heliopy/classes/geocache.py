@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache of geocoded locations.
+
+The coordinates of a city do not change, so `geodata.Geo` only asks
+the geocoder once and keeps the answer in a SQLite file that is
+shared by every process. Lookups are keyed on a normalized form of
+the city and country: case, accents in composed/decomposed form and
+whitespace do not matter, "Vienna, Austria" as one string equals
+city "Vienna" with country "Austria", and a cached "Vienna" without
+a country answers "Vienna, Austria" if it resolved to Austria. A
+query without a country is only answered by an entry stored without
+one, so the result does not depend on which countries were cached.
+Failed lookups are cached as well (negative caching), with a shorter
+time to live.
+
+The cache file is `HELIOPY_GEOCODE_CACHE` if set, otherwise
+`geocode.sqlite3` in `$XDG_CACHE_HOME/heliopy` (`~/.cache/heliopy`).
+
+Classes:
+- GeocodeCache: SQLite cache of geocoded locations.
+
+Functions:
+- normalize: Cache key of a city and country.
+- default_path: Location of the shared cache file.
+"""
+import collections
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+CACHE_PATH_ENV = 'HELIOPY_GEOCODE_CACHE'
+TTL = 180 * 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+
+Location = collections.namedtuple(
+    'Location', ['latitude', 'longitude', 'country', 'country_code',
+                 'found', 'created'])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    city TEXT NOT NULL,
+    country TEXT NOT NULL,
+    latitude REAL,
+    longitude REAL,
+    resolved_country TEXT NOT NULL DEFAULT '',
+    country_code TEXT NOT NULL DEFAULT '',
+    found INTEGER NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (city, country)
+) WITHOUT ROWID
+"""
+
+
+def _normal_text(text) -> str:
+    if text is None:
+        return ''
+    _text = unicodedata.normalize('NFKC', str(text)).casefold()
+    return ' '.join(_text.replace(',', ' ').split())
+
+
+def normalize(city: str, country: str = None) -> tuple:
+    """
+    Return the cache key (city, country) of a location query, with
+    '' for no country. A comma in the city without a country splits
+    it, so "Vienna, Austria" and ("vienna", "AUSTRIA") share a key.
+    """
+    if country is None and city is not None and ',' in city:
+        city, country = city.rsplit(',', 1)
+    return _normal_text(city), _normal_text(country)
+
+
+def default_path() -> str:
+    """
+    Return the path of the shared cache file, see module docstring.
+    """
+    _path = os.environ.get(CACHE_PATH_ENV)
+    if _path:
+        return _path
+    _cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(_cache_home, 'heliopy', 'geocode.sqlite3')
+
+
+class GeocodeCache:
+    """
+    Class GeocodeCache:
+    Thread-safe SQLite cache of geocoded locations with a time to
+    live for found and for not found locations. The file is opened
+    on first use.
+
+    Args:
+        path (str, optional): The cache file, or ':memory:'.
+            Defaults to `default_path()`.
+        ttl (float): Seconds a found location stays valid.
+        negative_ttl (float): Seconds a not found location stays valid.
+    """
+
+    def __init__(self,
+                 path: str = None,
+                 ttl: float = TTL,
+                 negative_ttl: float = NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            _path = self.path if self.path is not None else default_path()
+            if _path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(_path)),
+                            exist_ok=True)
+            self._connection = sqlite3.connect(
+                _path, timeout=10, isolation_level=None,
+                check_same_thread=False)
+            self._connection.execute(_SCHEMA)
+            self.path = _path
+        return self._connection
+
+    def _fresh(self, now: float) -> tuple:
+        return now - self.ttl, now - self.negative_ttl
+
+    def lookup(self,
+               city: str,
+               country: str = None,
+               stale: bool = False) -> Location:
+        """
+        Returns the cached location of a query without touching the
+        counters, or None if it is not cached (or expired, unless
+        stale is True). A cached not found location has found False.
+        """
+        _city, _country = normalize(city, country)
+        _valid = "1" if stale else (
+            "created >= CASE found WHEN 1 THEN ? ELSE ? END")
+        _fields = ("latitude, longitude, resolved_country, country_code, "
+                   "found, created")
+        _order = " ORDER BY created DESC"
+        with self._lock:
+            _arguments = () if stale else self._fresh(time.time())
+            _row = self.connection.execute(
+                f"SELECT {_fields} FROM locations "
+                f"WHERE city = ? AND country = ? AND {_valid}",
+                (_city, _country) + _arguments).fetchone()
+            if _row is None and _country:
+                # a query without country that resolved to this country
+                _row = self.connection.execute(
+                    f"SELECT {_fields} FROM locations "
+                    f"WHERE city = ? AND found = 1 "
+                    f"AND (resolved_country = ? OR country_code = ?) "
+                    f"AND {_valid}{_order}",
+                    (_city, _country, _country) + _arguments).fetchone()
+        if _row is None:
+            return None
+        return Location(_row[0], _row[1], _row[2], _row[3],
+                        bool(_row[4]), _row[5])
+
+    def get(self, city: str, country: str = None) -> Location:
+        """
+        Returns the cached location of a query, or None on a miss,
+        and counts the lookup.
+        """
+        _location = self.lookup(city, country)
+        with self._lock:
+            if _location is None:
+                self.misses += 1
+            elif _location.found:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+        return _location
+
+    def put(self, city: str, country: str = None, location=None) -> Location:
+        """
+        Stores the geocoder result of a query; None stores a not
+        found location. The country of the result is read from
+        the address details of geopy locations, if present.
+
+        Returns:
+            Location: The stored entry.
+        """
+        _city, _country = normalize(city, country)
+        _created = time.time()
+        if location is None:
+            _location = Location(None, None, '', '', False, _created)
+        else:
+            _address = (getattr(location, 'raw', None) or {}).get(
+                'address', {})
+            _location = Location(location.latitude, location.longitude,
+                                 _normal_text(_address.get('country')),
+                                 _normal_text(_address.get('country_code')),
+                                 True, _created)
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO locations VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?)",
+                (_city, _country, _location.latitude, _location.longitude,
+                 _location.country, _location.country_code,
+                 int(_location.found), _created))
+        logging.info(f"cached geocode for {(_city, _country)}: {_location}")
+        return _location
+
+    def purge(self) -> int:
+        """
+        Deletes expired entries.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        with self._lock:
+            return self.connection.execute(
+                "DELETE FROM locations WHERE "
+                "created < CASE found WHEN 1 THEN ? ELSE ? END",
+                self._fresh(time.time())).rowcount
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters of this instance and the number of
+        entries in the cache file.
+        """
+        with self._lock:
+            _found, _not_found = self.connection.execute(
+                "SELECT COALESCE(SUM(found), 0), COALESCE(SUM(1 - found), 0) "
+                "FROM locations").fetchone()
+            _lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'size': _found + _not_found,
+                'negative_size': _not_found,
+                'hit_ratio': (self.hits + self.negative_hits) / _lookups
+                if _lookups else 0.0,
+            }
+
+    def clear(self):
+        """
+        Deletes all entries and resets the counters.
+        """
+        with self._lock:
+            self.connection.execute("DELETE FROM locations")
+            self.hits = 0
+            self.negative_hits = 0
+            self.misses = 0
+
+    def close(self):
+        """
+        Closes the cache file; it is reopened on the next use.
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+default_cache = GeocodeCache()
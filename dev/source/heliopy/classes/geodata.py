@@ -3,24 +3,124 @@
 Geodata Class
 """
 import geopy
+import numpy as np
+from classes import dem, gazetteer, geocache
 
 
 class Geo:
     def __init__(self,
                  city_input: str,
-                 country_input: str = None
+                 country_input: str = None,
+                 geocode_cache: geocache.GeocodeCache = None,
+                 use_cache: bool = True,
+                 geocoder=None,
+                 elevation_input: float = None,
+                 dem_tiles: dem.DemTiles = None
                  ):
-        self.geo = geopy.Nominatim(user_agent="heliopy")
+        """
+        Args:
+            city_input (str): The city to geocode.
+            country_input (str, optional): The country of the city.
+            geocode_cache (geocache.GeocodeCache, optional): Cache of
+                geocoded locations. Defaults to geocache.default_cache.
+            use_cache (bool, optional): Look up and store the location
+                in the cache. Defaults to True.
+            geocoder (optional): Any object with a geopy-like
+                geocode(query), e.g. a gazetteer.Gazetteer. Defaults to
+                gazetteer.default_gazetteer() if HELIOPY_GAZETTEER is
+                set, otherwise Nominatim.
+            elevation_input (float, optional): Elevation of the site in
+                metres. Defaults to the DEM elevation at the coordinates.
+            dem_tiles (dem.DemTiles, optional): DEM tiles for the
+                elevation. Defaults to dem.default_tiles().
+        """
+        self.geo = geocoder if geocoder is not None else (
+            gazetteer.default_gazetteer()
+            or geopy.Nominatim(user_agent="heliopy"))
+        self.geocode_cache = (geocode_cache if geocode_cache is not None
+                              else geocache.default_cache) if use_cache \
+            else None
+        self.dem_tiles = dem_tiles
+        self._elevation = elevation_input
+        self.revision = 0
         self.city = city_input
         self.country = country_input
         self.get_geodata()
 
     def get_geodata(self):
+        """
+        Sets latitude and longitude of the city, from the geocode cache
+        if cached, otherwise from the geocoder. If the geocoder is not
+        reachable, an expired cache entry is used.
+
+        Raises:
+            ValueError: If the city is not set or not found.
+        """
         if self.city is None:
             raise ValueError("City is not set")
-        location_parms = "{_city}{_country}".format(
-            _city=self.city,
-            _country=f", {self.country}" if self.country is not None else None)
-        location = self.geo.geocode(location_parms)
+        _cache = self.geocode_cache
+        location = _cache.get(self.city, self.country) \
+            if _cache is not None else None
+        if location is None:
+            location_parms = "{_city}{_country}".format(
+                _city=self.city,
+                _country=f", {self.country}" if self.country is not None
+                else "")
+            try:
+                location = self.geo.geocode(
+                    location_parms, addressdetails=True, language='en')
+            except geopy.exc.GeopyError:
+                location = _cache.lookup(self.city, self.country, stale=True) \
+                    if _cache is not None else None
+                if location is None:
+                    raise
+            else:
+                if _cache is not None:
+                    _cache.put(self.city, self.country, location)
+        if location is None or not getattr(location, 'found', True):
+            raise ValueError(f"Location not found: {self.city}"
+                             + (f", {self.country}" if self.country else ""))
         self.longitude = location.longitude
         self.latitude = location.latitude
+
+    @property
+    def latitude(self):
+        return self._latitude
+
+    @latitude.setter
+    def latitude(self, value):
+        self._latitude = value
+        self._dem_elevation = None
+        self.revision += 1
+
+    @property
+    def longitude(self):
+        return self._longitude
+
+    @longitude.setter
+    def longitude(self, value):
+        self._longitude = value
+        self._dem_elevation = None
+        self.revision += 1
+
+    @property
+    def elevation(self):
+        """
+        Elevation of the site in metres: the value set, otherwise the
+        DEM elevation at the coordinates (looked up once per location),
+        0 without DEM tiles or outside of them.
+        """
+        if self._elevation is not None:
+            return self._elevation
+        if self._dem_elevation is None:
+            _tiles = self.dem_tiles if self.dem_tiles is not None \
+                else dem.default_tiles()
+            _elevation = _tiles.elevation(self.latitude, self.longitude) \
+                if _tiles is not None else np.nan
+            self._dem_elevation = float(np.nan_to_num(_elevation))
+        return self._dem_elevation
+
+    @elevation.setter
+    def elevation(self, value):
+        self._elevation = value
+        self.revision += 1
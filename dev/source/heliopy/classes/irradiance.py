@@ -16,11 +16,528 @@ Functions:
 - module_lit_optimal: Calculate the optimal tilt and azimuth angles
   that maximize the module illumination.
 - effective_length: Calculate the effective length of an illuminated panel.
+- module_irradiance: Vectorized module irradiance for arrays of
+  sun positions and module orientations.
+- daily_energy: Integrate module irradiance over the daylight
+  hours of every day in a date range.
+- energy_totals: Sum daily energy to monthly and annual totals.
+- optimal_orientation: Closed-form optimal module tilt and orientation.
+- sun_vectors, module_normals: Unit vectors of sun positions
+  and module orientations.
+- module_matrix: Module irradiance of N sun positions on
+  M orientations as one matrix product.
+- module_totals: Chunked sum of module_matrix over the sun positions.
+- seasonal_optimum: Orientation with the highest irradiation over a
+  date range, with a monthly tilt schedule.
+- energy_grid: Irradiation over a date range on a tilt x azimuth grid.
+- AnglesGrid: Module irradiance on a tilt x azimuth grid.
 """
 
-import itertools
+import collections
+import logging
 import math
-from classes import solardata, geodata
+import numpy as np
+from classes import solardata, geodata, solarseries, transposition, trig
+
+
+EnergyTotals = collections.namedtuple(
+    'EnergyTotals',
+    ['day', 'daily', 'month', 'monthly', 'year', 'annual'])
+
+# irradiance[i, j] belongs to tilt[i] and deg[j]
+AnglesGrid = collections.namedtuple(
+    'AnglesGrid', ['tilt', 'deg', 'irradiance'])
+
+ModuleOptimum = collections.namedtuple(
+    'ModuleOptimum', ['tilt', 'deg', 'irradiance'])
+
+SeasonalOptimum = collections.namedtuple(
+    'SeasonalOptimum',
+    ['tilt', 'deg', 'irradiation',
+     'month', 'monthly_tilt', 'monthly_irradiation'])
+
+# search range of the module angles, as for Irradiance.angles_array
+TILT_MAX = 89
+AZIMUTH_BOUNDS_NORTH = (0, 179)
+AZIMUTH_BOUNDS_SOUTH = (181, 359)
+
+
+def module_irradiance(incident, altitude, azimuth, tilt, deg):
+    """
+    Calculate the solar module irradiance like `Irradiance.module`,
+    for arrays that broadcast against each other.
+
+    Args:
+        incident: The direct illuminance.
+        altitude: The solar altitude in degrees.
+        azimuth: The solar azimuth in degrees.
+        tilt: The tilt angle of the module in degrees.
+        deg: The module orientation in degrees.
+
+    Returns:
+        np.ndarray: The module irradiance.
+    """
+    _alt_rad = np.radians(altitude)
+    _tilt_rad = np.radians(tilt)
+    _s_module = incident * (
+        np.cos(_alt_rad) * np.sin(_tilt_rad) * np.cos(
+            np.radians(deg) - np.radians(azimuth)) + np.sin(
+                _alt_rad) * np.cos(_tilt_rad))
+    return np.degrees(_s_module)
+
+
+def optimal_orientation(incident,
+                        altitude,
+                        azimuth,
+                        latitude,
+                        tilt_min=0) -> ModuleOptimum:
+    """
+    Find the module tilt and orientation with the highest irradiance
+    (see `module_irradiance`) in closed form, for arrays that
+    broadcast against each other.
+
+    For any tilt the irradiance is highest with the module facing the
+    sun, or the azimuth bound closest to it. For that orientation the
+    irradiance is a*sin(tilt) + b*cos(tilt), which is highest at
+    tilt = atan2(a, b), clamped to tilt_min-89.
+
+    Args:
+        incident: The direct illuminance.
+        altitude: The solar altitude in degrees.
+        azimuth: The solar azimuth in degrees.
+        latitude: The site latitude, selecting the azimuth range
+            0-179 (north) or 181-359 (south of the equator).
+        tilt_min: The minimum module tilt in degrees.
+
+    Returns:
+        ModuleOptimum: optimal tilt, orientation and irradiance.
+    """
+    _north = np.asarray(latitude) > 0
+    _low = np.where(_north, AZIMUTH_BOUNDS_NORTH[0], AZIMUTH_BOUNDS_SOUTH[0])
+    _high = np.where(_north, AZIMUTH_BOUNDS_NORTH[1], AZIMUTH_BOUNDS_SOUTH[1])
+    _azimuth = np.mod(azimuth, 360)
+    _deg = np.where(
+        (_low <= _azimuth) & (_azimuth <= _high),
+        _azimuth,
+        np.where(np.cos(np.radians(_low - _azimuth))
+                 >= np.cos(np.radians(_high - _azimuth)), _low, _high))
+    _alt_rad = np.radians(altitude)
+    _tilt = np.clip(np.degrees(np.arctan2(
+        np.cos(_alt_rad) * np.cos(np.radians(_deg - _azimuth)),
+        np.sin(_alt_rad))), tilt_min, TILT_MAX)
+    return ModuleOptimum(_tilt, _deg,
+                         module_irradiance(incident, altitude, azimuth,
+                                           _tilt, _deg))
+
+
+def effective_length(panel_distance, panel_size, panel_inclination):
+    """
+    Calculate the illuminated length of a panel edge,
+    see `Irradiance.effective_length`. Works on arrays.
+    """
+    _dark = np.sin(
+        np.degrees(
+            panel_inclination)) - np.sin(
+                90 - np.degrees(
+                    panel_inclination)) * panel_distance
+    _lit = panel_size - _dark
+    return _lit
+
+
+def _chebyshev_nodes(intervals: int) -> np.ndarray:
+    """
+    Nodes in [0, 1], spaced densely towards both ends.
+    The nodes for n intervals are every second node for 2n.
+    """
+    return (1 - np.cos(np.pi * np.arange(intervals + 1) / intervals)) / 2
+
+
+def _trapezoid(values: np.ndarray, hours: np.ndarray) -> np.ndarray:
+    return np.sum((values[:, 1:] + values[:, :-1]) / 2 * np.diff(hours),
+                  axis=1)
+
+
+def daily_energy(geodata: geodata.Geo,
+                 tilt: float,
+                 deg: float,
+                 start,
+                 end=None,
+                 timezone: str = None,
+                 cloud_coverage=None,
+                 intervals: int = 16,
+                 rtol: float = 1e-4,
+                 max_refinements: int = 6) -> tuple:
+    """
+    Integrate the module irradiance over the daylight hours of every
+    day from start (inclusive) to end (exclusive).
+
+    Each day is integrated from sunrise to sunset only (see
+    `solarseries.daylight_table`), so no night-time points are
+    evaluated. The nodes are spaced densely near sunrise and sunset,
+    and the number of intervals is doubled for every day whose total
+    has not yet converged to rtol. All days are evaluated together
+    in one vectorized pass per refinement.
+
+    Args:
+        geodata (geodata.Geo): Location of the site.
+        tilt (float): The tilt angle of the module in degrees.
+        deg (float): The module orientation in degrees.
+        start: First day as datetime64, date or 'YYYY-MM-DD'.
+        end (optional): Day after the last day.
+            Defaults to one year after start.
+        timezone (str, optional): Timezone as 'REGION/CITY'.
+            Defaults to the timezone of the site, see
+            `solarseries.get_timezone`.
+        cloud_coverage (array_like, optional): Cloud coverage in %,
+            one value for all days or one per day. Defaults to 0.
+        intervals (int): Intervals per day before refinement.
+        rtol (float): Relative tolerance of the daily totals.
+        max_refinements (int): Maximum number of interval doublings.
+
+    Returns:
+        tuple: days as datetime64[D] and the daily energy as module
+        irradiance (see `Irradiance.module`) times hours. Days not
+        converged after max_refinements are logged as a warning.
+        Negative irradiance (sun behind the module) and points with
+        the sun below the horizon count as 0.
+    """
+    _table = solarseries.daylight_table(geodata, start, end, timezone)
+    _sunrise = (_table.solar_noon - _table.day) / np.timedelta64(
+        1, 'h') - _table.day_length / 2
+    _clouds = np.asarray(
+        cloud_coverage if cloud_coverage is not None else 0, dtype=float)
+    _clouds = np.broadcast_to(_clouds, _table.day.shape)
+    _energy = np.zeros(_table.day.shape)
+    _active = np.flatnonzero(_table.day_length > 0)
+
+    def _evaluate(days, fractions):
+        _seconds = np.round((_sunrise[days, None] + fractions * _table.day_length[
+            days, None]) * 3600).astype('timedelta64[s]')
+        _series = solarseries.SunSeries(geodata,
+                                        _table.day[days, None] + _seconds,
+                                        timezone=timezone,
+                                        cloud_coverage=_clouds[days, None])
+        _up = _series.altitude > 0
+        with np.errstate(over='ignore', invalid='ignore'):
+            _module = module_irradiance(_series.direct_illuminance,
+                                        _series.altitude,
+                                        _series.solar_azimuth,
+                                        tilt,
+                                        deg)
+        _values = np.where(_up, np.clip(_module, 0, None), 0)
+        return _values, _seconds / np.timedelta64(1, 'h')
+
+    _values, _hours = _evaluate(_active, _chebyshev_nodes(intervals))
+    _energy[_active] = _trapezoid(_values, _hours)
+    for _ in range(max_refinements):
+        if _active.size == 0:
+            break
+        intervals *= 2
+        _new_values, _new_hours = _evaluate(
+            _active, _chebyshev_nodes(intervals)[1::2])
+        _values = _interleave(_values, _new_values)
+        _hours = _interleave(_hours, _new_hours)
+        _refined = _trapezoid(_values, _hours)
+        _open = np.abs(_refined - _energy[_active]) > rtol * np.abs(_refined)
+        _energy[_active] = _refined
+        _active, _values, _hours = (
+            _active[_open], _values[_open], _hours[_open])
+    if _active.size:
+        logging.warning(
+            f"daily energy of {_active.size} days not converged to "
+            f"rtol={rtol} after {max_refinements} refinements, e.g. "
+            f"{_table.day[_active[0]]}")
+    return _table.day, _energy
+
+
+def _interleave(even: np.ndarray, odd: np.ndarray) -> np.ndarray:
+    _merged = np.empty((even.shape[0], even.shape[1] + odd.shape[1]))
+    _merged[:, ::2] = even
+    _merged[:, 1::2] = odd
+    return _merged
+
+
+def energy_totals(days: np.ndarray, daily: np.ndarray) -> EnergyTotals:
+    """
+    Sum daily energy to monthly and annual totals.
+
+    Args:
+        days (np.ndarray): datetime64[D] days.
+        daily (np.ndarray): Energy of every day.
+
+    Returns:
+        EnergyTotals: days with daily values, months with monthly
+        totals and years with annual totals.
+    """
+    _months, _month_index = np.unique(days.astype('datetime64[M]'),
+                                      return_inverse=True)
+    _years, _year_index = np.unique(days.astype('datetime64[Y]'),
+                                    return_inverse=True)
+    return EnergyTotals(days,
+                        daily,
+                        _months,
+                        np.bincount(_month_index.ravel(), weights=daily,
+                                    minlength=_months.size),
+                        _years,
+                        np.bincount(_year_index.ravel(), weights=daily,
+                                    minlength=_years.size))
+
+
+def sun_vectors(altitude, azimuth, incident=None) -> np.ndarray:
+    """
+    Sun direction unit vectors (east, north, up), one row per sun
+    position. Rows with the sun at or below the horizon are 0.
+
+    Args:
+        altitude: The solar altitude in degrees.
+        azimuth: The solar azimuth in degrees.
+        incident (optional): The direct illuminance; if given,
+            every vector is scaled by it.
+
+    Returns:
+        np.ndarray: Array of shape altitude.shape + (3,).
+    """
+    _alt_rad = np.radians(altitude)
+    _azi_rad = np.radians(azimuth)
+    _scale = np.where(np.asarray(altitude) > 0,
+                      1.0 if incident is None else np.nan_to_num(incident),
+                      0.0)
+    return _scale[..., np.newaxis] * np.stack(
+        [np.cos(_alt_rad) * np.sin(_azi_rad),
+         np.cos(_alt_rad) * np.cos(_azi_rad),
+         np.sin(_alt_rad)], axis=-1)
+
+
+def module_normals(tilt, deg) -> np.ndarray:
+    """
+    Module normal unit vectors (east, north, up), one row per
+    orientation. Their dot product with `sun_vectors` is the cosine
+    of the angle of incidence, as in `module_irradiance`.
+
+    Args:
+        tilt: The tilt angle of the module in degrees.
+        deg: The module orientation in degrees.
+
+    Returns:
+        np.ndarray: Array of shape tilt.shape + (3,).
+    """
+    _tilt_rad = np.radians(tilt)
+    _deg_rad = np.radians(deg)
+    return np.stack([np.sin(_tilt_rad) * np.sin(_deg_rad),
+                     np.sin(_tilt_rad) * np.cos(_deg_rad),
+                     np.cos(_tilt_rad)], axis=-1)
+
+
+def module_matrix(incident, altitude, azimuth, tilt, deg) -> np.ndarray:
+    """
+    Calculate the module irradiance (see `module_irradiance`) of
+    N sun positions on M module orientations as one N x M matrix
+    product of sun vectors and module normals.
+
+    Incidence from behind the module and sun positions at or below
+    the horizon count as 0.
+
+    Args:
+        incident: The direct illuminance, shape (N,).
+        altitude: The solar altitude in degrees, shape (N,).
+        azimuth: The solar azimuth in degrees, shape (N,).
+        tilt: The tilt angle of the modules in degrees, shape (M,).
+        deg: The module orientations in degrees, shape (M,).
+
+    Returns:
+        np.ndarray: The module irradiance, shape (N, M).
+    """
+    return np.degrees(np.clip(
+        sun_vectors(altitude, azimuth, incident) @ module_normals(
+            tilt, deg).T, 0, None))
+
+
+def module_totals(vectors: np.ndarray,
+                  tilt,
+                  deg,
+                  max_elements: int = 2 ** 22) -> np.ndarray:
+    """
+    Sum `module_matrix` over all sun positions for every module
+    orientation, evaluating the matrix in chunks of at most
+    max_elements values, e.g. to score a fleet of roof faces
+    against a year of sun positions.
+
+    Args:
+        vectors (np.ndarray): Output of `sun_vectors`, scaled by
+            the incident illuminance (times hours for energy), (N, 3).
+        tilt: The tilt angle of the modules in degrees, shape (M,).
+        deg: The module orientations in degrees, shape (M,).
+        max_elements (int): Maximum size of one evaluated chunk.
+
+    Returns:
+        np.ndarray: The summed module irradiance, shape (M,).
+    """
+    _normals = module_normals(tilt, deg).T
+    _totals = np.zeros(_normals.shape[1])
+    _chunk = max(1, max_elements // _normals.shape[1])
+    for _start in range(0, vectors.shape[0], _chunk):
+        _totals += np.clip(vectors[_start:_start + _chunk] @ _normals,
+                           0, None).sum(axis=0)
+    return np.degrees(_totals)
+
+
+def _axis(low: float, high: float, step: float) -> np.ndarray:
+    return np.linspace(low, high, int(np.ceil((high - low) / step)) + 1)
+
+
+def _coarse_to_fine(objective,
+                    tilt_bounds: tuple,
+                    deg_bounds: tuple,
+                    step: float,
+                    resolution: float,
+                    rtol: float) -> tuple:
+    """
+    Maximize objective(tilt, deg) on a grid with the given step,
+    then repeatedly on a five times finer grid around the best node,
+    until the step reaches the resolution or the best value improves
+    by less than rtol.
+
+    Returns:
+        tuple: best tilt, orientation and objective value.
+    """
+    _tilt_bounds, _deg_bounds = tilt_bounds, deg_bounds
+    _best = None
+    while True:
+        _tilt, _deg = (_grid.ravel() for _grid in np.meshgrid(
+            _axis(*_tilt_bounds, step), _axis(*_deg_bounds, step),
+            indexing='ij'))
+        _values = objective(_tilt, _deg)
+        _index = np.argmax(_values)
+        _previous = _best
+        _best = (float(_tilt[_index]), float(_deg[_index]),
+                 float(_values[_index]))
+        if step <= resolution or (
+                _previous is not None
+                and _best[2] - _previous[2] <= rtol * abs(_best[2])):
+            return _best
+        _tilt_bounds = (max(tilt_bounds[0], _best[0] - step),
+                        min(tilt_bounds[1], _best[0] + step))
+        _deg_bounds = (max(deg_bounds[0], _best[1] - step),
+                       min(deg_bounds[1], _best[1] + step))
+        step = max(step / 5, resolution)
+
+
+def _irradiation_vectors(geodata, start, end, timezone, freq,
+                         cloud_coverage) -> tuple:
+    """
+    Sun positions at the middle of every freq step from start to end,
+    the mask of those with the sun up and their `sun_vectors` scaled
+    by direct illuminance times the step in hours.
+    """
+    _start, _end = solarseries.day_bounds(start, end)
+    _step = solarseries.frequency_step(freq)
+    _series = solarseries.SunSeries(
+        geodata, solarseries.time_range(_start, _end, _step) + _step // 2,
+        timezone=timezone, cloud_coverage=cloud_coverage)
+    _up = _series.altitude > 0
+    _vectors = sun_vectors(
+        _series.altitude[_up],
+        _series.solar_azimuth[_up],
+        _series.direct_illuminance[_up] * (_step / np.timedelta64(1, 'h')))
+    return _series, _up, _vectors
+
+
+def energy_grid(geodata: geodata.Geo,
+                start=None,
+                end=None,
+                timezone: str = None,
+                freq='1h',
+                cloud_coverage=None,
+                tilt_min: float = 0,
+                resolution: float = 1,
+                max_elements: int = 2 ** 22) -> AnglesGrid:
+    """
+    Module irradiation (module irradiance times hours) summed over a
+    date range for all module tilt and azimuth combinations on the
+    grid of `Irradiance.angles_array`, sampled as in `seasonal_optimum`.
+
+    Args:
+        geodata, start, end, timezone, freq, cloud_coverage, tilt_min,
+            max_elements: As for `seasonal_optimum`.
+        resolution (float): Step of both axes in degrees.
+
+    Returns:
+        AnglesGrid: tilt axis, azimuth axis and the irradiation as a
+        2D array of shape (tilt, azimuth).
+    """
+    _, _, _vectors = _irradiation_vectors(
+        geodata, start, end, timezone, freq, cloud_coverage)
+    _tilt = np.arange(tilt_min, TILT_MAX + 1, resolution)
+    _deg = np.arange(0, 180, resolution) if geodata.latitude > 0 \
+        else np.arange(181, 360, resolution)
+    _tilts, _degs = np.meshgrid(_tilt, _deg, indexing='ij')
+    _irradiation = module_totals(_vectors, _tilts.ravel(), _degs.ravel(),
+                                 max_elements)
+    return AnglesGrid(_tilt, _deg, _irradiation.reshape(_tilts.shape))
+
+
+def seasonal_optimum(geodata: geodata.Geo,
+                     start=None,
+                     end=None,
+                     timezone: str = None,
+                     freq='1h',
+                     cloud_coverage=None,
+                     tilt_min: float = 0,
+                     resolution: float = 0.1,
+                     rtol: float = 1e-6,
+                     max_elements: int = 2 ** 22) -> SeasonalOptimum:
+    """
+    Find the fixed module tilt and orientation with the highest
+    module irradiance summed over a date range (month, season, year),
+    and the optimal tilt of every month at that orientation for
+    adjustable racks.
+
+    The sun positions are sampled once at the middle of every `freq`
+    step while the sun is up. Orientations are searched coarse to fine
+    (10 degree grid, then five times finer around the best node), and
+    every grid is evaluated as a (timestamps x orientations) matrix in
+    chunks of at most max_elements values.
+
+    Args:
+        geodata (geodata.Geo): Location of the site.
+        start: First day as datetime64, date or 'YYYY-MM-DD'.
+            Defaults to January 1st of the current year.
+        end (optional): Day after the last day.
+            Defaults to one year after start.
+        timezone (str, optional): Timezone as 'REGION/CITY'.
+            Defaults to the timezone of the site, see
+            `solarseries.get_timezone`.
+        freq: Sampling step, as for `solarseries.time_range`.
+        cloud_coverage (optional): Cloud coverage in %. Defaults to 0.
+        tilt_min (float): The minimum module tilt in degrees.
+        resolution (float): Final grid step in degrees.
+        rtol (float): Stop refining once the best total improves
+            by less than this fraction.
+        max_elements (int): Maximum size of one evaluated chunk.
+
+    Returns:
+        SeasonalOptimum: optimal tilt, orientation and irradiation
+        (module irradiance times hours, see `daily_energy`), and the
+        months with their optimal tilt and irradiation.
+    """
+    _series, _up, _vectors = _irradiation_vectors(
+        geodata, start, end, timezone, freq, cloud_coverage)
+    _deg_bounds = AZIMUTH_BOUNDS_NORTH if geodata.latitude > 0 \
+        else AZIMUTH_BOUNDS_SOUTH
+    _tilt, _deg, _irradiation = _coarse_to_fine(
+        lambda tilt, deg: module_totals(_vectors, tilt, deg, max_elements),
+        (tilt_min, TILT_MAX), _deg_bounds, 10, resolution, rtol)
+
+    _months, _first = np.unique(
+        _series.times[_up].astype('datetime64[M]'), return_index=True)
+    _monthly = np.array([
+        _coarse_to_fine(
+            lambda tilt, deg: module_totals(_month_vectors, tilt, deg,
+                                            max_elements),
+            (tilt_min, TILT_MAX), (_deg, _deg), 10, resolution, rtol)
+        for _month_vectors in np.split(_vectors, _first[1:])]).reshape(-1, 3)
+    return SeasonalOptimum(_tilt, _deg, _irradiation,
+                           _months, _monthly[:, 0], _monthly[:, 2])
 
 
 class Irradiance:
@@ -74,15 +591,30 @@ class Irradiance:
             geo_data (geodata.Geo): An instance of the
             geodata.Geo class containing geographical data.
         """
-        self.alt_rad = math.radians(solardata.altitude)
-        self.azi_rad = math.radians(solardata.solar_azimuth)
+        self.solardata = solardata
+        self.geodata = geodata
+        self.module_tilt = module_tilt
+        self.module_degree = module_degree
         self.tilt_rad = math.radians(module_tilt)
         self.deg_rad = math.radians(module_degree)
         self.tilt_min = module_tilt_min if module_tilt_min is not None else 0
         self.deg_base = module_degree_base if module_degree_base is not None else 180
-        self.incident = solardata.direct_illuminance
+        self.update()
+
+    def update(self):
+        """
+        Read the sun position and illuminance from the solar data again,
+        e.g. after its time has been moved with `timedata.Time.advance`.
+        """
+        self.alt_rad = math.radians(self.solardata.altitude)
+        self.azi_rad = math.radians(self.solardata.solar_azimuth)
+        self.incident = self.solardata.direct_illuminance
         self.horizontal = self.incident * math.sin(self.alt_rad)
-        self.latitude = geodata.latitude
+        self.latitude = self.geodata.latitude
+        self._sin_alt, self._cos_alt = math.sin(self.alt_rad), math.cos(
+            self.alt_rad)
+        self._sin_azi, self._cos_azi = math.sin(self.azi_rad), math.cos(
+            self.azi_rad)
 
     def module(self,
                tilt: int = None,
@@ -111,19 +643,31 @@ class Irradiance:
                                 tilt_rad))
         return math.degrees(_s_module)
             
-    def angles_array(self) -> dict:
-        """
-        Create dictionary with all module tilt and azimuth 
-        combinations and respective irradiance values
-        """
-        deg_range = range(180) if self.latitude > 0 else range(181, 360)
-        angles_dict = {
-            (tilt, azimuth): self.module(tilt=tilt, deg=azimuth)
-            for tilt, azimuth in itertools.product(
-                range(self.tilt_min, 90), deg_range
-            )
-        }
-        return angles_dict
+    def angles_array(self, resolution: float = 1) -> AnglesGrid:
+        """
+        Calculate the module irradiance for all module tilt and
+        azimuth combinations on a regular grid.
+
+        Args:
+            resolution (float, optional): Step of both axes in degrees.
+            Defaults to 1.
+
+        Returns:
+            AnglesGrid: tilt axis (tilt_min-89), azimuth axis
+            (0-179 north, 181-359 south of the equator) and the
+            irradiance as a 2D array of shape (tilt, azimuth).
+        """
+        _tilt, _sin_tilt, _cos_tilt = trig.grid_axis(
+            self.tilt_min, 90, resolution)
+        _deg, _sin_deg, _cos_deg = trig.grid_axis(
+            *((0, 180) if self.latitude > 0 else (181, 360)), resolution)
+        # scale the 1D factors, so the grid is one outer product and sum
+        _scale = math.degrees(self.incident)
+        _irradiance = np.outer(_scale * self._cos_alt * _sin_tilt,
+                               _cos_deg * self._cos_azi
+                               + _sin_deg * self._sin_azi)
+        _irradiance += (_scale * self._sin_alt * _cos_tilt)[:, np.newaxis]
+        return AnglesGrid(_tilt, _deg, _irradiance)
     
     @property
     def tilt_array(self):
@@ -134,8 +678,13 @@ class Irradiance:
         Returns:
             dict: the module irradiance for every angle
         """
-        tilt_dict = {angle: self.module(tilt=angle) for angle in range(
-            self.tilt_min, 90)}
+        _tilt, _sin_tilt, _cos_tilt = trig.grid_axis(self.tilt_min, 90)
+        _sin_deg, _cos_deg = trig.sin_cos(self.module_degree)
+        _module = np.degrees(self.incident * (
+            self._cos_alt * _sin_tilt * (
+                _cos_deg * self._cos_azi + _sin_deg * self._sin_azi)
+            + self._sin_alt * _cos_tilt))
+        tilt_dict = dict(zip(_tilt.tolist(), _module.tolist()))
         return tilt_dict
         # return max(tilt_dict, key=tilt_dict.get)
     
@@ -148,11 +697,33 @@ class Irradiance:
         Returns:
             dict: the module irradiance for every angle
         """
-        deg_range = range(180) if self.latitude > 0 else range(181, 360)
-        deg_dict = {angle: self.module(deg=angle) for angle in deg_range}
+        _deg, _sin_deg, _cos_deg = trig.grid_axis(
+            *((0, 180) if self.latitude > 0 else (181, 360)))
+        _sin_tilt, _cos_tilt = trig.sin_cos(self.module_tilt)
+        _module = np.degrees(self.incident * (
+            self._cos_alt * _sin_tilt * (
+                _cos_deg * self._cos_azi + _sin_deg * self._sin_azi)
+            + self._sin_alt * _cos_tilt))
+        deg_dict = dict(zip(_deg.tolist(), _module.tolist()))
         return deg_dict
         # return max(deg_dict, key=deg_dict.get)
     
+    def optimum(self) -> ModuleOptimum:
+        """
+        Calculate the module tilt and orientation with the highest
+        irradiance for the current sun position in closed form,
+        see `optimal_orientation`.
+
+        Returns:
+            ModuleOptimum: optimal tilt, orientation and irradiance.
+        """
+        _optimum = optimal_orientation(self.incident,
+                                       math.degrees(self.alt_rad),
+                                       math.degrees(self.azi_rad),
+                                       self.latitude,
+                                       self.tilt_min)
+        return ModuleOptimum(*(float(_value) for _value in _optimum))
+
     @property
     def module_optimal(self):
         """
@@ -162,9 +733,138 @@ class Irradiance:
         Returns:
             float: The optimal module irradiance.
         """
-        tilt_optimal = max(self.tilt_array, key=self.tilt_array.get)
-        deg_optimal = max(self.deg_array, key=self.deg_array.get)
-        return self.module(tilt=tilt_optimal, deg=deg_optimal)
+        return self.optimum().irradiance
+
+    def energy(self,
+               start,
+               end=None,
+               tilt: float = None,
+               deg: float = None,
+               cloud_coverage=None,
+               rtol: float = 1e-4) -> EnergyTotals:
+        """
+        Calculate daily, monthly and annual energy of the module
+        for the days from start (inclusive) to end (exclusive),
+        see `daily_energy`.
+
+        Args:
+            start: First day as 'YYYY-MM-DD', date or datetime64.
+            end (optional): Day after the last day.
+                Defaults to one year after start.
+            tilt (float, optional): The tilt angle of the module.
+                Defaults to the module tilt.
+            deg (float, optional): The module orientation.
+                Defaults to the module orientation.
+            cloud_coverage (optional): Cloud coverage in %,
+                one value for all days or one per day. Defaults to 0.
+            rtol (float): Relative tolerance of the daily totals.
+
+        Returns:
+            EnergyTotals: daily, monthly and annual energy.
+        """
+        _days, _daily = daily_energy(
+            geodata=self.geodata,
+            tilt=self.module_tilt if tilt is None else tilt,
+            deg=self.module_degree if deg is None else deg,
+            start=start,
+            end=end,
+            timezone=self.solardata.timedata.timezone,
+            cloud_coverage=cloud_coverage,
+            rtol=rtol)
+        return energy_totals(_days, _daily)
+
+    def plane_of_array(self,
+                       model: str = 'perez',
+                       albedo: float = 0.25,
+                       tilt: float = None,
+                       deg: float = None) -> transposition.PlaneOfArray:
+        """
+        Transpose direct, sky diffuse and ground reflected illuminance
+        of the current sun position onto the module plane,
+        see `transposition.plane_of_array`.
+
+        Args:
+            model (str): Sky model, one of transposition.MODELS.
+            albedo (float): The ground reflectance (0-1).
+            tilt (float, optional): The tilt angle of the module.
+                Defaults to the module tilt.
+            deg (float, optional): The module orientation.
+                Defaults to the module orientation.
+
+        Returns:
+            PlaneOfArray: total, direct, sky diffuse and ground
+            reflected illuminance on the module.
+        """
+        _altitude = math.degrees(self.alt_rad)
+        _, _A, _B, _C = solarseries.cloud_coefficients(
+            solarseries.clear_sky(self.solardata.weather.cloud_coverage))
+        _poa = transposition.plane_of_array(
+            _altitude,
+            math.degrees(self.azi_rad),
+            self.incident,
+            solarseries.horizontal_sky_illuminance(_altitude, _A, _B, _C),
+            self.solardata.et_illuminance,
+            self.module_tilt if tilt is None else tilt,
+            self.module_degree if deg is None else deg,
+            model=model,
+            albedo=albedo)
+        return transposition.PlaneOfArray(*(float(_value) for _value in _poa))
+
+    def energy_grid(self,
+                    start=None,
+                    end=None,
+                    cloud_coverage=None,
+                    resolution: float = 1) -> AnglesGrid:
+        """
+        Module irradiation over a date range for all tilt and azimuth
+        combinations, see `energy_grid`.
+
+        Args:
+            start: First day as 'YYYY-MM-DD', date or datetime64.
+            end (optional): Day after the last day.
+                Defaults to one year after start.
+            cloud_coverage (optional): Cloud coverage in %.
+                Defaults to 0.
+            resolution (float): Step of both axes in degrees.
+
+        Returns:
+            AnglesGrid: tilt axis, azimuth axis and irradiation.
+        """
+        return energy_grid(geodata=self.geodata,
+                           start=start,
+                           end=end,
+                           timezone=self.solardata.timedata.timezone,
+                           cloud_coverage=cloud_coverage,
+                           tilt_min=self.tilt_min,
+                           resolution=resolution)
+
+    def seasonal_optimum(self,
+                         start=None,
+                         end=None,
+                         cloud_coverage=None,
+                         resolution: float = 0.1) -> SeasonalOptimum:
+        """
+        Find the orientation with the highest irradiation over a date
+        range and the monthly optimal tilt, see `seasonal_optimum`.
+
+        Args:
+            start: First day as 'YYYY-MM-DD', date or datetime64.
+            end (optional): Day after the last day.
+                Defaults to one year after start.
+            cloud_coverage (optional): Cloud coverage in %.
+                Defaults to 0.
+            resolution (float): Final grid step in degrees.
+
+        Returns:
+            SeasonalOptimum: optimal orientation and tilt schedule.
+        """
+        return seasonal_optimum(geodata=self.geodata,
+                                start=start,
+                                end=end,
+                                timezone=self.solardata.timedata.timezone,
+                                cloud_coverage=cloud_coverage,
+                                tilt_min=self.tilt_min,
+                                resolution=resolution)
 
     def effective_length(self,
                          panel_distance: int,
@@ -177,16 +877,14 @@ class Irradiance:
         Args:
             panel_distance (int): The distance between panels.
             panel_size (int): The size of a single panel.
-            panel_inclination: The inclination angle of the panel.
+            panel_inclination: The inclination angle of the panel,
+                a number or an array.
 
         Returns:
-            float: The effective length of the illuminated panel.
+            float: The effective length of the illuminated panel,
+            an array for an array of inclinations.
         """    
-        _dark = math.sin(
-            math.degrees(
-                panel_inclination)) - math.sin(
-                    90 - math.degrees(
-                        panel_inclination)) * panel_distance
-        _lit = panel_size - _dark
-        return _lit
+        return effective_length(panel_distance=panel_distance,
+                                panel_size=panel_size,
+                                panel_inclination=panel_inclination)
 
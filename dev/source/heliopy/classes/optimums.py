@@ -1,7 +1,333 @@
 #!/usr/bin/env python3
 
+import collections
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import numpy as np
 from . import irradiance
 
+
+Layout = collections.namedtuple(
+    'Layout',
+    ['value', 'rows', 'spacing_horizontal', 'spacing_vertical',
+     'tilt', 'azimuth', 'footprint_width', 'footprint_depth'])
+
+
+# layouts and grid axes whose area grid an Optimums keeps
+AREA_CACHE_SIZE = 8
+
+# one row per non-dominated (layout, orientation) candidate
+PARETO_DTYPE = np.dtype([
+    ('value', 'f8'), ('footprint', 'f8'), ('panels', 'i4'), ('rows', 'i4'),
+    ('spacing_horizontal', 'f8'), ('spacing_vertical', 'f8'),
+    ('tilt', 'f8'), ('azimuth', 'f8'),
+    ('footprint_width', 'f8'), ('footprint_depth', 'f8')])
+
+
+def lit_lengths(panel_width,
+                panel_height,
+                panel_amount,
+                panel_rows,
+                panel_spacing_horizontal,
+                panel_spacing_vertical,
+                deg_base,
+                tilt_min,
+                module_azimuth,
+                module_tilt) -> tuple:
+    """
+    Calculate the illuminated total width and height of a panel layout,
+    the two factors of `Optimums.area_total`. The width only depends
+    on the azimuth, the height only on the tilt; both work on arrays.
+
+    Returns:
+        tuple: width_total_lit and height_total_lit.
+    """
+    surface_single = panel_amount * panel_width
+    panel_columns = panel_amount // panel_rows
+    base_degree_deviation = np.abs(deg_base - module_azimuth)
+    min_tilt_deviation = np.abs(tilt_min - module_tilt)
+    width_total_lit = (
+        irradiance.effective_length(
+            panel_distance=panel_spacing_horizontal,
+            panel_size=panel_width,
+            panel_inclination=base_degree_deviation) * (
+                panel_columns - 1) * panel_rows) + (
+                    surface_single * panel_rows)
+
+    height_total_lit = (
+        irradiance.effective_length(
+            panel_distance=panel_spacing_vertical,
+            panel_size=panel_height,
+            panel_inclination=min_tilt_deviation) * (
+                panel_rows - 1) * panel_columns) + (
+                    surface_single * panel_columns)
+    return width_total_lit, height_total_lit
+
+
+def _search_layouts(grid: irradiance.AnglesGrid,
+                    panel: tuple,
+                    footprint: tuple,
+                    candidates: list,
+                    top_k: int) -> tuple:
+    """
+    Branch and bound over layout candidates (rows, spacing_horizontal,
+    spacing_vertical, bound), sorted by descending bound: a candidate is
+    skipped once its bound cannot beat the k-th best layout found.
+
+    Returns:
+        tuple: the best layouts and the number of pruned candidates.
+    """
+    _width, _height, _amount, _deg_base, _tilt_min = panel
+    _footprint_width, _footprint_depth = footprint
+    _cos_tilt = np.cos(np.radians(grid.tilt))
+    _best = []
+    _pruned = 0
+    for _rows, _spacing_h, _spacing_v, _bound in candidates:
+        if len(_best) == top_k and _bound < _best[0][0]:
+            _pruned += 1
+            continue
+        _width_lit, _height_lit = lit_lengths(
+            _width, _height, _amount, _rows, _spacing_h, _spacing_v,
+            _deg_base, _tilt_min, grid.deg, grid.tilt)
+        _depth = _rows * _height * _cos_tilt + (_rows - 1) * _spacing_v
+        _lit = grid.irradiance * np.outer(_height_lit, _width_lit)
+        _lit[_depth > _footprint_depth] = -np.inf
+        _tilt_index, _azimuth_index = np.unravel_index(
+            np.argmax(_lit), _lit.shape)
+        _value = _lit[_tilt_index, _azimuth_index]
+        if not np.isfinite(_value):
+            continue
+        _columns = _amount // _rows
+        _layout = Layout(float(_value), _rows, float(_spacing_h),
+                         float(_spacing_v),
+                         grid.tilt[_tilt_index].item(),
+                         grid.deg[_azimuth_index].item(),
+                         float(_columns * _width + (_columns - 1) * _spacing_h),
+                         float(_depth[_tilt_index]))
+        # the heap root is the worst layout; on equal values the one
+        # with more rows and wider spacing
+        _entry = (_layout.value, (-_rows, -_spacing_h, -_spacing_v), _layout)
+        if len(_best) < top_k:
+            heapq.heappush(_best, _entry)
+        else:
+            heapq.heappushpop(_best, _entry)
+    return [_entry[2] for _entry in _best], _pruned
+
+
+def optimize_layout(grid: irradiance.AnglesGrid,
+                    panel_width: float,
+                    panel_height: float,
+                    panel_amount: int,
+                    footprint_width: float,
+                    footprint_depth: float,
+                    deg_base: float = 180,
+                    tilt_min: float = 0,
+                    rows=None,
+                    spacing_horizontal=(0,),
+                    spacing_vertical=(0,),
+                    top_k: int = 5,
+                    processes: int = None) -> list:
+    """
+    Search the panel layouts (row count, horizontal and vertical
+    spacing, tilt and azimuth) with the highest module illumination
+    (irradiance times `Optimums.area_total`) that fit a footprint.
+
+    A layout of r rows has panel_amount // r columns; its footprint is
+    the panel widths plus horizontal spacing by the horizontal
+    projection of the tilted rows plus vertical spacing. For every
+    (rows, spacing) candidate an upper bound is taken from the
+    largest absolute irradiance and lit width and height, and
+    candidates are evaluated in order of descending bound until the
+    bound cannot beat the top_k layouts found (branch and bound).
+    With processes > 1 the candidates are spread over a process pool,
+    each worker pruning on its own and the results merged.
+
+    Args:
+        grid (irradiance.AnglesGrid): Irradiance over tilt and azimuth,
+            see `Irradiance.angles_array`.
+        panel_width, panel_height: Size of a single panel.
+        panel_amount (int): The total number of panels.
+        footprint_width, footprint_depth: Size of the roof footprint.
+        deg_base, tilt_min: Reference angles of `area_total`.
+        rows (optional): Row counts to search. Defaults to all
+            divisors of panel_amount.
+        spacing_horizontal, spacing_vertical: Spacings to search.
+        top_k (int): Number of layouts to return.
+        processes (int, optional): Number of worker processes.
+            Defaults to searching in this process.
+
+    Returns:
+        list: Layout tuples, best first; equal values prefer fewer
+        rows and narrower spacing.
+    """
+    _rows = rows if rows is not None else [
+        _count for _count in range(1, panel_amount + 1)
+        if panel_amount % _count == 0]
+    _max_irradiance = np.abs(grid.irradiance).max()
+    _candidates = []
+    for _count in _rows:
+        _columns = panel_amount // _count
+        for _spacing_h in spacing_horizontal:
+            if _columns * panel_width + (
+                    _columns - 1) * _spacing_h > footprint_width:
+                continue
+            for _spacing_v in spacing_vertical:
+                # even at the steepest tilt, with the smallest projected
+                # depth, the rows do not fit
+                if _count * panel_height * np.cos(np.radians(
+                        grid.tilt.max())) + (
+                            _count - 1) * _spacing_v > footprint_depth:
+                    continue
+                _width_lit, _height_lit = lit_lengths(
+                    panel_width, panel_height, panel_amount, _count,
+                    _spacing_h, _spacing_v, deg_base, tilt_min,
+                    grid.deg, grid.tilt)
+                _candidates.append((
+                    _count, _spacing_h, _spacing_v,
+                    float(_max_irradiance * np.abs(_width_lit).max()
+                          * np.abs(_height_lit).max())))
+    _candidates.sort(key=lambda _candidate: -_candidate[3])
+    _panel = (panel_width, panel_height, panel_amount, deg_base, tilt_min)
+    _footprint = (footprint_width, footprint_depth)
+    if processes is None or processes < 2 or len(_candidates) < 2:
+        _layouts, _pruned = _search_layouts(grid, _panel, _footprint,
+                                            _candidates, top_k)
+    else:
+        _layouts, _pruned = [], 0
+        with concurrent.futures.ProcessPoolExecutor(processes) as _pool:
+            # interleave, so every worker starts with high bounds
+            for _found, _skipped in _pool.map(
+                    _search_layouts,
+                    *zip(*((grid, _panel, _footprint,
+                            _candidates[_start::processes], top_k)
+                           for _start in range(processes)))):
+                _layouts.extend(_found)
+                _pruned += _skipped
+    logging.info(f"layout search: {len(_candidates)} candidates, "
+                 f"{_pruned} pruned")
+    return sorted(_layouts, key=lambda _layout: (
+        -_layout.value, _layout.rows, _layout.spacing_horizontal,
+        _layout.spacing_vertical))[:top_k]
+
+
+def _divisors(amount: int) -> list:
+    return [_count for _count in range(1, amount + 1) if amount % _count == 0]
+
+
+def non_dominated(costs: np.ndarray) -> np.ndarray:
+    """
+    Mask of the rows of an (n, 3) cost matrix that no other row
+    dominates (lower or equal in all columns, lower in at least one);
+    of equal rows only the first is kept.
+
+    The rows are sorted by the first two columns, so a row is dominated
+    exactly if an earlier row has a third column and a second column
+    not above its own. For every distinct value of the third column this
+    is one running minimum over the sorted rows, which suits a third
+    column with few distinct values such as a panel count.
+
+    Returns:
+        np.ndarray: Boolean mask of the non-dominated rows.
+    """
+    _order = np.lexsort((costs[:, 2], costs[:, 1], costs[:, 0]))
+    _second = costs[_order, 1]
+    _third = costs[_order, 2]
+    _dominated = np.zeros(_order.size, dtype=bool)
+    for _level in np.unique(_third):
+        _earlier = np.minimum.accumulate(
+            np.where(_third <= _level, _second, np.inf))
+        _earlier = np.concatenate(([np.inf], _earlier[:-1]))
+        _dominated |= (_third == _level) & (_earlier <= _second)
+    _mask = np.empty(_order.size, dtype=bool)
+    _mask[_order] = ~_dominated
+    return _mask
+
+
+def pareto_frontier(grid: irradiance.AnglesGrid,
+                    panel_width: float,
+                    panel_height: float,
+                    panel_amounts,
+                    deg_base: float = 180,
+                    tilt_min: float = 0,
+                    rows=None,
+                    spacing_horizontal=(0,),
+                    spacing_vertical=(0,),
+                    footprint_width: float = None,
+                    footprint_depth: float = None) -> np.ndarray:
+    """
+    Find the (layout, orientation) candidates that are not dominated in
+    lit module score (higher is better), footprint area and panel
+    count (lower is better). The score is the grid value times the lit
+    panel area: with an `irradiance.energy_grid` it is the energy over
+    its date range, with `Irradiance.angles_array` only the
+    illumination at one sun position.
+
+    The footprint does not depend on the azimuth, so for every layout
+    and tilt only the best azimuth is a candidate. The candidate scores
+    are collected as arrays and filtered with `non_dominated`.
+
+    Args:
+        grid (irradiance.AnglesGrid): Irradiation (or irradiance) over
+            tilt and azimuth, see `irradiance.energy_grid`.
+        panel_width, panel_height: Size of a single panel.
+        panel_amounts: Panel counts to search.
+        deg_base, tilt_min: Reference angles of `area_total`.
+        rows (optional): Row counts to search. Defaults to all
+            divisors of each panel count.
+        spacing_horizontal, spacing_vertical: Spacings to search.
+        footprint_width, footprint_depth (optional): Limits of the
+            roof footprint.
+
+    Returns:
+        np.ndarray: Structured array of PARETO_DTYPE, highest
+        value (lit score) first.
+    """
+    _cos_tilt = np.cos(np.radians(grid.tilt))
+    _parts = []
+    for _amount in np.atleast_1d(panel_amounts):
+        _amount = int(_amount)
+        for _count in (rows if rows is not None else _divisors(_amount)):
+            if _count > _amount:
+                continue
+            _columns = _amount // _count
+            for _spacing_h, _spacing_v in itertools.product(
+                    spacing_horizontal, spacing_vertical):
+                _width = _columns * panel_width + (_columns - 1) * _spacing_h
+                if footprint_width is not None and _width > footprint_width:
+                    continue
+                _width_lit, _height_lit = lit_lengths(
+                    panel_width, panel_height, _amount, _count, _spacing_h,
+                    _spacing_v, deg_base, tilt_min, grid.deg, grid.tilt)
+                _lit = grid.irradiance * np.outer(_height_lit, _width_lit)
+                _best = np.argmax(_lit, axis=1)
+                _depth = _count * panel_height * _cos_tilt + (
+                    _count - 1) * _spacing_v
+                _part = np.empty(grid.tilt.size, dtype=PARETO_DTYPE)
+                _part['value'] = _lit[np.arange(grid.tilt.size), _best]
+                _part['footprint'] = _width * _depth
+                _part['panels'] = _amount
+                _part['rows'] = _count
+                _part['spacing_horizontal'] = _spacing_h
+                _part['spacing_vertical'] = _spacing_v
+                _part['tilt'] = grid.tilt
+                _part['azimuth'] = grid.deg[_best]
+                _part['footprint_width'] = _width
+                _part['footprint_depth'] = _depth
+                if footprint_depth is not None:
+                    _part = _part[_depth <= footprint_depth]
+                _parts.append(_part)
+    _candidates = np.concatenate(_parts) if _parts \
+        else np.empty(0, dtype=PARETO_DTYPE)
+    _frontier = _candidates[non_dominated(np.column_stack([
+        -_candidates['value'], _candidates['footprint'],
+        _candidates['panels']]))]
+    logging.info(f"pareto frontier: {_frontier.size} of "
+                 f"{_candidates.size} candidates")
+    return _frontier[np.argsort(-_frontier['value'], kind='stable')]
+
+
 class Optimums:
     def __init__(self,
                  irradiance_data: irradiance.Irradiance,
@@ -22,6 +348,21 @@ class Optimums:
         self.panel_spacing_vertical = panel_spacing_vertical if panel_spacing_vertical is not None else 0
         self.module_azimuth = module_azimuth if module_azimuth is not None else self.irradiance_data.deg_base
         self.module_tilt = module_tilt if module_tilt is not None else self.irradiance_data.tilt_min
+        self._area_cache = collections.OrderedDict()
+
+    @property
+    def layout(self) -> tuple:
+        """
+        Panel layout and reference angles that `area_total` depends on.
+        """
+        return (self.panel_width,
+                self.panel_height,
+                self.panel_amount,
+                self.panel_rows,
+                self.panel_spacing_horizontal,
+                self.panel_spacing_vertical,
+                self.irradiance_data.deg_base,
+                self.irradiance_data.tilt_min)
 
     def area_total(self,
                    module_azimuth: int,
@@ -40,52 +381,173 @@ class Optimums:
             panel_spacing_vertical (int): The vertical spacing between panels.
             module_azimuth (int): The azimuth angle of the module.
             module_tilt (int): The tilt angle of the module.
+            Both angles can be arrays that broadcast against each other.
 
         Returns:
-            float: The total illuminated surface area.
+            float: The total illuminated surface area,
+            an array for array angles.
         """
-        surface_single = self.panel_amount * self.panel_width 
-        panel_columns = self.panel_amount // self.panel_rows
-        base_degree_deviation = abs(self.irradiance_data.deg_base - module_azimuth)
-        min_tilt_deviation = abs(self.irradiance_data.tilt_min - module_tilt)
-        width_total_lit = (
-            self.irradiance_data.effective_length(
-                panel_distance=self.panel_spacing_horizontal,
-                panel_size=self.panel_width,
-                panel_inclination=base_degree_deviation) * (
-                    panel_columns - 1) * self.panel_rows) + (
-                        surface_single * self.panel_rows)
-
-        height_total_lit = (
-            self.irradiance_data.effective_length(
-                panel_distance=self.panel_spacing_vertical,
-                panel_size=self.panel_height,
-                panel_inclination=min_tilt_deviation) * (
-                    self.panel_rows - 1) * panel_columns) + (
-                        surface_single * panel_columns)
-        
+        width_total_lit, height_total_lit = lit_lengths(
+            self.panel_width,
+            self.panel_height,
+            self.panel_amount,
+            self.panel_rows,
+            self.panel_spacing_horizontal,
+            self.panel_spacing_vertical,
+            self.irradiance_data.deg_base,
+            self.irradiance_data.tilt_min,
+            module_azimuth,
+            module_tilt)
         surface_lit = height_total_lit * width_total_lit
         return surface_lit
         # surface_lit_ratio = surface_lit / surface_total * 100
         # return surface_lit_ratio
     
-    def module_lit_optimal(self) -> tuple:
+    def area_grid(self,
+                  tilt: np.ndarray,
+                  deg: np.ndarray) -> np.ndarray:
+        """
+        Calculate `area_total` for every combination of the tilt and
+        azimuth axes of `Irradiance.angles_array`. The grids of the last
+        AREA_CACHE_SIZE layouts and axes are cached, so only the
+        irradiance term is recalculated for other sun positions.
+
+        Returns:
+            np.ndarray: The total illuminated surface area,
+            shape (tilt, azimuth); read-only.
+        """
+        _key = (self.layout, tilt.tobytes(), deg.tobytes())
+        if _key in self._area_cache:
+            self._area_cache.move_to_end(_key)
+            return self._area_cache[_key]
+        _area = np.broadcast_to(
+            self.area_total(module_azimuth=deg[np.newaxis, :],
+                            module_tilt=tilt[:, np.newaxis]),
+            (tilt.size, deg.size)).copy()
+        _area.flags.writeable = False
+        self._area_cache[_key] = _area
+        while len(self._area_cache) > AREA_CACHE_SIZE:
+            self._area_cache.popitem(last=False)
+        return _area
+
+    def module_lit_optimal(self, resolution: float = 1) -> tuple:
         """
         Calculate the optimal tilt and azimuth angles that maximize 
         the module illumination.
 
+        Args:
+            resolution (float, optional): Step of the tilt and azimuth
+                grid in degrees, see `Irradiance.angles_array`.
+
         Returns:
             tuple: The optimal tilt and azimuth angles as a tuple
             (tilt, azimuth).
         """
-        lit_optimal_dict = {
-            (tilt, azi): illumination
-            * self.area_total(module_azimuth=azi, module_tilt=tilt)
-            for (
-                tilt,
-                azi), illumination in self.irradiance_data.angles_array().items()
-        }
-        max_illumination = max(lit_optimal_dict, key=lit_optimal_dict.get)
-        _tilt_optimal = max_illumination[0]
-        _azimuth_optimal = max_illumination[1]
-        return (_tilt_optimal, _azimuth_optimal)
\ No newline at end of file
+        _grid = self.irradiance_data.angles_array(resolution)
+        _lit = _grid.irradiance * self.area_grid(_grid.tilt, _grid.deg)
+        _tilt_index, _azimuth_index = np.unravel_index(
+            np.argmax(_lit), _lit.shape)
+        _tilt_optimal = _grid.tilt[_tilt_index].item()
+        _azimuth_optimal = _grid.deg[_azimuth_index].item()
+        return (_tilt_optimal, _azimuth_optimal)
+
+    def optimize_layout(self,
+                        footprint_width: float,
+                        footprint_depth: float,
+                        rows=None,
+                        spacing_horizontal=None,
+                        spacing_vertical=None,
+                        top_k: int = 5,
+                        resolution: float = 1,
+                        processes: int = None) -> list:
+        """
+        Search the best layouts of this panel set for a roof footprint
+        at the current sun position, see `optimize_layout`.
+
+        Args:
+            footprint_width, footprint_depth: Size of the roof footprint.
+            rows (optional): Row counts to search.
+                Defaults to all divisors of panel_amount.
+            spacing_horizontal, spacing_vertical (optional): Spacings
+                to search. Default to the current spacing.
+            top_k (int): Number of layouts to return.
+            resolution (float): Step of the tilt and azimuth grid.
+            processes (int, optional): Number of worker processes.
+
+        Returns:
+            list: Layout tuples, best first.
+        """
+        return optimize_layout(
+            self.irradiance_data.angles_array(resolution),
+            self.panel_width,
+            self.panel_height,
+            self.panel_amount,
+            footprint_width,
+            footprint_depth,
+            deg_base=self.irradiance_data.deg_base,
+            tilt_min=self.irradiance_data.tilt_min,
+            rows=rows,
+            spacing_horizontal=spacing_horizontal if spacing_horizontal
+            is not None else (self.panel_spacing_horizontal,),
+            spacing_vertical=spacing_vertical if spacing_vertical
+            is not None else (self.panel_spacing_vertical,),
+            top_k=top_k,
+            processes=processes)
+
+    def pareto_frontier(self,
+                        panel_amounts=None,
+                        rows=None,
+                        spacing_horizontal=None,
+                        spacing_vertical=None,
+                        footprint_width: float = None,
+                        footprint_depth: float = None,
+                        resolution: float = 1,
+                        grid: irradiance.AnglesGrid = None,
+                        start=None,
+                        end=None,
+                        cloud_coverage=None) -> np.ndarray:
+        """
+        Find the layouts and orientations of this panel type that are
+        not dominated in energy, footprint and panel count, see
+        `pareto_frontier`. The energy is the module irradiation from
+        start to end (a year by default, see `irradiance.energy_grid`).
+
+        Args:
+            panel_amounts (optional): Panel counts to search.
+                Defaults to the current panel amount.
+            rows (optional): Row counts to search.
+                Defaults to all divisors of each panel count.
+            spacing_horizontal, spacing_vertical (optional): Spacings
+                to search. Default to the current spacing.
+            footprint_width, footprint_depth (optional): Limits of the
+                roof footprint.
+            resolution (float): Step of the tilt and azimuth grid.
+            grid (irradiance.AnglesGrid, optional): Score grid to use
+                instead, e.g. `Irradiance.angles_array` for the current
+                sun position only.
+            start, end, cloud_coverage (optional): Date range and cloud
+                coverage of the energy, see `Irradiance.energy_grid`.
+
+        Returns:
+            np.ndarray: Structured array of PARETO_DTYPE; value is
+            the lit irradiation over the date range.
+        """
+        if grid is None:
+            grid = self.irradiance_data.energy_grid(
+                start=start, end=end, cloud_coverage=cloud_coverage,
+                resolution=resolution)
+        return pareto_frontier(
+            grid,
+            self.panel_width,
+            self.panel_height,
+            panel_amounts if panel_amounts is not None
+            else (self.panel_amount,),
+            deg_base=self.irradiance_data.deg_base,
+            tilt_min=self.irradiance_data.tilt_min,
+            rows=rows,
+            spacing_horizontal=spacing_horizontal if spacing_horizontal
+            is not None else (self.panel_spacing_horizontal,),
+            spacing_vertical=spacing_vertical if spacing_vertical
+            is not None else (self.panel_spacing_vertical,),
+            footprint_width=footprint_width,
+            footprint_depth=footprint_depth)
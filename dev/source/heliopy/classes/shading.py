@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Row-to-row shading of tilted module rows over time.
+
+Every row except the front one is shaded by the row in front of it
+when the sun is low in the plane perpendicular to the rows. The
+shaded part of a row follows from the profile angle of the sun, the
+row pitch, the module tilt and the slant length of a row. Unlike
+`Irradiance.effective_length`, all angles are in degrees and the sun
+position enters explicitly, so whole series are one call.
+
+Functions:
+- profile_angle: Sun elevation projected onto the plane
+  perpendicular to the rows.
+- shaded_fraction: Shaded fraction of a row behind another row.
+- row_shading: Shaded fraction of every row for every timestamp.
+- row_irradiance: Module irradiance of every row with shading.
+"""
+import numpy as np
+from classes import irradiance, solarseries, transposition
+
+
+def profile_angle(altitude, azimuth, deg):
+    """
+    Angle between the horizon and the sun, projected onto the
+    vertical plane perpendicular to rows facing deg.
+
+    Args:
+        altitude: The solar altitude in degrees.
+        azimuth: The solar azimuth in degrees.
+        deg: The module orientation in degrees.
+
+    Returns:
+        The profile angle in degrees (0-180); above 90 the sun is
+        behind the rows.
+    """
+    return np.degrees(np.arctan2(
+        np.tan(np.radians(altitude)),
+        np.cos(np.radians(azimuth) - np.radians(deg))))
+
+
+def shaded_fraction(altitude, azimuth, tilt, deg, pitch, length):
+    """
+    Shaded fraction of the slant length of a row behind another row
+    of the same tilt, 1 - (pitch / length) * sin(profile) /
+    sin(profile + tilt), limited to 0-1. Rows without direct light
+    (sun down or behind the module) count as fully shaded.
+
+    Args:
+        altitude: The solar altitude in degrees.
+        azimuth: The solar azimuth in degrees.
+        tilt: The tilt angle of the modules in degrees.
+        deg: The module orientation in degrees.
+        pitch: Horizontal distance between the front edges of the rows.
+        length: Slant length of a row (module height up the slope).
+    """
+    _profile = np.radians(profile_angle(altitude, azimuth, deg))
+    _tilt_rad = np.radians(tilt)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _fraction = 1 - (pitch / length) * np.sin(_profile) / np.sin(
+            _profile + _tilt_rad)
+    _dark = (np.asarray(altitude) <= 0) | (
+        transposition.cos_incidence(altitude, azimuth, tilt, deg) <= 0)
+    return np.where(_dark, 1.0, np.clip(np.nan_to_num(_fraction), 0, 1))
+
+
+def row_shading(altitude, azimuth, tilt, deg, pitch, length, rows: int):
+    """
+    Shaded fraction of every row for every sun position. The front row
+    is only dark when there is no direct light; every other row is
+    shaded by the row in front of it.
+
+    Args:
+        altitude, azimuth: Sun positions in degrees, shape (T,).
+        tilt, deg, length: As for `shaded_fraction`.
+        pitch: Row pitch, one value or one per row gap, shape (rows-1,).
+        rows (int): Number of rows.
+
+    Returns:
+        np.ndarray: Shaded fractions, shape (T, rows), front row first.
+    """
+    _altitude = np.asarray(altitude, dtype=float)[..., np.newaxis]
+    _azimuth = np.asarray(azimuth, dtype=float)[..., np.newaxis]
+    _pitch = np.broadcast_to(np.asarray(pitch, dtype=float), (rows - 1,))
+    _front = shaded_fraction(_altitude, _azimuth, tilt, deg, np.inf, length)
+    _behind = shaded_fraction(_altitude, _azimuth, tilt, deg, _pitch, length)
+    return np.concatenate([_front, _behind], axis=-1)
+
+
+def row_irradiance(series: solarseries.SunSeries,
+                   tilt,
+                   deg,
+                   pitch,
+                   length,
+                   rows: int) -> np.ndarray:
+    """
+    Module irradiance (see `irradiance.module_irradiance`) of every
+    row for every timestamp of a SunSeries, with the shaded part of
+    each row receiving no direct light.
+
+    Returns:
+        np.ndarray: Irradiance per unit of row, shape (T, rows);
+        summed over time and multiplied by the step in hours this is
+        the shading-aware energy of every row.
+    """
+    _up = series.altitude > 0
+    with np.errstate(over='ignore', invalid='ignore'):
+        _module = irradiance.module_irradiance(
+            series.direct_illuminance, series.altitude,
+            series.solar_azimuth, tilt, deg)
+    _module = np.where(_up, np.clip(np.nan_to_num(_module), 0, None), 0.0)
+    _shading = row_shading(series.altitude, series.solar_azimuth, tilt,
+                           deg, pitch, length, rows)
+    return _module[..., np.newaxis] * (1 - _shading)
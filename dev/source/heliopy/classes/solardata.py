@@ -5,18 +5,78 @@ General-purpose solar irradiance and brightness calculator.
 import logging
 import math
 import datetime
-from classes import timedata, geodata, weather
+import functools
+import numpy as np
+from classes import timedata, geodata, weather, solarseries, ephemeris, spa
 
 
 def rounder(decimals: int):
+    """
+    Round the result of a Sun property to the given decimals.
+    Skipped when the Sun runs in precise mode, in which case
+    rounding is left to the presentation (e.g. wrapper.SolarMain).
+    """
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
+            if args[0].precise:
+                return result
             return round(result+10**(-len(str(result))-1), decimals)
         return wrapper
     return decorator
 
 
+def memoized(func):
+    """
+    Cache the result of a Sun property, so every intermediate
+    value is only calculated once per instant and location.
+    The cache is dropped by `Sun.cache` when the timedata or
+    geodata the value was calculated from changes.
+    """
+    _name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        _cache = self.cache
+        if _name not in _cache:
+            _cache[_name] = func(self)
+        return _cache[_name]
+    return wrapper
+
+
+def memoized_daily(func):
+    """
+    Cache the result of a Sun property that only depends on the
+    day and location. Unlike `memoized`, the value is kept when
+    the time changes within the same day (see `Sun.daily_cache`).
+    """
+    _name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        _cache = self.daily_cache
+        if _name not in _cache:
+            _cache[_name] = func(self)
+        return _cache[_name]
+    return wrapper
+
+
+def memoized_daily_simple(func):
+    """
+    Cache the result of a Sun property per day (`memoized_daily`)
+    for the simple engine, whose value only depends on the day, and
+    per instant (`memoized`) for the SPA, whose value does not.
+    """
+    _daily = memoized_daily(func)
+    _instant = memoized(func)
+
+    @functools.wraps(func)
+    def wrapper(self):
+        return _instant(self) if self.engine == 'spa' else _daily(self)
+    return wrapper
+
+
 class Sun:
     """
     Class Illuminaion:
@@ -27,54 +87,187 @@ class Sun:
     def __init__(self,
                  timedata: timedata.Time,
                  geodata: geodata.Geo,
-                 weather: weather.Weather
+                 weather: weather.Weather,
+                 ephemeris_cache: ephemeris.EphemerisCache = None,
+                 precise: bool = False,
+                 engine: str = 'simple'
                  ):
         self.timedata = timedata
         self.geodata = geodata
         self.weather = weather
-       
+        self.ephemeris_cache = ephemeris_cache if ephemeris_cache is not None\
+            else ephemeris.default_cache
+        self._cache = {}
+        self._cache_state = None
+        self._daily_cache = {}
+        self._daily_cache_state = None
+        self.precise = precise
+        self.engine = engine
+
     @property
+    def engine(self):
+        """
+        Solar position engine: 'simple' for the formulas below,
+        'spa' for the NREL SPA (see spa.py), which also provides
+        a 0-360 degree azimuth.
+        """
+        return self._engine
+
+    @engine.setter
+    def engine(self, value):
+        if value not in solarseries.ENGINES:
+            raise ValueError(f"Engine must be one of {solarseries.ENGINES}")
+        self._engine = value
+        self._cache_state = None
+        self._daily_cache_state = None
+
+    @property
+    def precise(self):
+        """
+        If True, intermediate values are not rounded.
+        """
+        return self._precise
+
+    @precise.setter
+    def precise(self, value):
+        self._precise = bool(value)
+        self._cache_state = None
+        self._daily_cache_state = None
+
+    @property
+    def cache(self):
+        """
+        Returns the cache of calculated values,
+        emptied whenever timedata, geodata or weather have changed
+        (or were replaced) since the values were stored.
+        """
+        _state = (id(self.timedata), getattr(self.timedata, 'revision', None),
+                  id(self.geodata), getattr(self.geodata, 'revision', None),
+                  id(self.weather), getattr(self.weather, 'revision', None))
+        if _state != self._cache_state:
+            self._cache = {}
+            self._cache_state = _state
+        return self._cache
+
+    @property
+    def daily_cache(self):
+        """
+        Returns the cache of values that only depend on the day,
+        emptied when the day or geodata have changed (or were replaced).
+        """
+        _state = (self.timedata.day,
+                  id(self.geodata), getattr(self.geodata, 'revision', None))
+        if _state != self._daily_cache_state:
+            self._daily_cache = {}
+            self._daily_cache_state = _state
+        return self._daily_cache
+
+    @property
+    @memoized
     def utc_time_delta(self):
-        delta = self.timedata.date - self.timedata.utc_time
-        delta_seconds = delta.total_seconds() 
+        delta = self.timedata.date.utcoffset()
+        delta_seconds = delta.total_seconds()
         delta_hours = divmod(delta_seconds, 3600)[0]
         return int(delta_hours)
 
+    def series(self, times=None, start=None, end=None, freq='1h'):
+        """
+        Return a solarseries.SunSeries for this location and timezone,
+        which calculates the solar position for an array of timestamps
+        in one vectorized pass.
+        """
+        return solarseries.SunSeries(geodata=self.geodata,
+                                     times=times,
+                                     start=start,
+                                     end=end,
+                                     freq=freq,
+                                     timezone=self.timedata.timezone)
+
+    def daylight_table(self, start=None, end=None):
+        """
+        Return a solarseries.DaylightTable with sunrise, sunset,
+        solar noon and day length for every day from start to end
+        (by default the year of the current date).
+        """
+        _start = start if start is not None else f"{self.day.year}-01-01"
+        return solarseries.daylight_table(geodata=self.geodata,
+                                          start=_start,
+                                          end=end,
+                                          timezone=self.timedata.timezone)
+
     @property
+    @memoized
     def hour(self):
-        return int(self.timedata.date.strftime('%-H')) 
+        """
+        Local time of day in fractional hours, as in
+        solarseries.SunSeries.hour.
+        """
+        _date = self.timedata.date
+        return _date.hour + _date.minute / 60 + (
+            _date.second + _date.microsecond / 1e6) / 3600
 
     @property
+    @memoized_daily
     def day(self):
         return self.timedata.date.date()
 
     @property
+    def elevation(self):
+        """
+        Elevation of the site in metres, 0 if the geodata has none.
+        """
+        return getattr(self.geodata, 'elevation', 0.0)
+
+    @property
+    @memoized
+    def spa_position(self):
+        """
+        Solar position of the NREL SPA for the current instant.
+        """
+        _utc = np.datetime64(self.timedata.utc_time.replace(tzinfo=None), 's')
+        return spa.solar_position(_utc,
+                                  self.geodata.latitude,
+                                  self.geodata.longitude,
+                                  elevation=self.elevation,
+                                  pressure=1013.25 * solarseries.pressure_ratio(
+                                      self.elevation))
+
+    @property
+    @memoized_daily
+    def ephemeris(self):
+        """
+        Day-level values (extraterrestrial illuminance, equation of time,
+        declination) from the shared ephemeris cache.
+        """
+        return self.ephemeris_cache.get(self.day.year,
+                                        self.timedata.day_of_the_year)
+
+    @property
+    @memoized_daily
     @rounder(2)
     def et_illuminance(self):
-        _day_of_the_year = self.timedata.day_of_the_year
-        _et_illuminance = float(129) * (1 + 0.034 * math.cos(((
-            2 * math.pi)/356) * (_day_of_the_year - 2)))
+        _et_illuminance = self.ephemeris.et_illuminance
         logging.info(f'calculated extraterrestrial_illuminance: {_et_illuminance}')
         return _et_illuminance
 
     @property
+    @memoized
     @rounder(2)
     def local_standard_time_meridian_rad(self):
         _lstm_rad = math.radians(15) * self.utc_time_delta
         return _lstm_rad
 
     @property
+    @memoized_daily_simple
     @rounder(2)
     def equation_of_time_rad(self):
-        _doy = self.timedata.day_of_the_year
-        _B_rad = math.radians((360/365) * (_doy - 81))
-        _eot_rad = 9.87 * math.sin(
-            2 * _B_rad) - 7.53 * math.cos(
-                _B_rad) - 1.5 * math.sin(
-                    _B_rad)
+        if self.engine == 'spa':
+            return float(self.spa_position.equation_of_time)
+        _eot_rad = self.ephemeris.equation_of_time_rad
         return _eot_rad
 
     @property
+    @memoized
     @rounder(2)
     def time_correction_factor_rad(self):
         _eot_rad = self.equation_of_time_rad
@@ -84,6 +277,7 @@ class Sun:
         return _tcf_rad
 
     @property
+    @memoized
     @rounder(2)
     def local_solar_time_rad(self):
         _lt = self.hour
@@ -92,32 +286,40 @@ class Sun:
         return _lst
 
     @property
+    @memoized
     @rounder(2)
     def hour_angle_rad(self):
+        if self.engine == 'spa':
+            return float(self.spa_position.hour_angle_rad)
         _lst = self.local_solar_time_rad
         _hra_rad = math.radians(15) * (_lst - 12)
         return _hra_rad
 
     @property
+    @memoized_daily_simple
     @rounder(2)
     def declination_angle_rad(self):
-        _doy = self.timedata.day_of_the_year
-        _da_rad = math.radians(-23.45) * math.cos(
-            math.radians((360/365) * (_doy + 10)))
+        if self.engine == 'spa':
+            return float(self.spa_position.declination_angle_rad)
+        _da_rad = self.ephemeris.declination_angle_rad
         return _da_rad
 
     @property
-    def sun_extr(self):  
+    @memoized_daily
+    def sun_extr(self):
         _lat = math.radians(self.geodata.latitude)
         _da = self.declination_angle_rad
         _corr_rad = math.radians(90.833)
-        _sun_extr = math.acos(
-            ((math.cos(_corr_rad))/(
-                math.cos(_lat) * math.cos(_da))) - (
-                    math.tan(_lat) * math.tan(_da)))
+        _cos_extr = ((math.cos(_corr_rad))/(
+            math.cos(_lat) * math.cos(_da))) - (
+                math.tan(_lat) * math.tan(_da))
+        # above 1: polar night, sunrise and sunset meet at solar noon
+        # below -1: polar day, sunrise and sunset are 12 hours from noon
+        _sun_extr = math.acos(min(1.0, max(-1.0, _cos_extr)))
         return _sun_extr
 
     @property
+    @memoized
     def sunrise_datetime(self):
         _tcf_rad = self.time_correction_factor_rad
         _hra = -1 * self.sun_extr
@@ -128,6 +330,7 @@ class Sun:
         return _sunrise
 
     @property
+    @memoized
     def sunset_datetime(self):
         _tcf_rad = self.time_correction_factor_rad
         _hra = self.sun_extr
@@ -138,8 +341,11 @@ class Sun:
         return _sunset
 
     @property
+    @memoized
     @rounder(2)
     def altitude(self):
+        if self.engine == 'spa':
+            return float(self.spa_position.altitude)
         _lat_rad = math.radians(self.geodata.latitude)
         _hra_rad = self.hour_angle_rad
         _da_rad = self.declination_angle_rad
@@ -152,9 +358,12 @@ class Sun:
         logging.info(f"altitude: {_alt_deg}")
         return _alt_deg
 
-    @property 
+    @property
+    @memoized
     @rounder(2)
     def solar_azimuth(self):
+        if self.engine == 'spa':
+            return float(self.spa_position.solar_azimuth)
         _lat_rad = math.radians(self.geodata.latitude)
         _alt_rad = math.radians(self.altitude)
         _hra_rad = self.hour_angle_rad
@@ -168,6 +377,7 @@ class Sun:
         return _azi_deg
 
     @property
+    @memoized
     @rounder(2)
     def clear_sky(self):
         cloud_fraction = self.weather.cloud_coverage / 100
@@ -176,6 +386,7 @@ class Sun:
         return csi
 
     @property
+    @memoized
     @rounder(2)
     def irradiance_clear(self):
         _alt_rad = self.altitude
@@ -183,6 +394,7 @@ class Sun:
         return _irradiance_clear
 
     @property
+    @memoized
     @rounder(2)
     def irradiance_cloud(self):
         _irradiance_clear = self.irradiance_clear
@@ -191,10 +403,15 @@ class Sun:
         return _irradiance_cloud
 
     @property
+    @memoized
     @rounder(2)
     def air_mass(self):
+        """
+        Relative air mass, scaled by the air pressure at the elevation
+        of the site (see `solarseries.pressure_ratio`).
+        """
         _altitude = self.altitude
-        _am_rad = 1/(
+        _am_rad = float(solarseries.pressure_ratio(self.elevation))/(
             math.cos(
                 math.radians(
                     90 - _altitude)) + 0.50572/(
@@ -204,6 +421,7 @@ class Sun:
         return _am_rad
 
     @property
+    @memoized
     def cloud_coefficients(self):
         _clear_sky = self.clear_sky
         if _clear_sky < 0.3:
@@ -214,6 +432,7 @@ class Sun:
             return None, 0.3, 21.0, 1.0
 
     @property
+    @memoized
     @rounder(2)
     def direct_illuminance(self):
         _c, _, _, _ = self.cloud_coefficients
@@ -228,6 +447,7 @@ class Sun:
         return _direct_illuminance
 
     @property
+    @memoized
     @rounder(2)
     def horizontal_illuminance(self):
         _altitude = self.altitude
@@ -237,6 +457,7 @@ class Sun:
         return _horizontal_illuminance
 
     @property
+    @memoized
     @rounder(2)
     def horizontal_sky_illuminance(self):
         _altitude = self.altitude
@@ -245,6 +466,7 @@ class Sun:
         return _sky_illuminance
 
     @property
+    @memoized
     def daylight_illuminance(self):
         if self.sun_up:
             _sky_illuminance = self.horizontal_sky_illuminance
@@ -255,6 +477,7 @@ class Sun:
         return int(_daylight)
 
     @property
+    @memoized
     def sun_up(self):
         _now = self.timedata.date
         return (self.timedata.timezone.localize(self.sunrise_datetime) <
@@ -0,0 +1,776 @@
+#!/usr/bin/env python3
+"""
+Vectorized solar position for a series of timestamps.
+
+This module evaluates the solar position formulas of `solardata.Sun`
+for a whole NumPy datetime64 array at once, so an hourly year for one
+site is a handful of array operations instead of thousands of
+`Time`/`Sun` objects. The formula functions broadcast, so they are
+also used for many sites at one instant (see `solarsites`).
+
+Classes:
+- SunSeries: Solar position arrays for one site and many timestamps.
+- DaylightTable: Columnar sunrise/sunset/solar noon table.
+
+Functions:
+- time_range: Build a datetime64 array from start, end and frequency.
+- frequency_step: Step of a `time_range` frequency as timedelta64.
+- utc_offset_seconds: UTC offsets of local timestamps in seconds.
+- utc_offset_hours: UTC offsets of local timestamps in whole hours.
+- utc_times: Convert local timestamps to UTC.
+- day_of_the_year: Day of the year of datetime64 timestamps.
+- declination_angle: Solar declination for days of the year.
+- equation_of_time: Equation of time for days of the year.
+- hour_angle: Hour angle for local hours and site longitude.
+- solar_altitude: Solar altitude from latitude, hour angle and declination.
+- solar_azimuth_angle: Solar azimuth from latitude, altitude,
+  hour angle and declination.
+- sun_extreme_hour_angle: Sunrise/sunset hour angle with polar masks.
+- pressure_ratio: Air pressure at an elevation relative to sea level.
+- clear_sky, cloud_coefficients, air_mass, direct_illuminance,
+  horizontal_illuminance, horizontal_sky_illuminance,
+  daylight_illuminance: Illuminance formulas of `solardata.Sun`.
+- day_bounds: Start and end day of a date range.
+- daylight_table: Sunrise, sunset, solar noon and day length
+  for every day of a date range.
+- interpolated_positions: Dense solar position series interpolated
+  from exact coarse nodes.
+"""
+import collections
+import datetime
+import functools
+import logging
+import re
+import numpy as np
+import pytz
+import tzlocal
+from classes import geodata, spa, tzindex
+
+
+FREQ_UNITS = {'D': 'D', 'h': 'h', 'min': 'm', 's': 's'}
+
+# 'simple': formulas of solardata.Sun, 'spa': NREL SPA (see spa.py)
+ENGINES = ('simple', 'spa')
+
+# rows as in solardata.Sun.cloud_coefficients for clear sky index
+# below 0.3, below 0.8 and above; nan stands for "no direct light"
+CLOUD_COEFFICIENTS = np.array([
+    [0.21, 0.8, 15.5, 0.5],
+    [0.8, 0.3, 45.0, 1.0],
+    [np.nan, 0.3, 21.0, 1.0]])
+CLEAR_SKY_BINS = np.array([0.3, 0.8])
+
+DaylightTable = collections.namedtuple(
+    'DaylightTable',
+    ['day', 'sunrise', 'sunset', 'solar_noon', 'day_length',
+     'polar_day', 'polar_night'])
+
+
+def time_range(start, end, freq='1h') -> np.ndarray:
+    """
+    Create an array of timestamps from start (inclusive)
+    to end (exclusive).
+
+    Args:
+        start: First timestamp, as datetime64, datetime or ISO string.
+        end: Timestamp after the last one, as datetime64,
+            datetime or ISO string.
+        freq: Step as 'D', 'h', 'min' or 's' with an optional
+            count (e.g. '10min'), or as a timedelta.
+
+    Returns:
+        np.ndarray: datetime64[s] array of timestamps.
+    """
+    return np.arange(np.datetime64(start, 's'),
+                     np.datetime64(end, 's'),
+                     frequency_step(freq))
+
+
+def frequency_step(freq) -> np.timedelta64:
+    """
+    Convert a frequency as accepted by `time_range`
+    to a timedelta64 in seconds.
+    """
+    if isinstance(freq, str):
+        _match = re.fullmatch(r'\s*(\d*)\s*(D|h|min|s)\s*', freq)
+        if _match is None:
+            raise ValueError(f"Frequency '{freq}' is not supported")
+        _count = int(_match.group(1) or 1)
+        _step = np.timedelta64(_count, FREQ_UNITS[_match.group(2)])
+    else:
+        _step = np.timedelta64(freq)
+    return _step.astype('timedelta64[s]')
+
+
+def get_timezone(timezone=None, latitude=None, longitude=None):
+    """
+    Return a pytz timezone for a timezone name or object.
+    If no timezone is specified, it is looked up from the coordinates
+    in the offline timezone index (see `tzindex`), if there are
+    coordinates and an index; otherwise the local timezone is used.
+    """
+    if timezone is None and latitude is not None:
+        timezone = tzindex.timezone_at(latitude, longitude)
+    _timezone = timezone if timezone is not None else tzlocal.get_localzone().key
+    return _timezone if isinstance(
+        _timezone, pytz.BaseTzInfo) else pytz.timezone(_timezone)
+
+
+def _day_start_offsets(days: np.ndarray, offset) -> np.ndarray:
+    """
+    UTC offsets at the start of sorted, distinct days. Offsets are
+    looked up for every seventh day only and bisected in between
+    where they differ, since they change just a few times a year.
+    """
+    _offsets = np.full(days.shape, np.nan)
+
+    def _lookup(index):
+        if np.isnan(_offsets[index]):
+            _offsets[index] = offset(days[index].astype(object))
+        return _offsets[index]
+
+    def _fill(low, high):
+        if high - low < 2:
+            _lookup(low), _lookup(high)
+        elif _lookup(low) == _lookup(high) and (
+                days[high] - days[low]) <= np.timedelta64(7, 'D'):
+            _offsets[low:high] = _offsets[low]
+        else:
+            _middle = (low + high) // 2
+            _fill(low, _middle)
+            _fill(_middle, high)
+
+    _anchors = list(range(0, days.size, 7)) + [days.size - 1]
+    for _low, _high in zip(_anchors[:-1], _anchors[1:]):
+        _fill(_low, _high)
+    _lookup(days.size - 1)
+    return _offsets
+
+
+def utc_offset_seconds(times: np.ndarray, timezone) -> np.ndarray:
+    """
+    Calculate the UTC offset in seconds for local timestamps,
+    localized like `timedata.Time.date`. Offsets are looked up per
+    day; only on days with a DST change every timestamp is looked
+    up on its own.
+
+    Args:
+        times (np.ndarray): datetime64 array of local timestamps.
+        timezone: pytz timezone of the local timestamps.
+
+    Returns:
+        np.ndarray: UTC offsets in seconds with the shape of times.
+    """
+    def _offset(moment):
+        if not isinstance(moment, datetime.datetime):
+            moment = datetime.datetime.combine(moment, datetime.time(0))
+        return timezone.localize(moment).utcoffset().total_seconds()
+
+    _times = np.asarray(times, dtype='datetime64[s]').ravel()
+    if _times.size == 0:
+        return np.zeros(np.shape(times))
+    _days = _times.astype('datetime64[D]')
+    _unique_days = np.unique(np.concatenate([_days, _days + 1]))
+    _starts = _day_start_offsets(_unique_days, _offset)
+    _index = np.searchsorted(_unique_days, _days)
+    _result = _starts[_index]
+    _changing = _result != _starts[np.searchsorted(_unique_days, _days + 1)]
+    for _position in np.flatnonzero(_changing):
+        _result[_position] = _offset(_times[_position].astype(object))
+    return _result.reshape(np.shape(times))
+
+
+def utc_offset_hours(times: np.ndarray, timezone) -> np.ndarray:
+    """
+    Calculate the UTC offset in whole hours for local timestamps,
+    like `solardata.Sun.utc_time_delta` does for a single instant.
+    """
+    return np.floor_divide(utc_offset_seconds(times, timezone), 3600)
+
+
+def utc_times(times: np.ndarray, timezone) -> np.ndarray:
+    """
+    Convert local datetime64 timestamps to UTC.
+    """
+    _times = np.asarray(times, dtype='datetime64[s]')
+    return _times - utc_offset_seconds(_times, timezone).astype(
+        'timedelta64[s]')
+
+
+def day_of_the_year(times: np.ndarray) -> np.ndarray:
+    """
+    Return the day of the year (1-366) of datetime64 timestamps.
+    """
+    _days = times.astype('datetime64[D]')
+    return (_days - _days.astype('datetime64[Y]')).astype(int) + 1
+
+
+def declination_angle(doy):
+    """
+    Solar declination in radians for the given days of the year.
+    """
+    return np.radians(-23.45) * np.cos(np.radians((360/365) * (doy + 10)))
+
+
+def equation_of_time(doy):
+    """
+    Equation of time for the given days of the year,
+    as used by `solardata.Sun.equation_of_time_rad`.
+    """
+    _B_rad = np.radians((360/365) * (doy - 81))
+    return 9.87 * np.sin(2 * _B_rad) - 7.53 * np.cos(
+        _B_rad) - 1.5 * np.sin(_B_rad)
+
+
+def et_illuminance(doy):
+    """
+    Extraterrestrial illuminance for the given days of the year.
+    """
+    return 129.0 * (1 + 0.034 * np.cos(((2 * np.pi)/356) * (doy - 2)))
+
+
+def hour_angle(hour, longitude, utc_time_delta, eot):
+    """
+    Hour angle in radians.
+
+    Args:
+        hour: Local time in (fractional) hours.
+        longitude: Site longitude in degrees.
+        utc_time_delta: UTC offset of the local time in hours.
+        eot: Equation of time, see `equation_of_time`.
+
+    Returns:
+        The hour angle in radians.
+    """
+    _lstm_rad = np.radians(15) * utc_time_delta
+    _tcf_rad = 4 * (np.radians(longitude) - _lstm_rad) + eot
+    _lst = hour + (_tcf_rad / 60)
+    return np.radians(15) * (_lst - 12)
+
+
+def solar_altitude(latitude, hra_rad, da_rad):
+    """
+    Solar altitude in degrees.
+
+    Args:
+        latitude: Site latitude in degrees.
+        hra_rad: Hour angle in radians.
+        da_rad: Declination angle in radians.
+
+    Returns:
+        The solar altitude in degrees.
+    """
+    _lat_rad = np.radians(latitude)
+    _sin_alt = np.sin(da_rad) * np.sin(_lat_rad) + np.cos(
+        da_rad) * np.cos(_lat_rad) * np.cos(hra_rad)
+    return np.degrees(np.arcsin(np.clip(_sin_alt, -1, 1)))
+
+
+def solar_azimuth_angle(latitude, altitude, hra_rad, da_rad):
+    """
+    Solar azimuth in degrees (0-180, as in `solardata.Sun.solar_azimuth`).
+
+    Args:
+        latitude: Site latitude in degrees.
+        altitude: Solar altitude in degrees.
+        hra_rad: Hour angle in radians.
+        da_rad: Declination angle in radians.
+
+    Returns:
+        The solar azimuth in degrees.
+    """
+    _lat_rad = np.radians(latitude)
+    _alt_rad = np.radians(altitude)
+    _cos_azi = ((np.sin(da_rad) * np.cos(_lat_rad)) - (
+        np.cos(da_rad) * np.sin(_lat_rad) * np.cos(
+            hra_rad))) / np.cos(_alt_rad)
+    return np.degrees(np.arccos(np.clip(_cos_azi, -1, 1)))
+
+
+def sun_extreme_hour_angle(latitude, da_rad):
+    """
+    Hour angle of sunrise/sunset in radians, as in
+    `solardata.Sun.sun_extr`, clipped for polar day and night.
+
+    Args:
+        latitude: Site latitude in degrees.
+        da_rad: Declination angle in radians.
+
+    Returns:
+        tuple: hour angle, polar day mask and polar night mask.
+    """
+    _lat = np.radians(latitude)
+    _corr_rad = np.radians(90.833)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _cos_extr = ((np.cos(_corr_rad))/(
+            np.cos(_lat) * np.cos(da_rad))) - (
+                np.tan(_lat) * np.tan(da_rad))
+    _polar_day = _cos_extr < -1
+    _polar_night = _cos_extr > 1
+    return np.arccos(np.clip(_cos_extr, -1, 1)), _polar_day, _polar_night
+
+
+def clear_sky(cloud_coverage):
+    """
+    Clear sky index for cloud coverage in percent.
+    """
+    _cloud_fraction = np.asarray(cloud_coverage, dtype=float) / 100
+    _cloud_oct = np.where(_cloud_fraction == 1, 1.0882, _cloud_fraction)
+    return 0.75 * (_cloud_oct)**3.4
+
+
+def cloud_coefficients(csi):
+    """
+    Illuminance coefficients for the given clear sky indices.
+
+    Returns:
+        tuple: c, A, B and C arrays; c is nan where
+        no direct illuminance reaches the ground.
+    """
+    _rows = CLOUD_COEFFICIENTS[np.digitize(csi, CLEAR_SKY_BINS)]
+    return tuple(np.moveaxis(_rows, -1, 0))
+
+
+def pressure_ratio(elevation):
+    """
+    Ratio of the air pressure at an elevation in metres to the
+    pressure at sea level, in the standard atmosphere.
+    """
+    return (1 - 2.25577e-5 * np.asarray(elevation, dtype=float)) ** 5.25588
+
+
+def air_mass(altitude, elevation=0.0):
+    """
+    Air mass for the solar altitude in degrees, corrected for the
+    lower air pressure at the elevation of the site in metres.
+    """
+    return pressure_ratio(elevation)/(np.cos(np.radians(90 - altitude))
+                                      + 0.50572/(96.07995 - np.radians(
+                                          90 - altitude))**1.6364)
+
+
+def direct_illuminance(et_illuminance, c, air_mass):
+    """
+    Direct illuminance from extraterrestrial illuminance,
+    cloud coefficient c and air mass.
+    """
+    with np.errstate(over='ignore'):
+        return np.where(np.isnan(c), 0.0, et_illuminance * np.exp(
+            -1 * np.nan_to_num(c) * air_mass))
+
+
+def horizontal_illuminance(direct_illuminance, altitude):
+    """
+    Horizontal illuminance, as in `solardata.Sun.horizontal_illuminance`.
+    """
+    return direct_illuminance * np.sin(altitude)
+
+
+def horizontal_sky_illuminance(altitude, A, B, C):
+    """
+    Horizontal sky illuminance, as in
+    `solardata.Sun.horizontal_sky_illuminance`.
+    """
+    with np.errstate(invalid='ignore'):
+        return A + (B * (np.sin(altitude))**C)
+
+
+def daylight_illuminance(sky_illuminance, horizontal_illuminance, sun_up):
+    """
+    Daylight illuminance in Lux, 0 where the sun is not up.
+    """
+    _daylight = (sky_illuminance + horizontal_illuminance) * 1000
+    return np.where(sun_up, np.trunc(np.nan_to_num(_daylight)), 0).astype(int)
+
+
+def _readonly(*arrays):
+    for _array in arrays:
+        _array.flags.writeable = False
+    return arrays
+
+
+@functools.lru_cache(maxsize=256)
+def _year_table(latitude: float,
+                longitude: float,
+                timezone_name: str,
+                year: int) -> DaylightTable:
+    _timezone = pytz.timezone(timezone_name)
+    _days = np.arange(np.datetime64(f"{year}-01-01"),
+                      np.datetime64(f"{year + 1}-01-01"))
+    _doy = day_of_the_year(_days)
+    _da_rad = declination_angle(_doy)
+    _lstm_rad = np.radians(15) * utc_offset_hours(
+        _days + np.timedelta64(12, 'h'), _timezone)
+    _tcf_rad = 4 * (np.radians(longitude) - _lstm_rad) + equation_of_time(_doy)
+    _extr, _polar_day, _polar_night = sun_extreme_hour_angle(latitude, _da_rad)
+    _noon_hour = 12 - (_tcf_rad / 60)
+    _half_day_hours = _extr / np.radians(15)
+
+    def _at(hours):
+        return _days + np.round(hours * 3600).astype('timedelta64[s]')
+
+    _polar = _polar_day | _polar_night
+    _sunrise = np.where(_polar, np.datetime64('NaT'),
+                        _at(_noon_hour - _half_day_hours))
+    _sunset = np.where(_polar, np.datetime64('NaT'),
+                       _at(_noon_hour + _half_day_hours))
+    logging.info(f"calculated daylight table for {year} at "
+                 f"{latitude}, {longitude}")
+    return DaylightTable(*_readonly(_days,
+                                    _sunrise.astype('datetime64[s]'),
+                                    _sunset.astype('datetime64[s]'),
+                                    _at(_noon_hour),
+                                    2 * _half_day_hours,
+                                    _polar_day,
+                                    _polar_night))
+
+
+def day_bounds(start=None, end=None) -> tuple:
+    """
+    Return start and end of a date range as datetime64[D].
+
+    Args:
+        start: First day as datetime64, date or 'YYYY-MM-DD'.
+            Defaults to January 1st of the current year.
+        end: Day after the last day. Defaults to one year after start
+            (March 1st for a start on February 29th).
+    """
+    _start = np.datetime64(
+        start if start is not None else f"{datetime.date.today().year}-01-01",
+        'D')
+    if end is not None:
+        return _start, np.datetime64(end, 'D')
+    _first = _start.astype(object)
+    try:
+        _last = _first.replace(year=_first.year + 1)
+    except ValueError:
+        _last = datetime.date(_first.year + 1, 3, 1)
+    return _start, np.datetime64(_last, 'D')
+
+
+def daylight_table(geodata: geodata.Geo,
+                   start=None,
+                   end=None,
+                   timezone: str = None) -> DaylightTable:
+    """
+    Calculate sunrise, sunset, solar noon and day length for every
+    day from start (inclusive) to end (exclusive). The table of each
+    year is calculated in one vectorized pass and cached per site,
+    timezone and year.
+
+    Args:
+        geodata (geodata.Geo): Location of the site.
+        start: First day as datetime64, date or 'YYYY-MM-DD'.
+            Defaults to January 1st of the current year.
+        end: Day after the last day. Defaults to one year after start.
+        timezone (str, optional): Timezone as 'REGION/CITY'.
+            Defaults to the timezone of the site, see `get_timezone`.
+
+    Returns:
+        DaylightTable: Columns of equal length. sunrise, sunset and
+        solar_noon are local datetime64[s] values, day_length is in
+        hours. On polar days (day_length 24) and polar nights
+        (day_length 0) sunrise and sunset are NaT.
+    """
+    _timezone = get_timezone(timezone, geodata.latitude, geodata.longitude)
+    _start, _end = day_bounds(start, end)
+    _tables = [
+        _year_table(float(geodata.latitude), float(geodata.longitude),
+                    _timezone.zone, _year)
+        for _year in range(_start.astype(object).year,
+                           (_end - 1).astype(object).year + 1)]
+    _columns = [np.concatenate(_column) for _column in zip(*_tables)]
+    _mask = (_columns[0] >= _start) & (_columns[0] < _end)
+    return DaylightTable(*(_column[_mask] for _column in _columns))
+
+
+class SunSeries:
+    """
+    Class SunSeries:
+    Calculate the solar position for an array of timestamps
+    at one location in a single vectorized pass.
+
+    Args:
+        geodata (geodata.Geo): Location of the site.
+        times (np.ndarray, optional): Local timestamps as datetime64.
+        start, end, freq (optional): Used to build the timestamps
+            with `time_range` if times is not provided.
+        timezone (str, optional): Timezone of the timestamps as
+            'REGION/CITY'. Defaults to the timezone of the site,
+            see `get_timezone`.
+        cloud_coverage (array_like, optional): Cloud coverage in %,
+            one value for all timestamps or one per timestamp.
+            Defaults to 0.
+        engine (str, optional): 'simple' for the formulas of
+            solardata.Sun, 'spa' for the NREL SPA. With 'spa' the
+            azimuth covers 0-360 degrees and the equation of time,
+            declination and hour angle are the SPA values.
+
+    All properties return arrays with the shape of `times`.
+    """
+
+    def __init__(self,
+                 geodata: geodata.Geo,
+                 times=None,
+                 start=None,
+                 end=None,
+                 freq='1h',
+                 timezone: str = None,
+                 cloud_coverage=None,
+                 engine: str = 'simple'
+                 ):
+        if engine not in ENGINES:
+            raise ValueError(f"Engine must be one of {ENGINES}")
+        if times is None:
+            if start is None or end is None:
+                raise ValueError("Either times or start and end are required")
+            times = time_range(start, end, freq)
+        self.times = np.asarray(times, dtype='datetime64[s]')
+        self.geodata = geodata
+        self.timezone = get_timezone(timezone, geodata.latitude,
+                                     geodata.longitude)
+        self.cloud_coverage = np.broadcast_to(np.asarray(
+            cloud_coverage if cloud_coverage is not None else 0,
+            dtype=float), self.times.shape)
+        self.engine = engine
+        logging.info(f"solar series with {self.times.size} timestamps")
+
+    @functools.cached_property
+    def days(self):
+        return self.times.astype('datetime64[D]')
+
+    @functools.cached_property
+    def day_of_the_year(self):
+        return day_of_the_year(self.days)
+
+    @functools.cached_property
+    def hour(self):
+        return (self.times - self.days) / np.timedelta64(1, 'h')
+
+    @functools.cached_property
+    def utc_time_delta(self):
+        return utc_offset_hours(self.times, self.timezone)
+
+    @functools.cached_property
+    def spa_position(self):
+        return spa.solar_position(utc_times(self.times, self.timezone),
+                                  self.geodata.latitude,
+                                  self.geodata.longitude,
+                                  elevation=self.elevation,
+                                  pressure=1013.25 * pressure_ratio(
+                                      self.elevation))
+
+    @functools.cached_property
+    def et_illuminance(self):
+        return et_illuminance(self.day_of_the_year)
+
+    @functools.cached_property
+    def equation_of_time_rad(self):
+        if self.engine == 'spa':
+            return self.spa_position.equation_of_time
+        return equation_of_time(self.day_of_the_year)
+
+    @functools.cached_property
+    def declination_angle_rad(self):
+        if self.engine == 'spa':
+            return self.spa_position.declination_angle_rad
+        return declination_angle(self.day_of_the_year)
+
+    @functools.cached_property
+    def hour_angle_rad(self):
+        if self.engine == 'spa':
+            return self.spa_position.hour_angle_rad
+        return hour_angle(self.hour,
+                          self.geodata.longitude,
+                          self.utc_time_delta,
+                          self.equation_of_time_rad)
+
+    @functools.cached_property
+    def altitude(self):
+        if self.engine == 'spa':
+            return self.spa_position.altitude
+        return solar_altitude(self.geodata.latitude,
+                              self.hour_angle_rad,
+                              self.declination_angle_rad)
+
+    @functools.cached_property
+    def solar_azimuth(self):
+        if self.engine == 'spa':
+            return self.spa_position.solar_azimuth
+        return solar_azimuth_angle(self.geodata.latitude,
+                                   self.altitude,
+                                   self.hour_angle_rad,
+                                   self.declination_angle_rad)
+
+    @functools.cached_property
+    def sun_up(self):
+        _extr, _, _ = sun_extreme_hour_angle(self.geodata.latitude,
+                                             self.declination_angle_rad)
+        _noon_hour = self.hour - (self.hour_angle_rad / np.radians(15))
+        _half_day_hours = _extr / np.radians(15)
+        return ((_noon_hour - _half_day_hours < self.hour) &
+                (self.hour < _noon_hour + _half_day_hours))
+
+    @functools.cached_property
+    def cloud_coefficients(self):
+        return cloud_coefficients(clear_sky(self.cloud_coverage))
+
+    @functools.cached_property
+    def elevation(self):
+        return getattr(self.geodata, 'elevation', 0.0)
+
+    @functools.cached_property
+    def air_mass(self):
+        return air_mass(self.altitude, self.elevation)
+
+    @functools.cached_property
+    def direct_illuminance(self):
+        _c, _, _, _ = self.cloud_coefficients
+        return direct_illuminance(self.et_illuminance, _c, self.air_mass)
+
+    @functools.cached_property
+    def horizontal_illuminance(self):
+        return horizontal_illuminance(self.direct_illuminance, self.altitude)
+
+    @functools.cached_property
+    def horizontal_sky_illuminance(self):
+        _, _A, _B, _C = self.cloud_coefficients
+        return horizontal_sky_illuminance(self.altitude, _A, _B, _C)
+
+    @functools.cached_property
+    def daylight_illuminance(self):
+        return daylight_illuminance(self.horizontal_sky_illuminance,
+                                    self.horizontal_illuminance,
+                                    self.sun_up)
+
+    def positions(self) -> dict:
+        """
+        Return all solar position arrays at once.
+
+        Returns:
+            dict: altitude, solar_azimuth, hour_angle_rad,
+            declination_angle_rad and equation_of_time_rad arrays.
+        """
+        return {
+            'altitude': self.altitude,
+            'solar_azimuth': self.solar_azimuth,
+            'hour_angle_rad': self.hour_angle_rad,
+            'declination_angle_rad': self.declination_angle_rad,
+            'equation_of_time_rad': self.equation_of_time_rad,
+        }
+
+
+def _hermite_coefficients(values):
+    """
+    Cubic coefficients (highest power last) of the Hermite spline
+    interval between each pair of nodes, with Catmull-Rom tangents.
+    The outermost nodes get no tangent and are not interpolated from.
+    """
+    _tangents = np.zeros_like(values)
+    _tangents[1:-1] = (values[2:] - values[:-2]) / 2
+    _y0, _y1 = values[:-1], values[1:]
+    _m0, _m1 = _tangents[:-1], _tangents[1:]
+    return np.stack([_y0,
+                     _m0,
+                     3 * (_y1 - _y0) - 2 * _m0 - _m1,
+                     2 * (_y0 - _y1) + _m0 + _m1], axis=-1)
+
+
+def _horner(coefficients, u):
+    """
+    Evaluate cubic coefficients at interval fractions u.
+    """
+    return coefficients[..., 0] + u * (
+        coefficients[..., 1] + u * (
+            coefficients[..., 2] + u * coefficients[..., 3]))
+
+
+def interpolated_positions(geodata: geodata.Geo,
+                           times=None,
+                           start=None,
+                           end=None,
+                           freq='1s',
+                           timezone: str = None,
+                           node_freq='10min',
+                           max_error: float = 0.01,
+                           horizon: float = 1.0,
+                           engine: str = 'simple') -> dict:
+    """
+    Solar altitude and azimuth for a dense series (e.g. every second),
+    evaluated exactly at coarse nodes only and filled in with a cubic
+    Hermite spline (Catmull-Rom tangents) in between.
+
+    The interpolation error of every node interval is estimated by an
+    exact evaluation at its midpoint. Intervals whose error exceeds
+    `max_error`, and intervals where the sun is within `horizon`
+    degrees of the horizon (sunrise and sunset), are evaluated exactly.
+
+    Args:
+        geodata (geodata.Geo): Location of the site.
+        times, start, end, freq, timezone, engine: As for SunSeries.
+        node_freq: Step between the exact nodes, as for `time_range`.
+        max_error (float): Maximum angular error in degrees of
+            altitude and azimuth.
+        horizon (float): Altitude in degrees below which node
+            intervals are evaluated exactly.
+
+    Returns:
+        dict: altitude and solar_azimuth arrays with the shape of
+        `times`, and the boolean mask `exact` of timestamps that
+        were evaluated without interpolation.
+    """
+    if times is None:
+        if start is None or end is None:
+            raise ValueError("Either times or start and end are required")
+        times = time_range(start, end, freq)
+    _times = np.asarray(times, dtype='datetime64[s]')
+    if _times.size == 0:
+        return {'altitude': np.empty(_times.shape),
+                'solar_azimuth': np.empty(_times.shape),
+                'exact': np.zeros(_times.shape, dtype=bool)}
+    _step = int(frequency_step(node_freq).astype('int64'))
+    if _step < 2:
+        raise ValueError("Node frequency must be at least 2 seconds")
+    # one extra node on each side for the tangents of the outer intervals
+    _seconds = _times.astype('int64')
+    _first = (_seconds.min() // _step - 1) * _step
+    _count = int((_seconds.max() - _first) // _step) + 3
+    _node_seconds = _first + _step * np.arange(_count)
+    _nodes = SunSeries(geodata, _node_seconds.astype('datetime64[s]'),
+                       timezone=timezone, engine=engine)
+    _middles = SunSeries(geodata,
+                         (_node_seconds[:-1] + _step // 2).astype(
+                             'datetime64[s]'),
+                         timezone=timezone, engine=engine)
+    _node_altitude = _nodes.altitude
+    # columns: altitude, unwrapped azimuth
+    _coefficients = _hermite_coefficients(np.stack(
+        [_node_altitude, np.unwrap(_nodes.solar_azimuth, period=360)],
+        axis=-1))
+    _middle = _horner(_coefficients, (_step // 2) / _step)
+    _azimuth_error = np.abs(
+        (_middle[:, 1] - _middles.solar_azimuth + 180) % 360 - 180)
+    _exact_intervals = (
+        (np.abs(_middle[:, 0] - _middles.altitude) > max_error)
+        | (_azimuth_error > max_error)
+        | ((np.minimum(_node_altitude[:-1], _node_altitude[1:]) < horizon)
+           & (np.maximum(_node_altitude[:-1], _node_altitude[1:]) > -horizon)))
+
+    _offsets = _seconds - _first
+    _index = _offsets // _step
+    _dense = _horner(_coefficients[_index],
+                     ((_offsets - _index * _step) / _step)[..., np.newaxis])
+    _altitude = _dense[..., 0]
+    _azimuth = _dense[..., 1] % 360
+    _exact = _exact_intervals[_index]
+    if _exact.any():
+        _exact_series = SunSeries(geodata, _times[_exact],
+                                  timezone=timezone, engine=engine)
+        _altitude[_exact] = _exact_series.altitude
+        _azimuth[_exact] = _exact_series.solar_azimuth
+    logging.info(f"interpolated {_times.size - _exact.sum()} of "
+                 f"{_times.size} "
+                 f"solar positions from {_count} nodes")
+    return {'altitude': _altitude,
+            'solar_azimuth': _azimuth,
+            'exact': _exact}
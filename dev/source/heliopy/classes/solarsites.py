@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Batch evaluation of many sites at one instant.
+
+A fleet of sites at the same timestamp shares everything that depends
+on the time only (day of the year, ephemeris, UTC offset), so the
+`solardata.Sun` formulas are evaluated once for the instant and
+broadcast over arrays of latitudes and longitudes, without any
+per-site `Geo`, `Weather` or `Sun` objects.
+
+Without a timezone, every site gets its own zone from the offline
+timezone index (see `tzindex`) and the time is the local time of
+each site; the UTC offset is looked up once per distinct zone.
+
+Classes:
+- SunSites: Solar position and illuminance arrays for many sites.
+"""
+import datetime
+import functools
+import logging
+import numpy as np
+from classes import dem, ephemeris, solarseries, tzindex
+
+
+class SunSites:
+    """
+    Class SunSites:
+    Calculate solar position and illuminance for arrays of
+    coordinates at a single local time.
+
+    Args:
+        latitude (array_like): Site latitudes in degrees.
+        longitude (array_like): Site longitudes in degrees.
+        time (optional): Local time of all sites as datetime64,
+            datetime or ISO string ('YYYY-MM-DDTHH:MM:SS').
+            Defaults to the current time.
+        timezone (str, optional): Timezone of the local time of all
+            sites as 'REGION/CITY'. Defaults to the zone of every site
+            from the timezone index (see `tzindex.default_index`), or
+            the local timezone for all sites without an index.
+        cloud_coverage (array_like, optional): Cloud coverage in %,
+            one value for all sites or one per site. Defaults to 0.
+        ephemeris_cache (ephemeris.EphemerisCache, optional):
+            Cache for the day-level values.
+            Defaults to ephemeris.default_cache.
+        elevation (array_like, optional): Site elevations in metres for
+            the air mass. Defaults to the DEM elevations of the sites
+            (see `dem.elevation_at`), or 0 without DEM tiles.
+
+    All properties return arrays with the broadcast shape
+    of latitude and longitude.
+    """
+
+    def __init__(self,
+                 latitude,
+                 longitude,
+                 time=None,
+                 timezone: str = None,
+                 cloud_coverage=None,
+                 ephemeris_cache: ephemeris.EphemerisCache = None,
+                 elevation=None
+                 ):
+        self.latitude, self.longitude = np.broadcast_arrays(
+            np.asarray(latitude, dtype=float),
+            np.asarray(longitude, dtype=float))
+        self.time = np.datetime64(
+            time if time is not None else datetime.datetime.now(), 's')
+        _index = tzindex.default_index() if timezone is None else None
+        if _index is not None:
+            self.timezone = None
+            self.timezones = _index.timezones_at(self.latitude,
+                                                 self.longitude)
+        else:
+            self.timezone = solarseries.get_timezone(timezone)
+            self.timezones = np.full(self.latitude.shape, self.timezone.zone,
+                                     dtype=object)
+        self.cloud_coverage = np.broadcast_to(np.asarray(
+            cloud_coverage if cloud_coverage is not None else 0,
+            dtype=float), self.latitude.shape)
+        self.ephemeris_cache = ephemeris_cache if ephemeris_cache is not None\
+            else ephemeris.default_cache
+        if elevation is None:
+            elevation = dem.elevation_at(self.latitude, self.longitude)
+        self.elevation = np.broadcast_to(np.nan_to_num(np.asarray(
+            elevation if elevation is not None else 0, dtype=float)),
+            self.latitude.shape)
+        logging.info(f"solar batch for {self.latitude.size} sites")
+
+    @functools.cached_property
+    def day(self):
+        return self.time.astype('datetime64[D]')
+
+    @functools.cached_property
+    def hour(self):
+        return float((self.time - self.day) / np.timedelta64(1, 'h'))
+
+    @functools.cached_property
+    def utc_time_delta(self):
+        """
+        UTC offset in hours, one value for a common timezone,
+        otherwise an array with the zone of every site.
+        """
+        if self.timezone is not None:
+            return float(solarseries.utc_offset_hours(self.time,
+                                                      self.timezone))
+        _zones, _inverse = np.unique(self.timezones.ravel(),
+                                     return_inverse=True)
+        _offsets = np.array([float(solarseries.utc_offset_hours(
+            self.time, solarseries.get_timezone(_zone))) for _zone in _zones])
+        return _offsets[_inverse].reshape(self.timezones.shape)
+
+    @functools.cached_property
+    def ephemeris(self):
+        _day = self.day.astype(object)
+        return self.ephemeris_cache.get(_day.year,
+                                        _day.timetuple().tm_yday)
+
+    @functools.cached_property
+    def hour_angle_rad(self):
+        return solarseries.hour_angle(self.hour,
+                                      self.longitude,
+                                      self.utc_time_delta,
+                                      self.ephemeris.equation_of_time_rad)
+
+    @functools.cached_property
+    def altitude(self):
+        return solarseries.solar_altitude(
+            self.latitude,
+            self.hour_angle_rad,
+            self.ephemeris.declination_angle_rad)
+
+    @functools.cached_property
+    def solar_azimuth(self):
+        return solarseries.solar_azimuth_angle(
+            self.latitude,
+            self.altitude,
+            self.hour_angle_rad,
+            self.ephemeris.declination_angle_rad)
+
+    @functools.cached_property
+    def sun_up(self):
+        _extr, _, _ = solarseries.sun_extreme_hour_angle(
+            self.latitude, self.ephemeris.declination_angle_rad)
+        _noon_hour = self.hour - (self.hour_angle_rad / np.radians(15))
+        _half_day_hours = _extr / np.radians(15)
+        return ((_noon_hour - _half_day_hours < self.hour) &
+                (self.hour < _noon_hour + _half_day_hours))
+
+    @functools.cached_property
+    def cloud_coefficients(self):
+        return solarseries.cloud_coefficients(
+            solarseries.clear_sky(self.cloud_coverage))
+
+    @functools.cached_property
+    def air_mass(self):
+        return solarseries.air_mass(self.altitude, self.elevation)
+
+    @functools.cached_property
+    def direct_illuminance(self):
+        _c, _, _, _ = self.cloud_coefficients
+        return solarseries.direct_illuminance(self.ephemeris.et_illuminance,
+                                              _c,
+                                              self.air_mass)
+
+    @functools.cached_property
+    def horizontal_illuminance(self):
+        return solarseries.horizontal_illuminance(self.direct_illuminance,
+                                                  self.altitude)
+
+    @functools.cached_property
+    def horizontal_sky_illuminance(self):
+        _, _A, _B, _C = self.cloud_coefficients
+        return solarseries.horizontal_sky_illuminance(self.altitude,
+                                                      _A, _B, _C)
+
+    @functools.cached_property
+    def daylight_illuminance(self):
+        return solarseries.daylight_illuminance(
+            self.horizontal_sky_illuminance,
+            self.horizontal_illuminance,
+            self.sun_up)
+
+    def illuminance(self) -> dict:
+        """
+        Return position and illuminance arrays of all sites at once.
+
+        Returns:
+            dict: altitude, solar_azimuth, direct_illuminance and
+            daylight_illuminance arrays.
+        """
+        return {
+            'altitude': self.altitude,
+            'solar_azimuth': self.solar_azimuth,
+            'direct_illuminance': self.direct_illuminance,
+            'daylight_illuminance': self.daylight_illuminance,
+        }
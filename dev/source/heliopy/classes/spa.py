@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""
+High-accuracy solar position (NREL Solar Position Algorithm).
+
+Implements the Solar Position Algorithm of Reda & Andreas
+(NREL/TP-560-34302, 2004/2008), which is accurate to about 0.0003°
+between the years -2000 and 6000. The periodic terms of the earth
+heliocentric position and of the nutation are stored as precomputed
+NumPy arrays, so a whole series of timestamps is evaluated with a
+few matrix operations.
+
+Functions:
+- delta_t: Estimate TT - UT1 in seconds for a decimal year.
+- solar_position: Solar position arrays for UTC timestamps.
+- benchmark: Compare accuracy and speed with the solardata.Sun formulas.
+
+Run `python -m classes.spa` from the heliopy directory for a benchmark.
+"""
+import collections
+import logging
+import time
+import numpy as np
+
+
+# earth periodic terms as rows of (A, B, C): A * cos(B + C * JME)
+L_TERMS = (
+    np.array([
+        [175347046.0, 0.0, 0.0],
+        [3341656.0, 4.6692568, 6283.07585],
+        [34894.0, 4.6261, 12566.1517],
+        [3497.0, 2.7441, 5753.3849],
+        [3418.0, 2.8289, 3.5231],
+        [3136.0, 3.6277, 77713.7715],
+        [2676.0, 4.4181, 7860.4194],
+        [2343.0, 6.1352, 3930.2097],
+        [1324.0, 0.7425, 11506.7698],
+        [1273.0, 2.0371, 529.691],
+        [1199.0, 1.1096, 1577.3435],
+        [990.0, 5.233, 5884.927],
+        [902.0, 2.045, 26.298],
+        [857.0, 3.508, 398.149],
+        [780.0, 1.179, 5223.694],
+        [753.0, 2.533, 5507.553],
+        [505.0, 4.583, 18849.228],
+        [492.0, 4.205, 775.523],
+        [357.0, 2.92, 0.067],
+        [317.0, 5.849, 11790.629],
+        [284.0, 1.899, 796.298],
+        [271.0, 0.315, 10977.079],
+        [243.0, 0.345, 5486.778],
+        [206.0, 4.806, 2544.314],
+        [205.0, 1.869, 5573.143],
+        [202.0, 2.458, 6069.777],
+        [156.0, 0.833, 213.299],
+        [132.0, 3.411, 2942.463],
+        [126.0, 1.083, 20.775],
+        [115.0, 0.645, 0.98],
+        [103.0, 0.636, 4694.003],
+        [102.0, 0.976, 15720.839],
+        [102.0, 4.267, 7.114],
+        [99.0, 6.21, 2146.17],
+        [98.0, 0.68, 155.42],
+        [86.0, 5.98, 161000.69],
+        [85.0, 1.3, 6275.96],
+        [85.0, 3.67, 71430.7],
+        [80.0, 1.81, 17260.15],
+        [79.0, 3.04, 12036.46],
+        [75.0, 1.76, 5088.63],
+        [74.0, 3.5, 3154.69],
+        [74.0, 4.68, 801.82],
+        [70.0, 0.83, 9437.76],
+        [62.0, 3.98, 8827.39],
+        [61.0, 1.82, 7084.9],
+        [57.0, 2.78, 6286.6],
+        [56.0, 4.39, 14143.5],
+        [56.0, 3.47, 6279.55],
+        [52.0, 0.19, 12139.55],
+        [52.0, 1.33, 1748.02],
+        [51.0, 0.28, 5856.48],
+        [49.0, 0.49, 1194.45],
+        [41.0, 5.37, 8429.24],
+        [41.0, 2.4, 19651.05],
+        [39.0, 6.17, 10447.39],
+        [37.0, 6.04, 10213.29],
+        [37.0, 2.57, 1059.38],
+        [36.0, 1.71, 2352.87],
+        [36.0, 1.78, 6812.77],
+        [33.0, 0.59, 17789.85],
+        [30.0, 0.44, 83996.85],
+        [30.0, 2.74, 1349.87],
+        [25.0, 3.16, 4690.48]]),
+    np.array([
+        [628331966747.0, 0.0, 0.0],
+        [206059.0, 2.678235, 6283.07585],
+        [4303.0, 2.6351, 12566.1517],
+        [425.0, 1.59, 3.523],
+        [119.0, 5.796, 26.298],
+        [109.0, 2.966, 1577.344],
+        [93.0, 2.59, 18849.23],
+        [72.0, 1.14, 529.69],
+        [68.0, 1.87, 398.15],
+        [67.0, 4.41, 5507.55],
+        [59.0, 2.89, 5223.69],
+        [56.0, 2.17, 155.42],
+        [45.0, 0.4, 796.3],
+        [36.0, 0.47, 775.52],
+        [29.0, 2.65, 7.11],
+        [21.0, 5.34, 0.98],
+        [19.0, 1.85, 5486.78],
+        [19.0, 4.97, 213.3],
+        [17.0, 2.99, 6275.96],
+        [16.0, 0.03, 2544.31],
+        [16.0, 1.43, 2146.17],
+        [15.0, 1.21, 10977.08],
+        [12.0, 2.83, 1748.02],
+        [12.0, 3.26, 5088.63],
+        [12.0, 5.27, 1194.45],
+        [12.0, 2.08, 4694.0],
+        [11.0, 0.77, 553.57],
+        [10.0, 1.3, 6286.6],
+        [10.0, 4.24, 1349.87],
+        [9.0, 2.7, 242.73],
+        [9.0, 5.64, 951.72],
+        [8.0, 5.3, 2352.87],
+        [6.0, 2.65, 9437.76],
+        [6.0, 4.67, 4690.48]]),
+    np.array([
+        [52919.0, 0.0, 0.0],
+        [8720.0, 1.0721, 6283.0758],
+        [309.0, 0.867, 12566.152],
+        [27.0, 0.05, 3.52],
+        [16.0, 5.19, 26.3],
+        [16.0, 3.68, 155.42],
+        [10.0, 0.76, 18849.23],
+        [9.0, 2.06, 77713.77],
+        [7.0, 0.83, 775.52],
+        [5.0, 4.66, 1577.34],
+        [4.0, 1.03, 7.11],
+        [4.0, 3.44, 5573.14],
+        [3.0, 5.14, 796.3],
+        [3.0, 6.05, 5507.55],
+        [3.0, 1.19, 242.73],
+        [3.0, 6.12, 529.69],
+        [3.0, 0.31, 398.15],
+        [3.0, 2.28, 553.57],
+        [2.0, 4.38, 5223.69],
+        [2.0, 3.75, 0.98]]),
+    np.array([
+        [289.0, 5.844, 6283.076],
+        [35.0, 0.0, 0.0],
+        [17.0, 5.49, 12566.15],
+        [3.0, 5.2, 155.42],
+        [1.0, 4.72, 3.52],
+        [1.0, 5.3, 18849.23],
+        [1.0, 5.97, 242.73]]),
+    np.array([
+        [114.0, 3.142, 0.0],
+        [8.0, 4.13, 6283.08],
+        [1.0, 3.84, 12566.15]]),
+    np.array([
+        [1.0, 3.14, 0.0]]),
+)
+
+B_TERMS = (
+    np.array([
+        [280.0, 3.199, 84334.662],
+        [102.0, 5.422, 5507.553],
+        [80.0, 3.88, 5223.69],
+        [44.0, 3.7, 2352.87],
+        [32.0, 4.0, 1577.34]]),
+    np.array([
+        [9.0, 3.9, 5507.55],
+        [6.0, 1.73, 5223.69]]),
+)
+
+R_TERMS = (
+    np.array([
+        [100013989.0, 0.0, 0.0],
+        [1670700.0, 3.0984635, 6283.07585],
+        [13956.0, 3.05525, 12566.1517],
+        [3084.0, 5.1985, 77713.7715],
+        [1628.0, 1.1739, 5753.3849],
+        [1576.0, 2.8469, 7860.4194],
+        [925.0, 5.453, 11506.77],
+        [542.0, 4.564, 3930.21],
+        [472.0, 3.661, 5884.927],
+        [346.0, 0.964, 5507.553],
+        [329.0, 5.9, 5223.694],
+        [307.0, 0.299, 5573.143],
+        [243.0, 4.273, 11790.629],
+        [212.0, 5.847, 1577.344],
+        [186.0, 5.022, 10977.079],
+        [175.0, 3.012, 18849.228],
+        [110.0, 5.055, 5486.778],
+        [98.0, 0.89, 6069.78],
+        [86.0, 5.69, 15720.84],
+        [86.0, 1.27, 161000.69],
+        [65.0, 0.27, 17260.15],
+        [63.0, 0.92, 529.69],
+        [57.0, 2.01, 83996.85],
+        [56.0, 5.24, 71430.7],
+        [49.0, 3.25, 2544.31],
+        [47.0, 2.58, 775.52],
+        [45.0, 5.54, 9437.76],
+        [43.0, 6.01, 6275.96],
+        [39.0, 5.36, 4694.0],
+        [38.0, 2.39, 8827.39],
+        [37.0, 0.83, 19651.05],
+        [37.0, 4.9, 12139.55],
+        [36.0, 1.67, 12036.46],
+        [35.0, 1.84, 2942.46],
+        [33.0, 0.24, 7084.9],
+        [32.0, 0.18, 5088.63],
+        [32.0, 1.78, 398.15],
+        [28.0, 1.21, 6286.6],
+        [28.0, 1.9, 6279.55],
+        [26.0, 4.59, 10447.39]]),
+    np.array([
+        [103019.0, 1.10749, 6283.07585],
+        [1721.0, 1.0644, 12566.1517],
+        [702.0, 3.142, 0.0],
+        [32.0, 1.02, 18849.23],
+        [31.0, 2.84, 5507.55],
+        [25.0, 1.32, 5223.69],
+        [18.0, 1.42, 1577.34],
+        [10.0, 5.91, 10977.08],
+        [9.0, 1.42, 6275.96],
+        [9.0, 0.27, 5486.78]]),
+    np.array([
+        [4359.0, 5.7846, 6283.0758],
+        [124.0, 5.579, 12566.152],
+        [12.0, 3.14, 0.0],
+        [9.0, 3.63, 77713.77],
+        [6.0, 1.87, 5573.14],
+        [3.0, 5.47, 18849.23]]),
+    np.array([
+        [145.0, 4.273, 6283.076],
+        [7.0, 3.92, 12566.15]]),
+    np.array([
+        [4.0, 2.56, 6283.08]]),
+)
+
+# nutation: multiples of X0..X4 in the argument of every term
+NUTATION_Y_TERMS = np.array([
+    [0, 0, 0, 0, 1],
+    [-2, 0, 0, 2, 2],
+    [0, 0, 0, 2, 2],
+    [0, 0, 0, 0, 2],
+    [0, 1, 0, 0, 0],
+    [0, 0, 1, 0, 0],
+    [-2, 1, 0, 2, 2],
+    [0, 0, 0, 2, 1],
+    [0, 0, 1, 2, 2],
+    [-2, -1, 0, 2, 2],
+    [-2, 0, 1, 0, 0],
+    [-2, 0, 0, 2, 1],
+    [0, 0, -1, 2, 2],
+    [2, 0, 0, 0, 0],
+    [0, 0, 1, 0, 1],
+    [2, 0, -1, 2, 2],
+    [0, 0, -1, 0, 1],
+    [0, 0, 1, 2, 1],
+    [-2, 0, 2, 0, 0],
+    [0, 0, -2, 2, 1],
+    [2, 0, 0, 2, 2],
+    [0, 0, 2, 2, 2],
+    [0, 0, 2, 0, 0],
+    [-2, 0, 1, 2, 2],
+    [0, 0, 0, 2, 0],
+    [-2, 0, 0, 2, 0],
+    [0, 0, -1, 2, 1],
+    [0, 2, 0, 0, 0],
+    [2, 0, -1, 0, 1],
+    [-2, 2, 0, 2, 2],
+    [0, 1, 0, 0, 1],
+    [-2, 0, 1, 0, 1],
+    [0, -1, 0, 0, 1],
+    [0, 0, 2, -2, 0],
+    [2, 0, -1, 2, 1],
+    [2, 0, 1, 2, 2],
+    [0, 1, 0, 2, 2],
+    [-2, 1, 1, 0, 0],
+    [0, -1, 0, 2, 2],
+    [2, 0, 0, 2, 1],
+    [2, 0, 1, 0, 0],
+    [-2, 0, 2, 2, 2],
+    [-2, 0, 1, 2, 1],
+    [2, 0, -2, 0, 1],
+    [2, 0, 0, 0, 1],
+    [0, -1, 1, 0, 0],
+    [-2, -1, 0, 2, 1],
+    [-2, 0, 0, 0, 1],
+    [0, 0, 2, 2, 1],
+    [-2, 0, 2, 0, 1],
+    [-2, 1, 0, 2, 1],
+    [0, 0, 1, -2, 0],
+    [-1, 0, 1, 0, 0],
+    [-2, 1, 0, 0, 0],
+    [1, 0, 0, 0, 0],
+    [0, 0, 1, 2, 0],
+    [0, 0, -2, 2, 2],
+    [-1, -1, 1, 0, 0],
+    [0, 1, 1, 0, 0],
+    [0, -1, 1, 2, 2],
+    [2, -1, -1, 2, 2],
+    [0, 0, 3, 2, 2],
+    [2, -1, 0, 2, 2]], dtype=float)
+
+# nutation coefficients (a, b, c, d) of every term, in 0.0001 arcseconds
+NUTATION_ABCD = np.array([
+    [-171996, -174.2, 92025, 8.9],
+    [-13187, -1.6, 5736, -3.1],
+    [-2274, -0.2, 977, -0.5],
+    [2062, 0.2, -895, 0.5],
+    [1426, -3.4, 54, -0.1],
+    [712, 0.1, -7, 0],
+    [-517, 1.2, 224, -0.6],
+    [-386, -0.4, 200, 0],
+    [-301, 0, 129, -0.1],
+    [217, -0.5, -95, 0.3],
+    [-158, 0, 0, 0],
+    [129, 0.1, -70, 0],
+    [123, 0, -53, 0],
+    [63, 0, 0, 0],
+    [63, 0.1, -33, 0],
+    [-59, 0, 26, 0],
+    [-58, -0.1, 32, 0],
+    [-51, 0, 27, 0],
+    [48, 0, 0, 0],
+    [46, 0, -24, 0],
+    [-38, 0, 16, 0],
+    [-31, 0, 13, 0],
+    [29, 0, 0, 0],
+    [29, 0, -12, 0],
+    [26, 0, 0, 0],
+    [-22, 0, 0, 0],
+    [21, 0, -10, 0],
+    [17, -0.1, 0, 0],
+    [16, 0, -8, 0],
+    [-16, 0.1, 7, 0],
+    [-15, 0, 9, 0],
+    [-13, 0, 7, 0],
+    [-12, 0, 6, 0],
+    [11, 0, 0, 0],
+    [-10, 0, 5, 0],
+    [-8, 0, 3, 0],
+    [7, 0, -3, 0],
+    [-7, 0, 0, 0],
+    [-7, 0, 3, 0],
+    [-7, 0, 3, 0],
+    [6, 0, 0, 0],
+    [6, 0, -3, 0],
+    [6, 0, -3, 0],
+    [-6, 0, 3, 0],
+    [-6, 0, 3, 0],
+    [5, 0, 0, 0],
+    [-5, 0, 3, 0],
+    [-5, 0, 3, 0],
+    [-5, 0, 3, 0],
+    [4, 0, 0, 0],
+    [4, 0, 0, 0],
+    [4, 0, 0, 0],
+    [-4, 0, 0, 0],
+    [-4, 0, 0, 0],
+    [-4, 0, 0, 0],
+    [3, 0, 0, 0],
+    [-3, 0, 0, 0],
+    [-3, 0, 0, 0],
+    [-3, 0, 0, 0],
+    [-3, 0, 0, 0],
+    [-3, 0, 0, 0],
+    [-3, 0, 0, 0],
+    [-3, 0, 0, 0]], dtype=float)
+
+# polynomial coefficients of the fundamental arguments X0..X4 in
+# degrees, by powers of JCE (last column divides JCE**3)
+NUTATION_ARGUMENTS = np.array([
+    [297.85036, 445267.111480, -0.0019142, 1/189474],
+    [357.52772, 35999.050340, -0.0001603, -1/300000],
+    [134.96298, 477198.867398, 0.0086972, 1/56250],
+    [93.27191, 483202.017538, -0.0036825, 1/327270],
+    [125.04452, -1934.136261, 0.0020708, 1/450000]])
+
+# mean obliquity of the ecliptic in arcseconds, by powers of JME/10
+OBLIQUITY = np.array([84381.448, -4680.93, -1.55, 1999.25, -51.38,
+                      -249.67, -39.05, 7.12, 27.87, 5.79, 2.45])
+
+SolarPosition = collections.namedtuple(
+    'SolarPosition',
+    ['altitude', 'apparent_altitude', 'solar_azimuth', 'hour_angle_rad',
+     'declination_angle_rad', 'equation_of_time'])
+
+CHUNK_SIZE = 65536
+
+
+def delta_t(year):
+    """
+    Estimate the difference TT - UT1 in seconds for a decimal year
+    (polynomials of Espenak & Meeus, valid 1986-2150).
+    """
+    _year = np.asarray(year, dtype=float)
+    _t = _year - 2000
+    _u = (_year - 1820) / 100
+    return np.select(
+        [_year < 2005, _year < 2050, _year < 2150],
+        [63.86 + 0.3345 * _t - 0.060374 * _t**2 + 0.0017275 * _t**3
+         + 0.000651814 * _t**4 + 0.00002373599 * _t**5,
+         62.92 + 0.32217 * _t + 0.005589 * _t**2,
+         -20 + 32 * _u**2 - 0.5628 * (2150 - _year)],
+        -20 + 32 * _u**2)
+
+
+def _heliocentric(terms, jme):
+    """
+    Sum the periodic terms of one heliocentric quantity
+    for every JME, returns the value divided by 10^8.
+    """
+    _sum = np.zeros(jme.shape)
+    for _power, _table in enumerate(terms):
+        _series = _table[:, 0] @ np.cos(
+            _table[:, 1, None] + _table[:, 2, None] * jme[None, :])
+        _sum += _series * jme**_power
+    return _sum / 1e8
+
+
+def _solar_position(jd, latitude, longitude, elevation,
+                    pressure, temperature, delta_t_seconds):
+    _jde = jd + delta_t_seconds / 86400
+    _jc = (jd - 2451545) / 36525
+    _jce = (_jde - 2451545) / 36525
+    _jme = _jce / 10
+
+    _l_deg = np.degrees(_heliocentric(L_TERMS, _jme)) % 360
+    _b_deg = np.degrees(_heliocentric(B_TERMS, _jme))
+    _r_au = _heliocentric(R_TERMS, _jme)
+    _theta = (_l_deg + 180) % 360
+    _beta = -_b_deg
+
+    _jce_powers = np.stack([np.ones_like(_jce), _jce, _jce**2, _jce**3])
+    _x = NUTATION_ARGUMENTS @ _jce_powers
+    _arguments = np.radians(NUTATION_Y_TERMS @ _x)
+    _a, _b, _c, _d = NUTATION_ABCD.T
+    _delta_psi = ((_a[:, None] + _b[:, None] * _jce) * np.sin(
+        _arguments)).sum(axis=0) / 36000000
+    _delta_epsilon = ((_c[:, None] + _d[:, None] * _jce) * np.cos(
+        _arguments)).sum(axis=0) / 36000000
+
+    _u = _jme / 10
+    _epsilon0 = np.polynomial.polynomial.polyval(_u, OBLIQUITY)
+    _epsilon = _epsilon0 / 3600 + _delta_epsilon
+    _epsilon_rad = np.radians(_epsilon)
+
+    _lambda = _theta + _delta_psi - 20.4898 / (3600 * _r_au)
+    _lambda_rad = np.radians(_lambda)
+    _beta_rad = np.radians(_beta)
+
+    _nu0 = (280.46061837 + 360.98564736629 * (jd - 2451545)
+            + 0.000387933 * _jc**2 - _jc**3 / 38710000) % 360
+    _nu = _nu0 + _delta_psi * np.cos(_epsilon_rad)
+
+    _alpha = np.degrees(np.arctan2(
+        np.sin(_lambda_rad) * np.cos(_epsilon_rad)
+        - np.tan(_beta_rad) * np.sin(_epsilon_rad),
+        np.cos(_lambda_rad))) % 360
+    _delta_rad = np.arcsin(
+        np.sin(_beta_rad) * np.cos(_epsilon_rad)
+        + np.cos(_beta_rad) * np.sin(_epsilon_rad) * np.sin(_lambda_rad))
+
+    _h_rad = np.radians((_nu + longitude - _alpha) % 360)
+    _lat_rad = np.radians(latitude)
+    _xi_rad = np.radians(8.794 / (3600 * _r_au))
+    _u_rad = np.arctan(0.99664719 * np.tan(_lat_rad))
+    _x_term = np.cos(_u_rad) + elevation / 6378140 * np.cos(_lat_rad)
+    _y_term = 0.99664719 * np.sin(_u_rad) + elevation / 6378140 * np.sin(
+        _lat_rad)
+    _delta_alpha_rad = np.arctan2(
+        -_x_term * np.sin(_xi_rad) * np.sin(_h_rad),
+        np.cos(_delta_rad) - _x_term * np.sin(_xi_rad) * np.cos(_h_rad))
+    _delta_prime_rad = np.arctan2(
+        (np.sin(_delta_rad) - _y_term * np.sin(_xi_rad))
+        * np.cos(_delta_alpha_rad),
+        np.cos(_delta_rad) - _x_term * np.sin(_xi_rad) * np.cos(_h_rad))
+    _h_prime_rad = _h_rad - _delta_alpha_rad
+
+    _e0 = np.degrees(np.arcsin(
+        np.sin(_lat_rad) * np.sin(_delta_prime_rad)
+        + np.cos(_lat_rad) * np.cos(_delta_prime_rad) * np.cos(_h_prime_rad)))
+    _refraction = np.where(
+        _e0 >= -(0.26667 + 0.5667),
+        (pressure / 1010) * (283 / (273 + temperature))
+        * 1.02 / (60 * np.tan(np.radians(_e0 + 10.3 / (_e0 + 5.11)))),
+        0)
+    _gamma = np.degrees(np.arctan2(
+        np.sin(_h_prime_rad),
+        np.cos(_h_prime_rad) * np.sin(_lat_rad)
+        - np.tan(_delta_prime_rad) * np.cos(_lat_rad)))
+
+    _m = np.polynomial.polynomial.polyval(
+        _jme, [280.4664567, 360007.6982779, 0.03032028,
+               1/49931, -1/15300, -1/2000000]) % 360
+    _eot = (_m - 0.0057183 - _alpha + _delta_psi * np.cos(
+        _epsilon_rad)) % 360
+    _eot = np.where(_eot > 180, _eot - 360, _eot) * 4
+
+    return (_e0,
+            _e0 + _refraction,
+            (_gamma + 180) % 360,
+            np.arctan2(np.sin(_h_prime_rad), np.cos(_h_prime_rad)),
+            _delta_prime_rad,
+            _eot)
+
+
+def solar_position(utc_times,
+                   latitude,
+                   longitude,
+                   elevation=0.0,
+                   pressure=1013.25,
+                   temperature=12.0,
+                   delta_t_seconds=None) -> SolarPosition:
+    """
+    Calculate the solar position with the NREL SPA.
+
+    Args:
+        utc_times: UTC timestamps as datetime64 (array or scalar).
+        latitude: Site latitude in degrees.
+        longitude: Site longitude in degrees (east positive).
+        elevation: Site elevation in meters.
+        pressure: Annual average air pressure in hPa.
+        temperature: Annual average temperature in °C.
+        delta_t_seconds (optional): TT - UT1 in seconds.
+            Estimated with `delta_t` if not provided.
+
+    Returns:
+        SolarPosition: arrays with the broadcast shape of the inputs.
+        altitude is topocentric without refraction, apparent_altitude
+        includes it, solar_azimuth is measured from north (0-360),
+        hour_angle_rad (-pi to pi) and declination_angle_rad are
+        topocentric and equation_of_time is in minutes.
+    """
+    _times = np.asarray(utc_times, dtype='datetime64[ns]')
+    _times, _latitude, _longitude, _elevation, _pressure, _temperature = \
+        np.broadcast_arrays(_times, latitude, longitude, elevation,
+                            pressure, temperature)
+    _shape = _times.shape
+    _jd = _times.ravel().astype('int64') / 8.64e13 + 2440587.5
+    if delta_t_seconds is None:
+        _delta_t = delta_t(2000 + (_jd - 2451544.5) / 365.25)
+    else:
+        _delta_t = np.broadcast_to(delta_t_seconds, _shape).ravel()
+    _columns = [np.asarray(_column, dtype=float).ravel() for _column in
+                (_latitude, _longitude, _elevation, _pressure, _temperature)]
+    _results = [
+        _solar_position(_jd[_slice], *(_column[_slice] for _column in _columns),
+                        _delta_t[_slice])
+        for _slice in (slice(_start, _start + CHUNK_SIZE)
+                       for _start in range(0, _jd.size, CHUNK_SIZE))]
+    logging.info(f"calculated SPA solar position for {_jd.size} timestamps")
+    if not _results:
+        return SolarPosition(*(np.empty(_shape) for _ in SolarPosition._fields))
+    return SolarPosition(*(np.concatenate(_parts).reshape(_shape)
+                           for _parts in zip(*_results)))
+
+
+def benchmark(latitude: float = 48.2,
+              longitude: float = 16.37,
+              timezone: str = 'Europe/Vienna',
+              year: int = 2024) -> dict:
+    """
+    Compare the SPA with the solardata.Sun formulas
+    (as vectorized in solarseries) for an hourly year.
+
+    Returns:
+        dict: points per second of both engines and the mean and
+        maximum absolute difference of altitude and azimuth
+        while the sun is up.
+    """
+    import types
+    from classes import solarseries
+
+    _site = types.SimpleNamespace(latitude=latitude, longitude=longitude)
+    _times = solarseries.time_range(f"{year}-01-01", f"{year + 1}-01-01")
+    _start = time.perf_counter()
+    _simple = solarseries.SunSeries(_site, _times, timezone=timezone)
+    _simple.positions()
+    _simple_seconds = time.perf_counter() - _start
+    _start = time.perf_counter()
+    _precise = solarseries.SunSeries(_site, _times, timezone=timezone,
+                                     engine='spa')
+    _precise.positions()
+    _spa_seconds = time.perf_counter() - _start
+    _up = _precise.altitude > 0
+    _altitude_error = np.abs(_simple.altitude - _precise.altitude)[_up]
+    # the simple engine folds afternoon azimuths onto 0-180
+    _azimuth = np.where(_precise.solar_azimuth > 180,
+                        360 - _precise.solar_azimuth, _precise.solar_azimuth)
+    _azimuth_error = np.abs(_simple.solar_azimuth - _azimuth)[_up]
+    return {
+        'points': _times.size,
+        'simple_points_per_second': _times.size / _simple_seconds,
+        'spa_points_per_second': _times.size / _spa_seconds,
+        'altitude_error_mean': float(_altitude_error.mean()),
+        'altitude_error_max': float(_altitude_error.max()),
+        'azimuth_error_mean': float(_azimuth_error.mean()),
+        'azimuth_error_max': float(_azimuth_error.max()),
+    }
+
+
+if __name__ == "__main__":
+    for _key, _value in benchmark().items():
+        print(f"{_key}: {_value:,.4f}")
@@ -9,19 +9,23 @@ import re
 import functools
 import tzlocal
 import pytz
+from classes import tzindex
 
 
 def updater(func):
+    """
+    Decorator for the setters of Time:
+    resets the cached attributes listed in `dependent_attributes`
+    and increases `revision`, so that objects depending on this
+    Time (e.g. solardata.Sun) know their cached values are stale.
+    """
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        print("wrapper start")
         method = func(self, *args, **kwargs)
-        print(f"method {func} called")
-        for level in self.dependent_attributes.keys():
+        for level in sorted(self.dependent_attributes.keys()):
             for attr in self.dependent_attributes[level]:
-                setattr(self, attr, None)
-                raise AttributeError(f"The {attr} is None.")\
-                    if getattr(self, attr) else None
+                setattr(self, f"_{attr}", None)
+        self.revision += 1
         return method
     return wrapper
 
@@ -31,16 +35,32 @@ class Time:
                  time_input=None,
                  day_input: str = None,
                  timezone_input: str = None,
+                 location=None,
                  ):
+        """
+        Args:
+            time_input (optional): Local time as 'HH:MM:SS' or 'HH:MM'.
+                Defaults to the current time.
+            day_input (str, optional): Local day as 'YYYY-MM-DD'.
+                Defaults to the current day.
+            timezone_input (str, optional): Timezone as 'REGION/CITY'.
+                Defaults to the timezone at the coordinates of location
+                (see `tzindex`), or the local timezone.
+            location (geodata.Geo, optional): Site whose latitude and
+                longitude give the default timezone.
+        """
         self.init_complete = False
+        self.location = location
+        self.dependent_attributes = {}
+        self.revision = 0
+        self._date = None
+        self._utc_time = None
+        self._day_tzinfo = None
         self.time = None if time_input is None else time_input
         self.day = day_input
         self.timezone = timezone_input
-        self.dependent_attributes = {}
         self.init_complete = True
-        self._date = None
-        self._utc_time = None
-                
+
     def append_dependent(self, level, attribute):
         _dic = self.dependent_attributes
         if level not in _dic:
@@ -55,8 +75,8 @@ class Time:
         """
         return self._time
     
-   # @updater
     @time.setter
+    @updater
     def time(self, value):
         """
         Sets the time property.
@@ -92,12 +112,11 @@ class Time:
     def day(self):
         return self._day
     
- #  @updater
     @day.setter
+    @updater
     def day(self, value):
         if value is not None:
-            print(f"value is not None, value is {value}")
-            print(type(value)) 
+            logging.debug(f"setting day to {value!r}")
             self._day = self.convert_daystr(value)
         else:
             self._day = self.current_day
@@ -111,21 +130,51 @@ class Time:
             '^\d{4}\-(0[1-9]|1[012])\-(0[1-9]|[12][0-9]|3[01])$')
         if re_yyyymmdd.match(day_string) is None:
             raise ValueError("Date is not in yyyy-mm-dd format")
-        return datetime.datetime.time(datetime.datetime.strptime(
-            day_string, "%y-%m-%d"))
+        return datetime.datetime.date(datetime.datetime.strptime(
+            day_string, "%Y-%m-%d"))
+
+    @updater
+    def set_instant(self, value):
+        """
+        Sets day and time at once.
+        Only the cached values are reset, so objects depending on
+        this Time can keep everything that depends on the day alone
+        if the day did not change.
+        Args:
+            value: The new local date and time as naive datetime
+                or as string in 'YYYY-MM-DD HH:MM:SS' format.
+        """
+        if isinstance(value, str):
+            _day_string, _, _time_string = value.strip().partition(' ')
+            value = datetime.datetime.combine(
+                self.convert_daystr(_day_string),
+                self.convert_timestr(_time_string))
+        self._day = value.date()
+        self._time = value.time()
+
+    def advance(self, delta):
+        """
+        Moves the time forward by delta (negative values move it back).
+        Args:
+            delta: datetime.timedelta or number of seconds.
+        """
+        if not isinstance(delta, datetime.timedelta):
+            delta = datetime.timedelta(seconds=delta)
+        self.set_instant(datetime.datetime.combine(self.day, self.time) + delta)
 
     @property
     def timezone(self):
         return self._timezone
     
-  #  @updater
     @timezone.setter
+    @updater
     def timezone(self, value):
+        if value is None and self.location is not None:
+            value = tzindex.timezone_at(self.location.latitude,
+                                        self.location.longitude)
         _timezone_set = value if value is not None else tzlocal.get_localzone().key
         self._timezone = _timezone_set if isinstance(
             _timezone_set, pytz.BaseTzInfo) else pytz.timezone(_timezone_set)
-        # self._date = None
-        # self.__refresh_date__ = self.date if self.init_complete else None
         
     @property
     def date(self):
@@ -135,8 +184,28 @@ class Time:
 
     @date.setter
     def date(self, value):
-        self._date = self.timezone.localize(value)
+        _tzinfo = self.day_tzinfo
+        self._date = value.replace(tzinfo=_tzinfo) if _tzinfo is not None\
+            else self.timezone.localize(value)
         self.append_dependent(1, 'date')
+
+    @property
+    def day_tzinfo(self):
+        """
+        Returns the tzinfo that is valid for the whole day, so times
+        of that day can be localized without a timezone lookup.
+        None if the UTC offset changes during the day.
+        """
+        _key = (self.day, self.timezone)
+        if self._day_tzinfo is None or self._day_tzinfo[0] != _key:
+            _start = self.timezone.localize(
+                datetime.datetime.combine(self.day, datetime.time.min))
+            _end = self.timezone.localize(
+                datetime.datetime.combine(self.day, datetime.time.max))
+            _tzinfo = _start.tzinfo if _start.utcoffset() == _end.utcoffset()\
+                else None
+            self._day_tzinfo = (_key, _tzinfo)
+        return self._day_tzinfo[1]
         
     @property
     def utc_time(self):
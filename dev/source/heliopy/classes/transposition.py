@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Plane-of-array transposition of direct, sky diffuse and ground
+reflected illuminance onto a tilted module.
+
+The kernels broadcast, so they work on the scalar values of
+`solardata.Sun` as well as on whole `solarseries.SunSeries` arrays
+and on (timestamps x orientations) grids. Unlike
+`Irradiance.module`, the results are plain illuminances in the units
+of the inputs.
+
+Functions:
+- cos_incidence: Cosine of the angle of incidence on the module.
+- isotropic: Sky diffuse on the module, isotropic sky.
+- hay_davies: Sky diffuse on the module, Hay-Davies model.
+- perez: Sky diffuse on the module, Perez 1990 model.
+- ground_reflected: Ground reflected illuminance on the module.
+- plane_of_array: All components with a selectable sky model.
+- series_plane_of_array: plane_of_array for a SunSeries.
+"""
+import collections
+import numpy as np
+from classes import solarseries
+
+
+MODELS = ('isotropic', 'haydavies', 'perez')
+
+# upper epsilon bound of the first seven Perez sky clearness bins
+PEREZ_EPSILON_BINS = np.array([1.065, 1.23, 1.5, 1.95, 2.8, 4.5, 6.2])
+
+# Perez et al. (1990), all sites composite; columns f11, f12, f13,
+# f21, f22, f23, one row per sky clearness bin
+PEREZ_COEFFICIENTS = np.array([
+    [-0.008, 0.588, -0.062, -0.060, 0.072, -0.022],
+    [0.130, 0.683, -0.151, -0.019, 0.066, -0.029],
+    [0.330, 0.487, -0.221, 0.055, -0.064, -0.026],
+    [0.568, 0.187, -0.295, 0.109, -0.152, -0.014],
+    [0.873, -0.392, -0.362, 0.226, -0.462, 0.001],
+    [1.132, -1.237, -0.412, 0.288, -0.823, 0.056],
+    [1.060, -1.600, -0.359, 0.264, -1.127, 0.131],
+    [0.678, -0.327, -0.250, 0.156, -1.377, 0.251]])
+
+PlaneOfArray = collections.namedtuple(
+    'PlaneOfArray', ['total', 'direct', 'sky_diffuse', 'ground_reflected'])
+
+
+def cos_incidence(altitude, azimuth, tilt, deg):
+    """
+    Cosine of the angle between the sun and the module normal.
+
+    Args:
+        altitude: The solar altitude in degrees.
+        azimuth: The solar azimuth in degrees.
+        tilt: The tilt angle of the module in degrees.
+        deg: The module orientation in degrees.
+    """
+    _alt_rad = np.radians(altitude)
+    _tilt_rad = np.radians(tilt)
+    return np.cos(_alt_rad) * np.sin(_tilt_rad) * np.cos(
+        np.radians(deg) - np.radians(azimuth)) + np.sin(
+            _alt_rad) * np.cos(_tilt_rad)
+
+
+def isotropic(sky, tilt):
+    """
+    Sky diffuse illuminance on the module for an isotropic sky.
+
+    Args:
+        sky: The horizontal sky (diffuse) illuminance.
+        tilt: The tilt angle of the module in degrees.
+    """
+    return sky * (1 + np.cos(np.radians(tilt))) / 2
+
+
+def hay_davies(sky, direct, et_illuminance, cos_incidence, altitude, tilt):
+    """
+    Sky diffuse illuminance on the module with the Hay-Davies model:
+    the circumsolar part, weighted by the anisotropy index
+    direct / et_illuminance, is projected like direct light,
+    the rest is isotropic.
+
+    Args:
+        sky: The horizontal sky (diffuse) illuminance.
+        direct: The direct (normal) illuminance.
+        et_illuminance: The extraterrestrial illuminance.
+        cos_incidence: See `cos_incidence`.
+        altitude: The solar altitude in degrees.
+        tilt: The tilt angle of the module in degrees.
+    """
+    _anisotropy = direct / et_illuminance
+    _projection = np.maximum(cos_incidence, 0) / np.maximum(
+        np.sin(np.radians(altitude)), np.cos(np.radians(89)))
+    return np.maximum(sky * (_anisotropy * _projection + (
+        1 - _anisotropy) * (1 + np.cos(np.radians(tilt))) / 2), 0)
+
+
+def perez(sky, direct, et_illuminance, cos_incidence, altitude, tilt,
+          air_mass):
+    """
+    Sky diffuse illuminance on the module with the Perez (1990) model
+    of circumsolar and horizon brightening. The coefficients are
+    looked up by sky clearness bin in PEREZ_COEFFICIENTS.
+
+    Args:
+        sky: The horizontal sky (diffuse) illuminance.
+        direct: The direct (normal) illuminance.
+        et_illuminance: The extraterrestrial illuminance.
+        cos_incidence: See `cos_incidence`.
+        altitude: The solar altitude in degrees.
+        tilt: The tilt angle of the module in degrees.
+        air_mass: The relative air mass, see `solarseries.air_mass`.
+    """
+    _zenith = np.radians(90 - np.asarray(altitude))
+    _kappa_z3 = 1.041 * _zenith ** 3
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _clearness = ((sky + direct) / sky + _kappa_z3) / (1 + _kappa_z3)
+    _brightness = sky * air_mass / et_illuminance
+    _f = np.moveaxis(PEREZ_COEFFICIENTS[np.digitize(
+        np.nan_to_num(_clearness, nan=1.0), PEREZ_EPSILON_BINS)], -1, 0)
+    _f1 = np.maximum(_f[0] + _f[1] * _brightness + _f[2] * _zenith, 0)
+    _f2 = _f[3] + _f[4] * _brightness + _f[5] * _zenith
+    _tilt_rad = np.radians(tilt)
+    _a = np.maximum(cos_incidence, 0)
+    _b = np.maximum(np.cos(_zenith), np.cos(np.radians(85)))
+    return np.maximum(sky * ((1 - _f1) * (1 + np.cos(_tilt_rad)) / 2
+                             + _f1 * _a / _b
+                             + _f2 * np.sin(_tilt_rad)), 0)
+
+
+def ground_reflected(global_horizontal, tilt, albedo=0.25):
+    """
+    Illuminance reflected by the ground onto the module.
+
+    Args:
+        global_horizontal: The global (direct + sky) horizontal
+            illuminance.
+        tilt: The tilt angle of the module in degrees.
+        albedo: The ground reflectance (0-1).
+    """
+    return global_horizontal * albedo * (1 - np.cos(np.radians(tilt))) / 2
+
+
+def plane_of_array(altitude,
+                   azimuth,
+                   direct,
+                   sky,
+                   et_illuminance,
+                   tilt,
+                   deg,
+                   model: str = 'perez',
+                   albedo=0.25) -> PlaneOfArray:
+    """
+    Transpose direct, sky diffuse and ground reflected illuminance
+    onto the module plane. All arguments broadcast against each other.
+    Every component is 0 while the sun is at or below the horizon,
+    direct light from behind the module counts as 0.
+
+    Args:
+        altitude: The solar altitude in degrees.
+        azimuth: The solar azimuth in degrees.
+        direct: The direct (normal) illuminance.
+        sky: The horizontal sky (diffuse) illuminance.
+        et_illuminance: The extraterrestrial illuminance.
+        tilt: The tilt angle of the module in degrees.
+        deg: The module orientation in degrees.
+        model (str): Sky model, one of MODELS.
+        albedo: The ground reflectance (0-1).
+
+    Returns:
+        PlaneOfArray: total, direct, sky diffuse and ground
+        reflected illuminance on the module.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Model must be one of {MODELS}")
+    _up = np.asarray(altitude) > 0
+    _direct = np.where(_up, np.nan_to_num(direct), 0.0)
+    _sky = np.where(_up, np.nan_to_num(sky), 0.0)
+    _cos = cos_incidence(altitude, azimuth, tilt, deg)
+    if model == 'isotropic':
+        _sky_diffuse = isotropic(_sky, tilt)
+    elif model == 'haydavies':
+        _sky_diffuse = hay_davies(_sky, _direct, et_illuminance, _cos,
+                                  altitude, tilt)
+    else:
+        with np.errstate(over='ignore', invalid='ignore'):
+            _air_mass = np.where(_up, solarseries.air_mass(altitude), 0.0)
+        _sky_diffuse = perez(_sky, _direct, et_illuminance, _cos, altitude,
+                             tilt, _air_mass)
+    _beam = _direct * np.maximum(_cos, 0)
+    _ground = ground_reflected(
+        _direct * np.maximum(np.sin(np.radians(altitude)), 0) + _sky,
+        tilt, albedo)
+    return PlaneOfArray(_beam + _sky_diffuse + _ground,
+                        _beam, _sky_diffuse, _ground)
+
+
+def series_plane_of_array(series: solarseries.SunSeries,
+                          tilt,
+                          deg,
+                          model: str = 'perez',
+                          albedo=0.25) -> PlaneOfArray:
+    """
+    Transpose the illuminance of a SunSeries onto the module plane,
+    see `plane_of_array`. tilt and deg broadcast against the
+    timestamps, e.g. times of shape (N, 1) and M orientations give
+    a (timestamps x orientations) result.
+    """
+    return plane_of_array(series.altitude,
+                          series.solar_azimuth,
+                          series.direct_illuminance,
+                          series.horizontal_sky_illuminance,
+                          series.et_illuminance,
+                          tilt,
+                          deg,
+                          model=model,
+                          albedo=albedo)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Shared sine and cosine tables for degree grids.
+
+Module orientations are searched on regular degree grids (see
+`Irradiance.angles_array`), so the same angles are evaluated over and
+over. The tables are built once per process: the integer degrees on
+import, finer grids on first use, with at most GRID_CACHE_SIZE
+finer grids kept.
+
+Functions:
+- sin_cos: Sine and cosine of a single angle in degrees.
+- grid_table: Sine and cosine of every step of a degree grid.
+- grid_axis: A range of a degree grid with its sine and cosine.
+"""
+import functools
+import math
+import numpy as np
+
+
+GRID_CACHE_SIZE = 8
+
+# integer degrees; float keys like 30.0 hash like 30 and hit as well
+SIN_COS_DEGREES = {
+    _angle: (math.sin(math.radians(_angle)), math.cos(math.radians(_angle)))
+    for _angle in range(-360, 361)}
+
+
+def sin_cos(degrees) -> tuple:
+    """
+    Return sine and cosine of an angle in degrees, from the table
+    for integer angles.
+    """
+    _values = SIN_COS_DEGREES.get(degrees)
+    if _values is None:
+        _rad = math.radians(degrees)
+        return math.sin(_rad), math.cos(_rad)
+    return _values
+
+
+@functools.lru_cache(maxsize=GRID_CACHE_SIZE)
+def grid_table(resolution: float = 1) -> tuple:
+    """
+    Return read-only sine and cosine arrays for the angles
+    0, resolution, 2 * resolution, ... below 360 degrees.
+    """
+    _steps = round(360 / resolution)
+    if not math.isclose(_steps * resolution, 360):
+        raise ValueError("Resolution must divide 360 degrees")
+    _rad = np.radians(np.arange(_steps) * (360 / _steps))
+    _sin, _cos = np.sin(_rad), np.cos(_rad)
+    _sin.flags.writeable = False
+    _cos.flags.writeable = False
+    return _sin, _cos
+
+
+def grid_axis(start: float, stop: float, resolution: float = 1) -> tuple:
+    """
+    Return the angles np.arange(start, stop, resolution) with their
+    sine and cosine. When start lies on the grid of the resolution
+    and the axis stays below 360 degrees, sine and cosine are slices
+    of `grid_table`; otherwise they are calculated.
+
+    Returns:
+        tuple: angles, sine and cosine arrays.
+    """
+    _angles = np.arange(start, stop, resolution)
+    _first = start / resolution
+    if 0 <= start and math.isclose(_first, round(_first), abs_tol=1e-9):
+        try:
+            _sin, _cos = grid_table(resolution)
+        except ValueError:
+            _sin = ()
+        _first = round(_first)
+        if _first + _angles.size <= len(_sin):
+            return (_angles, _sin[_first:_first + _angles.size],
+                    _cos[_first:_first + _angles.size])
+    _rad = np.radians(_angles)
+    return _angles, np.sin(_rad), np.cos(_rad)
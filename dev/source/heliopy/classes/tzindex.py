@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Offline timezone lookup from coordinates.
+
+The timezone polygons of a GeoJSON file such as timezone-boundary-
+builder's combined.json (properties.tzid, Polygon / MultiPolygon
+geometries, see https://github.com/evansiroky/timezone-boundary-builder)
+are compiled once into a directory of .npy files:
+
+- the polygon edges of every zone, split into 1 degree latitude bands
+  and sorted by band and zone,
+- one (zone, band) entry per zone that has edges in a band, with the
+  longitude range of those edges,
+- grid buckets: for every 1 x 1 degree cell the entries whose
+  longitude range overlaps the cell.
+
+A point is in a zone if an eastward ray from it crosses the zone's
+edges an odd number of times (holes and multi polygons included).
+Only edges spanning the latitude of the point can be crossed, and
+these are all in the band of the point, so a lookup tests the few
+candidate entries of its grid cell against the edges of one band.
+The arrays are memory-mapped on first use. Points in no zone (the
+sea, unless the dataset has ocean zones) get the nautical
+'Etc/GMT+-N' zone of their longitude.
+
+The shared index is built from `HELIOPY_TIMEZONES` (a GeoJSON file
+or a compiled index directory).
+
+Classes:
+- TimezoneIndex: Memory-mapped grid index of timezone polygons.
+
+Functions:
+- nautical_timezone: 'Etc/GMT+-N' zone of a longitude.
+- compile_index: Compile a timezone GeoJSON into an index directory.
+- default_index: The shared index from HELIOPY_TIMEZONES.
+- timezone_at: Timezone name of one point.
+"""
+import functools
+import json
+import logging
+import os
+import sys
+import time
+import numpy as np
+
+
+TIMEZONES_ENV = 'HELIOPY_TIMEZONES'
+INDEX_VERSION = 1
+ROWS = 180
+COLUMNS = 360
+
+ENTRY_DTYPE = np.dtype([
+    ('zone', 'i4'),
+    ('start', 'i8'),
+    ('stop', 'i8'),
+    ('west', 'f8'),
+    ('east', 'f8'),
+])
+
+
+def nautical_timezone(longitude: float) -> str:
+    """
+    Return the nautical timezone of a longitude, e.g. 'Etc/GMT-1'
+    for 15 degrees east (the Etc sign is inverted).
+    """
+    _offset = int(round(longitude / 15))
+    return 'Etc/GMT' if _offset == 0 else f'Etc/GMT{-_offset:+d}'
+
+
+def _rings(geometry: dict):
+    if geometry['type'] == 'Polygon':
+        yield from geometry['coordinates']
+    elif geometry['type'] == 'MultiPolygon':
+        for _polygon in geometry['coordinates']:
+            yield from _polygon
+
+
+def _row(latitude):
+    return np.clip(np.floor(np.asarray(latitude) + 90).astype(np.int64),
+                   0, ROWS - 1)
+
+
+def _column(longitude):
+    return np.clip(np.floor(np.asarray(longitude) + 180).astype(np.int64),
+                   0, COLUMNS - 1)
+
+
+def compile_index(source: str, target: str) -> str:
+    """
+    Compile a timezone GeoJSON file into an index directory of
+    edges.npy, entries.npy, cell_offsets.npy, cell_entries.npy,
+    zones.json and meta.json, see module docstring.
+
+    Returns:
+        str: The target directory.
+    """
+    _start = time.perf_counter()
+    with open(source, encoding='utf-8') as _file:
+        _features = json.load(_file)['features']
+    _zones = sorted({_f['properties']['tzid'] for _f in _features})
+    _zone_ids = {_zone: _id for _id, _zone in enumerate(_zones)}
+    _edges, _edge_zones = [], []
+    for _feature in _features:
+        for _ring in _rings(_feature['geometry']):
+            _points = np.asarray(_ring, dtype=float)[:, :2]
+            if not np.array_equal(_points[0], _points[-1]):
+                _points = np.vstack([_points, _points[:1]])
+            _edges.append(np.hstack([_points[:-1], _points[1:]]))
+            _edge_zones.append(np.full(len(_points) - 1,
+                                       _zone_ids[_feature['properties']['tzid']]))
+    _edges = np.vstack(_edges)
+    _edge_zones = np.concatenate(_edge_zones)
+    # an edge belongs to every latitude band it touches
+    _first = _row(np.minimum(_edges[:, 1], _edges[:, 3]))
+    _last = _row(np.maximum(_edges[:, 1], _edges[:, 3]))
+    _counts = _last - _first + 1
+    _index = np.repeat(np.arange(len(_edges)), _counts)
+    _rows = np.repeat(_first, _counts) + (
+        np.arange(_counts.sum()) - np.repeat(np.cumsum(_counts) - _counts,
+                                             _counts))
+    _zone = _edge_zones[_index]
+    _order = np.lexsort((_zone, _rows))
+    _index, _rows, _zone = _index[_order], _rows[_order], _zone[_order]
+    _band_edges = _edges[_index]
+    # one entry per (band, zone) run of edges
+    _breaks = np.flatnonzero((np.diff(_rows) != 0) | (np.diff(_zone) != 0)) + 1
+    _starts = np.concatenate([[0], _breaks])
+    _stops = np.concatenate([_breaks, [len(_index)]])
+    _west = np.minimum.reduceat(
+        np.minimum(_band_edges[:, 0], _band_edges[:, 2]), _starts)
+    _east = np.maximum.reduceat(
+        np.maximum(_band_edges[:, 0], _band_edges[:, 2]), _starts)
+    _entries = np.empty(len(_starts), dtype=ENTRY_DTYPE)
+    _entries['zone'] = _zone[_starts]
+    _entries['start'] = _starts
+    _entries['stop'] = _stops
+    _entries['west'] = _west
+    _entries['east'] = _east
+    # grid buckets over the longitude range of every entry
+    _entry_rows = _rows[_starts]
+    _west_column, _east_column = _column(_west), _column(_east)
+    _span = _east_column - _west_column + 1
+    _cell_entry = np.repeat(np.arange(len(_entries)), _span)
+    _cells = np.repeat(_entry_rows * COLUMNS + _west_column, _span) + (
+        np.arange(_span.sum()) - np.repeat(np.cumsum(_span) - _span, _span))
+    _order = np.argsort(_cells, kind='stable')
+    _cell_offsets = np.zeros(ROWS * COLUMNS + 1, dtype=np.int64)
+    np.cumsum(np.bincount(_cells, minlength=ROWS * COLUMNS),
+              out=_cell_offsets[1:])
+    os.makedirs(target, exist_ok=True)
+    np.save(os.path.join(target, 'edges.npy'), _band_edges)
+    np.save(os.path.join(target, 'entries.npy'), _entries)
+    np.save(os.path.join(target, 'cell_offsets.npy'), _cell_offsets)
+    np.save(os.path.join(target, 'cell_entries.npy'),
+            _cell_entry[_order].astype(np.int32))
+    with open(os.path.join(target, 'zones.json'), 'w', encoding='utf-8') as _file:
+        json.dump(_zones, _file)
+    with open(os.path.join(target, 'meta.json'), 'w', encoding='utf-8') as _file:
+        json.dump({'version': INDEX_VERSION,
+                   'source': os.path.abspath(source),
+                   'source_mtime': os.path.getmtime(source),
+                   'zones': len(_zones),
+                   'edges': len(_edges)}, _file)
+    logging.info(f"compiled timezones {source} into {target}: {len(_zones)} "
+                 f"zones, {len(_edges)} edges in "
+                 f"{time.perf_counter() - _start:.1f} s")
+    return target
+
+
+class TimezoneIndex:
+    """
+    Class TimezoneIndex:
+    Timezone names of coordinates from a compiled timezone index.
+    The index is memory-mapped on the first lookup.
+
+    Args:
+        path (str): A compiled index directory, or a timezone GeoJSON
+            file that is compiled (once, and again when it changes)
+            into index_path.
+        index_path (str, optional): Index directory for a GeoJSON file.
+            Defaults to the file name without extension next to the
+            geocode cache (see `geocache.default_path`).
+    """
+
+    def __init__(self, path: str, index_path: str = None):
+        self.path = path
+        if os.path.isdir(path):
+            self.index_path = path
+        elif index_path is not None:
+            self.index_path = index_path
+        else:
+            from classes import geocache
+            self.index_path = os.path.join(
+                os.path.dirname(geocache.default_path()), 'timezones',
+                os.path.splitext(os.path.basename(path))[0])
+
+    def _compiled(self) -> bool:
+        try:
+            with open(os.path.join(self.index_path, 'meta.json'),
+                      encoding='utf-8') as _file:
+                _meta = json.load(_file)
+        except (OSError, ValueError):
+            return False
+        return _meta.get('version') == INDEX_VERSION and (
+            os.path.isdir(self.path)
+            or _meta.get('source_mtime') == os.path.getmtime(self.path))
+
+    @functools.cached_property
+    def index(self) -> tuple:
+        """
+        The memory-mapped edges, entries, cell_offsets and
+        cell_entries arrays.
+        """
+        if not self._compiled():
+            if os.path.isdir(self.path):
+                raise ValueError(f"Not a timezone index: {self.path}")
+            compile_index(self.path, self.index_path)
+        return tuple(np.load(os.path.join(self.index_path, f'{_name}.npy'),
+                             mmap_mode='r')
+                     for _name in ('edges', 'entries', 'cell_offsets',
+                                   'cell_entries'))
+
+    @functools.cached_property
+    def zones(self) -> list:
+        """
+        The timezone names of the index.
+        """
+        with open(os.path.join(self.index_path, 'zones.json'),
+                  encoding='utf-8') as _file:
+            return json.load(_file)
+
+    def zone_ids(self, latitude, longitude) -> np.ndarray:
+        """
+        Return the index into `zones` for arrays of coordinates,
+        -1 for points in no zone.
+        """
+        _edges, _entries, _cell_offsets, _cell_entries = self.index
+        _latitude = np.atleast_1d(np.asarray(latitude, dtype=float))
+        _longitude = np.atleast_1d(np.asarray(longitude, dtype=float))
+        _latitude, _longitude = np.broadcast_arrays(_latitude, _longitude)
+        _latitude, _longitude = _latitude.ravel(), _longitude.ravel()
+        _result = np.full(_latitude.size, -1, dtype=np.int64)
+        _cells = _row(_latitude) * COLUMNS + _column(_longitude)
+        _order = np.argsort(_cells, kind='stable')
+        _unique, _first = np.unique(_cells[_order], return_index=True)
+        for _cell, _points in zip(_unique, np.split(_order, _first[1:])):
+            for _entry in _cell_entries[
+                    _cell_offsets[_cell]:_cell_offsets[_cell + 1]]:
+                _points = _points[_result[_points] < 0]
+                if not _points.size:
+                    break
+                _zone, _start, _stop = _entries[_entry][['zone', 'start',
+                                                         'stop']].item()
+                _x1, _y1, _x2, _y2 = _edges[_start:_stop].T
+                _px = _longitude[_points, np.newaxis]
+                _py = _latitude[_points, np.newaxis]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    _crossing = ((_y1 > _py) != (_y2 > _py)) & (
+                        _px < _x1 + (_py - _y1) * (_x2 - _x1) / (_y2 - _y1))
+                _inside = _crossing.sum(axis=1) % 2 == 1
+                _result[_points[_inside]] = _zone
+        return _result.reshape(np.broadcast(
+            np.asarray(latitude), np.asarray(longitude)).shape)
+
+    def timezones_at(self, latitude, longitude) -> np.ndarray:
+        """
+        Return the timezone names of arrays of coordinates as an
+        object array, with the nautical timezone for points in no zone.
+        """
+        _ids = np.asarray(self.zone_ids(latitude, longitude))
+        _names = np.array(self.zones, dtype=object)[_ids.ravel()]
+        _longitude = np.broadcast_to(np.asarray(longitude, dtype=float),
+                                     _ids.shape).ravel()
+        for _position in np.flatnonzero(_ids < 0):
+            _names[_position] = nautical_timezone(_longitude[_position])
+        return _names.reshape(_ids.shape)
+
+    def timezone_at(self, latitude: float, longitude: float) -> str:
+        """
+        Return the timezone name of a point, see `timezones_at`.
+        """
+        return self.timezones_at(latitude, longitude).item()
+
+
+@functools.lru_cache(maxsize=None)
+def default_index() -> TimezoneIndex:
+    """
+    Return the shared index of HELIOPY_TIMEZONES, or None if it
+    is not set.
+    """
+    _path = os.environ.get(TIMEZONES_ENV)
+    return TimezoneIndex(_path) if _path else None
+
+
+def timezone_at(latitude: float, longitude: float) -> str:
+    """
+    Return the timezone name of a point from the shared index, or
+    None if HELIOPY_TIMEZONES is not set.
+    """
+    _index = default_index()
+    return _index.timezone_at(latitude, longitude) \
+        if _index is not None else None
+
+
+if __name__ == '__main__':
+    # python -m classes.tzindex combined.json [index_dir]
+    logging.basicConfig(level=logging.INFO)
+    _source = sys.argv[1]
+    _target = sys.argv[2] if len(sys.argv) > 2 \
+        else TimezoneIndex(_source).index_path
+    compile_index(_source, _target)
@@ -18,6 +18,7 @@ class Weather:
         self.geodata = geo_data
         self.api_weather = '/data/2.5/weather?'
         self._cloud_coverage = None
+        self.revision = 0
         self.api_key_path = os.path.join(
             os.path.dirname(
                 api_key_path),
@@ -53,7 +54,7 @@ class Weather:
         _api_response = self.requester(_api_suburl, _parameters)
         # _api_response = _api_response_raw.json()
         _cloud_coverage = _api_response['clouds']['all']
-        self._cloud_coverage = float(_cloud_coverage)
+        self.cloud_coverage = _cloud_coverage
 
     @property
     def cloud_coverage(self):
@@ -66,6 +67,11 @@ class Weather:
         else:
             raise TypeError("Cloud coverage must be a float.")
 
+    @cloud_coverage.setter
+    def cloud_coverage(self, value):
+        self._cloud_coverage = float(value)
+        self.revision += 1
+
     def requester(self, _api_suburl: str, parameters: dict):
         """
         Returns the response of the API request.
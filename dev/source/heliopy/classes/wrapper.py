@@ -17,7 +17,9 @@ class SolarMain:
                  api_key_path=None,
                  api_key=None,
                  module_deg: int = 180,
-                 module_tilt: int = 0
+                 module_tilt: int = 0,
+                 precise: bool = False,
+                 engine: str = 'simple'
                  ):
         """
         Initializes the `SolarMain` class.
@@ -29,6 +31,10 @@ class SolarMain:
             requested_day (str, optional): The requested day for solar data. Defaults to None.
             requested_hour (str, optional): The requested hour for solar data. Defaults to None.
             requested_timezone (str, optional): The requested timezone for solar data. Defaults to None.
+            precise (bool, optional): Calculate without rounding intermediate values,
+                rounding only in `summary()` and `__str__`. Defaults to False.
+            engine (str, optional): Solar position engine, 'simple' or 'spa'
+                (NREL SPA). Defaults to 'simple'.
         """
         logging.info("Initializing BaseData class.")
         self.name = name if name is not None else "Helios"
@@ -41,8 +47,10 @@ class SolarMain:
         self.api_key_path = api_key_path
         self.module_deg = module_deg
         self.module_tilt = module_tilt
-        self.time_init()
+        self.precise = precise
+        self.engine = engine
         self.geo_init()
+        self.time_init()
         self.weather_init()
         self.solar_init()
         self.irradiance_init()
@@ -51,7 +59,8 @@ class SolarMain:
         self.time_data = timedata.Time(
             time_input=self.requested_hour,
             day_input=self.requested_day,
-            timezone_input=self.requested_timezone)
+            timezone_input=self.requested_timezone,
+            location=self.geo_data)
         
     def geo_init(self):
         self.geo_data = geodata.Geo(
@@ -68,7 +77,9 @@ class SolarMain:
         self.solar_data = solardata.Sun(
             timedata=self.time_data,
             geodata=self.geo_data,
-            weather=self.weather)
+            weather=self.weather,
+            precise=self.precise,
+            engine=self.engine)
         
     def irradiance_init(self):
         self.irradiance = irradiance.Irradiance(
@@ -97,6 +108,51 @@ class SolarMain:
             module_azimuth=azimuth,
             module_tilt=tilt)
             
+    def advance(self, delta):
+        """
+        Moves the requested time forward by delta (timedelta or seconds)
+        and updates the results without rebuilding the data objects.
+        """
+        self.time_data.advance(delta)
+        self.irradiance.update()
+
+    def set_instant(self, value):
+        """
+        Sets the requested day and time at once (naive datetime or
+        'YYYY-MM-DD HH:MM:SS') and updates the results without
+        rebuilding the data objects.
+        """
+        self.time_data.set_instant(value)
+        self.irradiance.update()
+
+    def summary(self, decimals: int = 2) -> dict:
+        """
+        Returns the main results as a dictionary for printing or export,
+        with floats rounded to the given decimals.
+        """
+        _values = {
+            'name': self.name,
+            'city': self.city,
+            'country': self.country,
+            'date': self.time_data.date,
+            'latitude': self.geo_data.latitude,
+            'longitude': self.geo_data.longitude,
+            'altitude': self.solar_data.altitude,
+            'solar_azimuth': self.solar_data.solar_azimuth,
+            'sunrise': self.solar_data.sunrise_datetime,
+            'sunset': self.solar_data.sunset_datetime,
+            'direct_illuminance': self.solar_data.direct_illuminance,
+            'daylight_illuminance': self.solar_data.daylight_illuminance,
+            'module_irradiance': self.irradiance.module(),
+        }
+        return {
+            key: round(value, decimals) if isinstance(value, float) else value
+            for key, value in _values.items()}
+
+    def __str__(self):
+        return "\n".join(
+            f"{key}: {value}" for key, value in self.summary().items())
+
     @property
     def city(self):
         """Returns the city for solar data."""
@@ -115,9 +171,10 @@ class SolarMain:
 
     @country.setter
     def country(self, value):
-        """Sets the country for solar data."""
+        """Sets the country for solar data, None if empty."""
         logging.info(f"Setting country: {value}")
-        self._country = str(value)
+        self._country = str(value).strip() or None \
+            if value is not None else None
 
     @property
     def requested_day(self):
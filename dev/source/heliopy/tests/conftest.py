@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the package is imported as `classes`, run from the heliopy directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
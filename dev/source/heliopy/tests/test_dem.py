@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from classes import dem, solarseries
+
+
+def _write_tile(directory, name, heights):
+    np.asarray(heights, dtype='>i2').tofile(str(directory / name))
+
+
+def _plane(size):
+    # heights linear in row and column, so bilinear sampling is exact
+    _row, _column = np.mgrid[0:size, 0:size]
+    return 100 + 2 * _row + 3 * _column
+
+
+@pytest.fixture
+def _tiles(tmp_path):
+    _write_tile(tmp_path, 'N47E011.hgt', _plane(1201))
+    _voids = _plane(1201)
+    _voids[600:602, 600:602] = dem.VOID
+    _voids[10, 10] = dem.VOID
+    _write_tile(tmp_path, 'N47E012.hgt', _voids)
+    return dem.DemTiles(str(tmp_path), maxsize=1)
+
+
+def test_tile_name():
+    assert dem.tile_name(47.5, 11.2) == 'N47E011.hgt'
+    assert dem.tile_name(-33.9, 18.4) == 'S34E018.hgt'
+    assert dem.tile_name(40.7, -74.2) == 'N40W075.hgt'
+
+
+def test_bilinear_sampling_is_exact_on_a_plane(_tiles):
+    _random = np.random.default_rng(3)
+    _latitude = _random.uniform(47, 48, 500)
+    _longitude = _random.uniform(11, 12, 500)
+    _row = (48 - _latitude) * 1200
+    _column = (_longitude - 11) * 1200
+    np.testing.assert_allclose(
+        _tiles.elevation(_latitude, _longitude),
+        100 + 2 * _row + 3 * _column, rtol=0, atol=1e-9)
+    # the south-west corner and the south edge of the tile
+    np.testing.assert_allclose(
+        _tiles.elevation([47, 47, 47.5], [11, 11.5, 11.5]),
+        [2500, 2500 + 3 * 600, 100 + 2 * 600 + 3 * 600], rtol=0, atol=1e-9)
+    # the north edge belongs to the next tile, which is missing
+    assert np.isnan(_tiles.elevation(48, 11.5))
+
+
+def test_voids_and_missing_tiles(_tiles):
+    _step = 1 / 1200
+    _elevation = _tiles.elevation(
+        [48 - 600.5 * _step, 48 - 10.5 * _step, 47.5, 60.5],
+        [12 + 600.5 * _step, 12 + 10.5 * _step, 11.5, 11.5])
+    assert np.isnan(_elevation[0])
+    # the three valid neighbours of a single void, renormalized
+    assert _elevation[1] == pytest.approx(
+        100 + 2 * 10.5 + 3 * 10.5 + (2 + 3) / 6, abs=1e-9)
+    assert _elevation[2] == pytest.approx(100 + 2 * 600 + 3 * 600)
+    assert np.isnan(_elevation[3])
+
+
+def test_tile_cache(_tiles):
+    _tiles.elevation([47.5, 47.6], [11.5, 11.6])
+    _tiles.elevation(47.5, 11.5)
+    _tiles.elevation(47.5, 12.5)
+    assert _tiles.stats() == {'hits': 1, 'misses': 2, 'size': 1,
+                              'maxsize': 1}
+    with pytest.raises(ValueError):
+        dem.DemTiles('.', maxsize=0)
+
+
+def test_air_mass_shrinks_with_elevation():
+    assert solarseries.pressure_ratio(0) == 1
+    assert solarseries.pressure_ratio(1500) == pytest.approx(0.8345, abs=1e-4)
+    assert solarseries.air_mass(40, 1500) == pytest.approx(
+        solarseries.air_mass(40) * solarseries.pressure_ratio(1500))
@@ -0,0 +1,32 @@
+import pytest
+from classes import ephemeris, solarseries
+
+
+@pytest.mark.parametrize('doy', [1, 81, 172, 356, 366])
+def test_day_ephemeris_uses_the_series_formulas(doy):
+    _values = ephemeris.day_ephemeris(doy)
+    assert _values.et_illuminance == solarseries.et_illuminance(doy)
+    assert _values.equation_of_time_rad == solarseries.equation_of_time(doy)
+    assert _values.declination_angle_rad == \
+        solarseries.declination_angle(doy)
+
+
+def test_cache_lru_eviction_stats_and_clear():
+    _cache = ephemeris.EphemerisCache(maxsize=2)
+    _first = _cache.get(2024, 1)
+    _cache.get(2024, 2)
+    assert _cache.get(2024, 1) is _first
+    # (2024, 2) is the least recently used entry and is evicted
+    _cache.get(2024, 3)
+    _cache.get(2024, 1)
+    _cache.get(2024, 2)
+    assert _cache.stats() == {'hits': 2, 'misses': 4, 'size': 2,
+                              'maxsize': 2, 'hit_ratio': pytest.approx(1 / 3)}
+    # (2024, 3) was evicted by (2024, 2)
+    _cache.get(2024, 3)
+    assert _cache.stats()['misses'] == 5
+    _cache.clear()
+    assert _cache.stats() == {'hits': 0, 'misses': 0, 'size': 0,
+                              'maxsize': 2, 'hit_ratio': 0.0}
+    with pytest.raises(ValueError):
+        ephemeris.EphemerisCache(maxsize=0)
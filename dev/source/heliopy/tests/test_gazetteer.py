@@ -0,0 +1,91 @@
+import zipfile
+import pytest
+from classes import gazetteer
+
+
+def _line(geonameid, name, latitude, longitude, country_code, population):
+    _fields = [''] * 19
+    _fields[0], _fields[1], _fields[2] = str(geonameid), name, name
+    _fields[4], _fields[5] = str(latitude), str(longitude)
+    _fields[8], _fields[14] = country_code, str(population)
+    _fields[17] = 'Europe/Vienna' if country_code == 'AT' else 'America/Chicago'
+    return '\t'.join(_fields) + '\n'
+
+
+@pytest.fixture
+def _gazetteer(tmp_path):
+    _source = tmp_path / 'cities.zip'
+    with zipfile.ZipFile(_source, 'w') as _archive:
+        _archive.writestr('cities.txt', ''.join([
+            _line(2761369, 'Vienna', 48.20849, 16.37208, 'AT', 1691468),
+            _line(4791259, 'Vienna', 38.90122, -77.26526, 'US', 16489),
+            _line(2778067, 'Graz', 47.06667, 15.45, 'AT', 222326)]))
+    (tmp_path / 'countryInfo.txt').write_text(
+        '#ISO\tISO3\tISO-Numeric\tfips\tCountry\n'
+        'AT\tAUT\t040\tAU\tAustria\n'
+        'US\tUSA\t840\tUS\tUnited States\n', encoding='utf-8')
+    return gazetteer.Gazetteer(str(_source),
+                               index_path=str(tmp_path / 'index'))
+
+
+def test_read_geonames_closes_the_archive(_gazetteer, monkeypatch):
+    _archives = []
+
+    class _ZipFile(zipfile.ZipFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            _archives.append(self)
+
+    monkeypatch.setattr(gazetteer.zipfile, 'ZipFile', _ZipFile)
+    _cities, _names = gazetteer.read_geonames(_gazetteer.path)
+    assert len(_cities) == 3
+    assert ('vienna', 0) in _names
+    assert _archives and all(_archive.fp is None for _archive in _archives)
+
+
+@pytest.mark.parametrize('_country', [None, '', 'None', 'none'])
+def test_no_country_searches_everywhere(_gazetteer, _country):
+    _found = _gazetteer.search('Vienna', _country)
+    assert [_city['country_code'] for _city in _found] == [b'AT', b'US']
+
+
+def test_country_by_name_and_code(_gazetteer):
+    assert _gazetteer.search('Vienna', 'United States')[0]['geonameid'] \
+        == 4791259
+    assert _gazetteer.search('vienna', 'us')[0]['geonameid'] == 4791259
+    with pytest.raises(ValueError):
+        _gazetteer.search('Vienna', 'Atlantis')
+
+
+def test_geocode_with_none_country(_gazetteer):
+    _place = _gazetteer.geocode('Vienna, None')
+    assert _place.address == 'Vienna, AT'
+    assert _place.latitude == pytest.approx(48.20849)
+
+
+def test_prefix_and_fuzzy_matches(_gazetteer):
+    assert _gazetteer.search('Gra')[0]['name'] == b'Graz'
+    assert _gazetteer.search('Viena')[0]['country_code'] == b'AT'
+
+
+def test_long_multibyte_names_are_cut_on_a_character_boundary(tmp_path):
+    _name = 'жa' + 'ж' * 31 + 'qq'
+    # the byte limit of the keys falls into the middle of a character
+    assert len(_name.encode()) == 67
+    assert gazetteer.KEY_LENGTH_MAX % 2 == 0
+    _source = tmp_path / 'cities.txt'
+    _source.write_text(_line(1, _name, 55.75, 37.62, 'RU', 1000),
+                       encoding='utf-8')
+    _gazetteer = gazetteer.Gazetteer(str(_source),
+                                     index_path=str(tmp_path / 'index'))
+    # fuzzy matching decodes every key starting with "жa"
+    assert _gazetteer.geocode('жaqq') is None
+    assert _gazetteer.geocode(_name).latitude == pytest.approx(55.75)
+    assert _gazetteer.geocode(_name[:-1] + 'z').latitude \
+        == pytest.approx(55.75)
+
+
+def test_geocode_country_after_the_last_comma(_gazetteer):
+    _place = _gazetteer.geocode('Vienna, Virginia, United States')
+    assert _place.address == 'Vienna, US'
+    assert _gazetteer.geocode('Vienna, Austria').address == 'Vienna, AT'
@@ -0,0 +1,114 @@
+import collections
+import geopy
+from classes import geobatch, geocache
+
+Location = collections.namedtuple('Location', ['latitude', 'longitude', 'raw'])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class StubGeocoder:
+    """Fails with the given errors before answering, records the call times."""
+
+    def __init__(self, clock, errors=()):
+        self.clock = clock
+        self.errors = list(errors)
+        self.calls = []
+
+    def geocode(self, query, **kwargs):
+        self.calls.append((self.clock(), query))
+        if self.errors:
+            raise self.errors.pop(0)
+        if query.startswith('Nowhere'):
+            return None
+        return Location(48.2, 16.37, {'address': {'country_code': 'at'}})
+
+
+def _batch(clock, geocoder, **kwargs):
+    _batch = geobatch.BatchGeocoder(
+        geocoder=geocoder, geocode_cache=geocache.GeocodeCache(':memory:'),
+        rate=1.0, **kwargs)
+    _batch.rate_limiter = geobatch.RateLimiter(1.0, clock, clock.sleep)
+    return _batch
+
+
+def test_rate_limiter_spacing():
+    _clock = FakeClock()
+    _limiter = geobatch.RateLimiter(2.0, _clock, _clock.sleep)
+    _times = []
+    for _ in range(3):
+        _limiter.wait()
+        _times.append(_clock.now)
+    assert _times == [100.0, 100.5, 101.0]
+
+
+def test_rate_limiter_delay_applies_to_current_call():
+    _clock = FakeClock()
+    _limiter = geobatch.RateLimiter(1.0, _clock, _clock.sleep)
+    _limiter.wait()
+    _limiter.wait(5.0)
+    assert _clock.now >= 105.0
+    _start = _clock.now
+    _limiter.wait()
+    assert _clock.now - _start == 1.0
+
+
+def test_retry_after_delays_the_retry():
+    _clock = FakeClock()
+    _stub = StubGeocoder(_clock, [geopy.exc.GeocoderRateLimited(
+        'limited', retry_after=30)])
+    _results = list(_batch(_clock, _stub, backoff=2.0).geocode(['Vienna']))
+    assert _results[0].found and _results[0].source == 'geocoder'
+    assert _stub.calls[1][0] - _stub.calls[0][0] >= 30
+
+
+def test_backoff_doubles():
+    _clock = FakeClock()
+    _stub = StubGeocoder(_clock, [geopy.exc.GeocoderTimedOut()] * 3)
+    list(_batch(_clock, _stub, backoff=2.0, retries=3).geocode(['Graz']))
+    _gaps = [_b[0] - _a[0] for _a, _b in zip(_stub.calls, _stub.calls[1:])]
+    # the rate limit interval (1 s) plus 2, 4 and 8 s of backoff
+    assert _gaps == [3.0, 5.0, 9.0]
+
+
+def test_retries_exhausted_is_error():
+    _clock = FakeClock()
+    _stub = StubGeocoder(_clock, [geopy.exc.GeocoderUnavailable()] * 3)
+    _batch_geocoder = _batch(_clock, _stub, retries=2)
+    _result, = _batch_geocoder.geocode(['Linz'])
+    assert _result.source == 'error'
+    assert isinstance(_result.error, geopy.exc.GeocoderUnavailable)
+    assert _batch_geocoder.geocode_cache.lookup('Linz') is None
+
+
+def test_deduplication_and_cache():
+    _clock = FakeClock()
+    _stub = StubGeocoder(_clock)
+    _batch_geocoder = _batch(_clock, _stub)
+    _queries = ['Vienna', ' vienna', ('VIENNA', None), 'Nowhere', 'nowhere']
+    _results = sorted(_batch_geocoder.geocode(_queries))
+    assert [_r.index for _r in _results] == list(range(5))
+    assert [_r.found for _r in _results] == [True, True, True, False, False]
+    assert len(_stub.calls) == 2
+    _again = list(_batch_geocoder.geocode(_queries))
+    assert {_r.source for _r in _again} == {'cache'}
+    assert len(_stub.calls) == 2
+
+
+def test_coordinates_in_input_order():
+    _clock = FakeClock()
+    _latitude, _longitude = _batch(_clock, StubGeocoder(_clock)).coordinates(
+        ['Nowhere', 'Vienna'])
+    assert _latitude[1] == 48.2 and _longitude[1] == 16.37
+    assert _latitude[0] != _latitude[0]
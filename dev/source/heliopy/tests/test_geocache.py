@@ -0,0 +1,129 @@
+import types
+import geopy
+import pytest
+from classes import geocache, geodata
+
+
+def _location(latitude, longitude, country, country_code):
+    return types.SimpleNamespace(
+        latitude=latitude, longitude=longitude,
+        raw={'address': {'country': country, 'country_code': country_code}})
+
+
+PARIS_FR = _location(48.8535, 2.3484, 'France', 'fr')
+PARIS_US = _location(33.6609, -95.5555, 'United States', 'us')
+
+
+class StubGeocoder:
+    def __init__(self, answers=None, error=None):
+        self.answers = answers or {}
+        self.error = error
+        self.queries = []
+
+    def geocode(self, query, **kwargs):
+        self.queries.append(query)
+        if self.error is not None:
+            raise self.error
+        return self.answers.get(query)
+
+
+@pytest.fixture
+def _clock(monkeypatch):
+    _now = [1e9]
+    monkeypatch.setattr(geocache.time, 'time', lambda: _now[0])
+    return _now
+
+
+@pytest.fixture
+def _cache():
+    _cache = geocache.GeocodeCache(':memory:', ttl=100, negative_ttl=10)
+    yield _cache
+    _cache.close()
+
+
+@pytest.mark.parametrize('_query, _key', [
+    (('Vienna, Austria',), ('vienna', 'austria')),
+    (('vienna', 'AUSTRIA'), ('vienna', 'austria')),
+    (('  Vienna ', ' Austria'), ('vienna', 'austria')),
+    (('Springfield, Illinois, US',), ('springfield illinois', 'us')),
+    (('Zürich',), ('zürich', '')),
+    (('Vienna', None), ('vienna', '')),
+])
+def test_normalize(_query, _key):
+    assert geocache.normalize(*_query) == _key
+
+
+def test_query_forms_share_an_entry(_cache, _clock):
+    _cache.put('Vienna, Austria', location=_location(48.2, 16.37,
+                                                     'Austria', 'at'))
+    assert _cache.get('vienna', 'AUSTRIA').latitude == 48.2
+    # found through the resolved country code of the entry
+    assert _cache.get('Vienna', 'at').latitude == 48.2
+    assert _cache.get('Vienna', 'US') is None
+
+
+def test_query_without_country_ignores_other_countries(_cache, _clock):
+    _cache.put('Paris', 'US', PARIS_US)
+    assert _cache.lookup('Paris') is None
+    _cache.put('Paris', None, PARIS_FR)
+    assert _cache.lookup('Paris').latitude == pytest.approx(48.8535)
+    assert _cache.lookup('Paris', 'France').latitude == pytest.approx(48.8535)
+    assert _cache.lookup('Paris', 'us').latitude == pytest.approx(33.6609)
+
+
+def test_ttl_and_negative_ttl(_cache, _clock):
+    _cache.put('Vienna', 'Austria', _location(48.2, 16.37, 'Austria', 'at'))
+    _cache.put('Atlantis')
+    assert _cache.get('Atlantis').found is False
+    _clock[0] += 11
+    assert _cache.get('Atlantis') is None
+    assert _cache.get('Vienna', 'Austria').found
+    _clock[0] += 90
+    assert _cache.get('Vienna', 'Austria') is None
+    assert _cache.lookup('Vienna', 'Austria', stale=True).latitude == 48.2
+
+
+def test_stats_and_purge(_cache, _clock):
+    _cache.put('Vienna', 'Austria', _location(48.2, 16.37, 'Austria', 'at'))
+    _cache.put('Graz', 'Austria', _location(47.07, 15.44, 'Austria', 'at'))
+    _cache.put('Atlantis')
+    _cache.get('Vienna', 'Austria')
+    _cache.get('Atlantis')
+    _cache.get('Linz', 'Austria')
+    assert _cache.stats() == {'hits': 1, 'negative_hits': 1, 'misses': 1,
+                              'size': 3, 'negative_size': 1,
+                              'hit_ratio': pytest.approx(2 / 3)}
+    _clock[0] += 11
+    assert _cache.purge() == 1
+    _clock[0] += 90
+    _cache.put('Linz', 'Austria', _location(48.3, 14.29, 'Austria', 'at'))
+    assert _cache.purge() == 2
+    assert _cache.stats()['size'] == 1
+    _cache.clear()
+    assert _cache.stats() == {'hits': 0, 'negative_hits': 0, 'misses': 0,
+                              'size': 0, 'negative_size': 0,
+                              'hit_ratio': 0.0}
+
+
+def test_geo_uses_cache_and_country(_cache, _clock):
+    _geocoder = StubGeocoder({'Paris, US': PARIS_US, 'Paris': PARIS_FR})
+    _kwargs = {'geocode_cache': _cache, 'geocoder': _geocoder,
+               'elevation_input': 0}
+    assert geodata.Geo('Paris', 'US', **_kwargs).latitude \
+        == pytest.approx(33.6609)
+    assert geodata.Geo('Paris', **_kwargs).latitude == pytest.approx(48.8535)
+    assert geodata.Geo('paris', **_kwargs).latitude == pytest.approx(48.8535)
+    assert _geocoder.queries == ['Paris, US', 'Paris']
+
+
+def test_geo_falls_back_to_stale_entry(_cache, _clock):
+    _cache.put('Vienna', 'Austria', _location(48.2, 16.37, 'Austria', 'at'))
+    _clock[0] += 1000
+    _geocoder = StubGeocoder(error=geopy.exc.GeocoderUnavailable('down'))
+    _geo = geodata.Geo('Vienna', 'Austria', geocode_cache=_cache,
+                       geocoder=_geocoder, elevation_input=0)
+    assert (_geo.latitude, _geo.longitude) == (48.2, 16.37)
+    assert _geocoder.queries == ['Vienna, Austria']
+    with pytest.raises(geopy.exc.GeocoderUnavailable):
+        geodata.Geo('Graz', 'Austria', geocode_cache=_cache,
+                    geocoder=_geocoder, elevation_input=0)
@@ -0,0 +1,112 @@
+import logging
+import types
+import numpy as np
+import pytest
+from classes import irradiance, solarseries
+
+GEO = types.SimpleNamespace(latitude=48.2, longitude=16.37, elevation=0,
+                            revision=0)
+
+
+def _dense_energy(day, tilt, deg):
+    _times = np.datetime64(day, 's') + np.arange(0, 86400, 30) \
+        * np.timedelta64(1, 's')
+    _series = solarseries.SunSeries(GEO, times=_times,
+                                    timezone='Europe/Vienna',
+                                    cloud_coverage=0.0)
+    with np.errstate(over='ignore', invalid='ignore'):
+        _module = irradiance.module_irradiance(
+            _series.direct_illuminance, _series.altitude,
+            _series.solar_azimuth, tilt, deg)
+    _values = np.where(_series.altitude > 0, np.clip(_module, 0, None), 0)
+    return _values.sum() * 30 / 3600
+
+
+def test_daily_energy_matches_dense_sum(caplog):
+    with caplog.at_level(logging.WARNING):
+        _days, _energy = irradiance.daily_energy(
+            GEO, 30, 180, '2024-03-20', '2024-03-22',
+            timezone='Europe/Vienna')
+    assert 'not converged' not in caplog.text
+    assert list(_days) == [np.datetime64('2024-03-20'),
+                           np.datetime64('2024-03-21')]
+    assert _energy[0] == pytest.approx(
+        _dense_energy('2024-03-20', 30, 180), rel=1e-3)
+
+
+def test_daily_energy_warns_when_not_converged(caplog):
+    with caplog.at_level(logging.WARNING):
+        irradiance.daily_energy(GEO, 30, 180, '2024-03-20', '2024-03-22',
+                                timezone='Europe/Vienna', intervals=2,
+                                rtol=1e-12, max_refinements=1)
+    assert 'daily energy of 2 days not converged' in caplog.text
+
+
+@pytest.mark.parametrize('latitude, altitude, azimuth', [
+    (48.2, 35.0, 140.0),
+    (48.2, 20.0, 100.0),
+    # sun outside the 0-179 range: the nearest edge wins
+    (48.2, 25.0, 250.0),
+    (48.2, 30.0, 350.0),
+    (-33.9, 40.0, 30.0),
+    (-33.9, 15.0, 300.0),
+])
+def test_optimal_orientation_matches_grid_argmax(latitude, altitude, azimuth):
+    _resolution = 0.25
+    _sun = types.SimpleNamespace(altitude=altitude, solar_azimuth=azimuth,
+                                 direct_illuminance=90.0)
+    _geo = types.SimpleNamespace(latitude=latitude, longitude=16.37,
+                                 revision=0)
+    _grid = irradiance.Irradiance(180, 0, _sun, _geo).angles_array(
+        _resolution)
+    # fine grids run past the whole-degree azimuth bounds (e.g. 179.75)
+    _low, _high = irradiance.AZIMUTH_BOUNDS_NORTH if latitude > 0 \
+        else irradiance.AZIMUTH_BOUNDS_SOUTH
+    _columns = (_low <= _grid.deg) & (_grid.deg <= _high)
+    _grid = irradiance.AnglesGrid(_grid.tilt, _grid.deg[_columns],
+                                  _grid.irradiance[:, _columns])
+    _i, _j = np.unravel_index(np.argmax(_grid.irradiance),
+                              _grid.irradiance.shape)
+    _optimum = irradiance.optimal_orientation(90.0, altitude, azimuth,
+                                              latitude)
+    assert abs(_grid.tilt[_i] - _optimum.tilt) <= _resolution
+    assert abs(_grid.deg[_j] - _optimum.deg) <= _resolution
+    assert _grid.deg.min() <= _optimum.deg <= _grid.deg.max()
+    assert _optimum.irradiance >= _grid.irradiance.max() - 1e-9
+    assert _optimum.irradiance == pytest.approx(_grid.irradiance.max(),
+                                                rel=1e-4)
+
+
+@pytest.mark.parametrize('geo, start, end', [
+    (GEO, '2024-03-01', '2024-05-01'),
+    (types.SimpleNamespace(latitude=-33.9, longitude=18.4, elevation=0,
+                           revision=0), '2024-06-01', '2024-06-15'),
+])
+def test_seasonal_optimum_matches_full_grid(geo, start, end):
+    _timezone = 'Europe/Vienna' if geo.latitude > 0 else 'Africa/Johannesburg'
+    _optimum = irradiance.seasonal_optimum(
+        geo, start, end, timezone=_timezone, freq='2h', resolution=1,
+        rtol=0)
+    _, _, _vectors = irradiance._irradiation_vectors(
+        geo, start, end, _timezone, '2h', None)
+    _low, _high = irradiance.AZIMUTH_BOUNDS_NORTH if geo.latitude > 0 \
+        else irradiance.AZIMUTH_BOUNDS_SOUTH
+    _tilt, _deg = (_grid.ravel() for _grid in np.meshgrid(
+        np.arange(0, irradiance.TILT_MAX + 1.0),
+        np.arange(_low, _high + 1.0), indexing='ij'))
+    _totals = irradiance.module_totals(_vectors, _tilt, _deg)
+    _best = np.argmax(_totals)
+    assert abs(_optimum.tilt - _tilt[_best]) <= 1
+    assert abs(_optimum.deg - _deg[_best]) <= 1
+    assert _optimum.irradiation == pytest.approx(_totals[_best], rel=1e-4)
+    # the monthly tilts at the fixed orientation, searched in full
+    _months = _optimum.month.size
+    assert _months == (2 if geo.latitude > 0 else 1)
+    _, _, _month_vectors = irradiance._irradiation_vectors(
+        geo, str(_optimum.month[0]) + '-01',
+        str(_optimum.month[0] + 1) + '-01' if _months > 1 else end,
+        _timezone, '2h', None)
+    _tilts = np.arange(0, irradiance.TILT_MAX + 1.0)
+    _monthly = irradiance.module_totals(
+        _month_vectors, _tilts, np.full(_tilts.shape, _optimum.deg))
+    assert abs(_optimum.monthly_tilt[0] - _tilts[np.argmax(_monthly)]) <= 1
@@ -0,0 +1,177 @@
+import re
+import types
+import numpy as np
+import pytest
+from classes import irradiance, optimums
+
+
+def _brute_force_non_dominated(costs):
+    _mask = np.ones(len(costs), dtype=bool)
+    for _j in range(len(costs)):
+        for _i in range(len(costs)):
+            if _i != _j and np.all(costs[_i] <= costs[_j]) and (
+                    np.any(costs[_i] < costs[_j]) or _i < _j):
+                _mask[_j] = False
+                break
+    return _mask
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_non_dominated_matches_brute_force(seed):
+    _rng = np.random.default_rng(seed)
+    _costs = np.column_stack([
+        _rng.normal(size=300), _rng.normal(size=300),
+        _rng.integers(0, 5, 300)]).astype(float)
+    _costs[7] = _costs[3]
+    _costs[11, :2] = np.round(_costs[11, :2], 1)
+    np.testing.assert_array_equal(optimums.non_dominated(_costs),
+                                  _brute_force_non_dominated(_costs))
+
+
+def _make_optimums():
+    _geo = types.SimpleNamespace(latitude=48.2, longitude=16.37, revision=0)
+    _sun = types.SimpleNamespace(
+        altitude=35.0, solar_azimuth=140.0, direct_illuminance=90.0,
+        timedata=types.SimpleNamespace(timezone='Europe/Vienna'))
+    return optimums.Optimums(irradiance.Irradiance(180, 30, _sun, _geo),
+                             2, 1, 12, 2, 1, 1)
+
+
+def test_pareto_frontier_defaults_to_energy():
+    _optimums = _make_optimums()
+    _kwargs = dict(panel_amounts=[6, 12], spacing_horizontal=(0, 1),
+                   spacing_vertical=(0, 1), resolution=5)
+    _frontier = _optimums.pareto_frontier(
+        start='2024-06-01', end='2024-06-08', **_kwargs)
+    _grid = _optimums.irradiance_data.energy_grid(
+        start='2024-06-01', end='2024-06-08', resolution=5)
+    _expected = _optimums.pareto_frontier(grid=_grid, **_kwargs)
+    np.testing.assert_array_equal(_frontier, _expected)
+    _instant = _optimums.pareto_frontier(
+        grid=_optimums.irradiance_data.angles_array(5), **_kwargs)
+    assert _frontier['value'].max() > 10 * _instant['value'].max()
+    _costs = np.column_stack([-_frontier['value'], _frontier['footprint'],
+                              _frontier['panels']])
+    assert optimums.non_dominated(_costs).all()
+
+
+def test_energy_grid_matches_module_totals():
+    _geo = types.SimpleNamespace(latitude=48.2, longitude=16.37, revision=0)
+    _grid = irradiance.energy_grid(_geo, '2024-03-01', '2024-03-03',
+                                   timezone='Europe/Vienna', resolution=15)
+    _tilt, _deg = 30.0, 165.0
+    _i, _j = list(_grid.tilt).index(_tilt), list(_grid.deg).index(_deg)
+    _, _, _vectors = irradiance._irradiation_vectors(
+        _geo, '2024-03-01', '2024-03-03', 'Europe/Vienna', '1h', None)
+    assert _grid.irradiance[_i, _j] == pytest.approx(
+        irradiance.module_totals(_vectors, [_tilt], [_deg])[0])
+
+
+def _layout_grid(seed=0):
+    _rng = np.random.default_rng(seed)
+    _tilt = np.arange(0, 91, 10, dtype=float)
+    _deg = np.arange(0, 180, 15, dtype=float)
+    return irradiance.AnglesGrid(
+        _tilt, _deg, _rng.uniform(-20, 100, (_tilt.size, _deg.size)))
+
+
+def _exhaustive_layouts(grid, panel_width, panel_height, panel_amount,
+                        footprint_width, footprint_depth, spacing_horizontal,
+                        spacing_vertical, top_k):
+    _layouts = []
+    for _rows in range(1, panel_amount + 1):
+        if panel_amount % _rows:
+            continue
+        _columns = panel_amount // _rows
+        for _spacing_h in spacing_horizontal:
+            _width = _columns * panel_width + (_columns - 1) * _spacing_h
+            if _width > footprint_width:
+                continue
+            for _spacing_v in spacing_vertical:
+                _best = None
+                for _i, _tilt in enumerate(grid.tilt):
+                    _depth = _rows * panel_height * np.cos(
+                        np.radians(_tilt)) + (_rows - 1) * _spacing_v
+                    if _depth > footprint_depth:
+                        continue
+                    for _j, _deg in enumerate(grid.deg):
+                        _width_lit, _height_lit = optimums.lit_lengths(
+                            panel_width, panel_height, panel_amount, _rows,
+                            _spacing_h, _spacing_v, 180, 0, _deg, _tilt)
+                        _value = grid.irradiance[_i, _j] * _width_lit \
+                            * _height_lit
+                        if _best is None or _value > _best.value:
+                            _best = optimums.Layout(
+                                float(_value), _rows, float(_spacing_h),
+                                float(_spacing_v), float(_tilt), float(_deg),
+                                float(_width), float(_depth))
+                if _best is not None:
+                    _layouts.append(_best)
+    return sorted(_layouts, key=lambda _layout: (
+        -_layout.value, _layout.rows, _layout.spacing_horizontal,
+        _layout.spacing_vertical))[:top_k]
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+@pytest.mark.parametrize('top_k', [1, 5, 100])
+def test_optimize_layout_matches_exhaustive_search(processes, top_k, caplog):
+    _grid = _layout_grid()
+    _arguments = (_grid, 2, 1, 12, 14, 4)
+    _spacing = dict(spacing_horizontal=(0, 0.5, 1),
+                    spacing_vertical=(0, 0.5, 1))
+    with caplog.at_level('INFO'):
+        _layouts = optimums.optimize_layout(*_arguments, top_k=top_k,
+                                            processes=processes, **_spacing)
+    _expected = _exhaustive_layouts(*_arguments, top_k=top_k, **_spacing)
+    assert len(_layouts) == len(_expected)
+    for _layout, _reference in zip(_layouts, _expected):
+        assert _layout._replace(value=pytest.approx(_layout.value)) \
+            == _reference
+    assert all(_layout.footprint_depth <= 4 for _layout in _layouts)
+    # the depth limit excludes tilts and row counts
+    assert _expected != _exhaustive_layouts(*_arguments[:-1], 1e9,
+                                            top_k=top_k, **_spacing)
+    if top_k == 1 and processes is None:
+        assert re.search(r'candidates, [1-9]\d* pruned', caplog.text)
+
+
+def test_optimize_layout_ties_prefer_fewer_rows():
+    _grid = irradiance.AnglesGrid(np.array([0.0, 45.0]),
+                                  np.array([0.0, 90.0]), np.zeros((2, 2)))
+    # every layout scores 0; the heap keeps and returns the first by
+    # rows, then horizontal and vertical spacing
+    _layouts = optimums.optimize_layout(
+        _grid, 1, 1, 4, 100, 100, spacing_horizontal=(1, 0),
+        spacing_vertical=(0.5, 0), top_k=5)
+    assert [(_layout.rows, _layout.spacing_horizontal,
+             _layout.spacing_vertical) for _layout in _layouts] == [
+        (1, 0, 0), (1, 0, 0.5), (1, 1, 0), (1, 1, 0.5), (2, 0, 0)]
+
+
+def test_module_lit_optimal_matches_cell_loop():
+    _optimums = _make_optimums()
+    _grid = _optimums.irradiance_data.angles_array(1)
+    # the per-cell loop module_lit_optimal replaced
+    _lit = {(_tilt, _deg): _grid.irradiance[_i, _j] * _optimums.area_total(
+                module_azimuth=_deg, module_tilt=_tilt)
+            for _i, _tilt in enumerate(_grid.tilt.tolist())
+            for _j, _deg in enumerate(_grid.deg.tolist())}
+    assert _optimums.module_lit_optimal() == max(_lit, key=_lit.get)
+    np.testing.assert_allclose(
+        _optimums.area_grid(_grid.tilt, _grid.deg),
+        [[_optimums.area_total(_deg, _tilt) for _deg in _grid.deg]
+         for _tilt in _grid.tilt])
+
+
+def test_area_cache_is_bounded():
+    _optimums = _make_optimums()
+    _tilt, _deg = np.arange(0, 90.0, 10), np.arange(0, 180.0, 10)
+    _first = _optimums.area_grid(_tilt, _deg)
+    assert _optimums.area_grid(_tilt, _deg) is _first
+    for _rows in range(3, optimums.AREA_CACHE_SIZE + 3):
+        _optimums.panel_rows = _rows
+        _optimums.area_grid(_tilt, _deg)
+    assert len(_optimums._area_cache) == optimums.AREA_CACHE_SIZE
+    _optimums.panel_rows = 2
+    assert _optimums.area_grid(_tilt, _deg) is not _first
+    np.testing.assert_array_equal(_optimums.area_grid(_tilt, _deg), _first)
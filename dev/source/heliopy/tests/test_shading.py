@@ -0,0 +1,74 @@
+import math
+import types
+import numpy as np
+import pytest
+from classes import irradiance, shading, solarseries
+
+
+def test_profile_angle():
+    assert shading.profile_angle(30, 180, 180) == pytest.approx(30)
+    # tan(30) / cos(45)
+    assert shading.profile_angle(30, 135, 180) == pytest.approx(
+        math.degrees(math.atan(math.tan(math.radians(30)) * math.sqrt(2))))
+    assert shading.profile_angle(30, 0, 180) == pytest.approx(150)
+
+
+def test_shaded_fraction_by_hand():
+    # rows 2 long at 30 degrees, 2 apart, sun due south at 30 degrees:
+    # the shadow line of the front top edge (1.732, 1) meets the next
+    # row (2 + s cos 30, s sin 30) at s = (1 - 0.268 tan 30) / (2 sin 30)
+    _s = (1 - (2 - 2 * math.cos(math.radians(30)))
+          * math.tan(math.radians(30))) / (2 * math.sin(math.radians(30)))
+    assert shading.shaded_fraction(30, 180, 30, 180, 2, 2) == \
+        pytest.approx(_s / 2)
+    assert _s / 2 == pytest.approx(1 - 0.5 / math.cos(math.radians(30)))
+
+
+def test_shaded_fraction_limits():
+    _tilt, _pitch, _length = 30, 3, 2
+    # above this profile angle the front row casts no shadow on the next
+    _limit = math.degrees(math.atan(
+        _length * math.sin(math.radians(_tilt))
+        / (_pitch - _length * math.cos(math.radians(_tilt)))))
+    _altitude = np.array([_limit + 1, 60, 89, _limit - 1, 1, 0.01])
+    _fraction = shading.shaded_fraction(_altitude, 180, _tilt, 180,
+                                        _pitch, _length)
+    np.testing.assert_array_equal(_fraction[:3], 0)
+    assert 0 < _fraction[3] < 0.1
+    assert _fraction[4] > 0.9
+    assert _fraction[5] == pytest.approx(1, abs=1e-3)
+    # no direct light: sun down or behind the modules
+    np.testing.assert_array_equal(shading.shaded_fraction(
+        [-5, 10], [180, 0], _tilt, 180, _pitch, _length), [1, 1])
+
+
+def test_row_shading_front_row_is_never_shaded():
+    _altitude = np.array([-3, 2, 10, 25, 60])
+    _shading = shading.row_shading(_altitude, 180, 30, 180, [2, 3], 2, 3)
+    assert _shading.shape == (5, 3)
+    np.testing.assert_array_equal(_shading[:, 0], [1, 0, 0, 0, 0])
+    np.testing.assert_allclose(_shading[:, 1], shading.shaded_fraction(
+        _altitude, 180, 30, 180, 2, 2))
+    np.testing.assert_allclose(_shading[:, 2], shading.shaded_fraction(
+        _altitude, 180, 30, 180, 3, 2))
+    assert (_shading[1:, 1] >= _shading[1:, 2]).all()
+
+
+def test_row_irradiance():
+    _geo = types.SimpleNamespace(latitude=48.2, longitude=16.37, revision=0)
+    _series = solarseries.SunSeries(
+        _geo, start='2024-12-21', end='2024-12-22', freq='1h',
+        timezone='Europe/Vienna')
+    _rows = shading.row_irradiance(_series, 30, 180, 2.5, 2, 4)
+    assert _rows.shape == (24, 4)
+    with np.errstate(over='ignore', invalid='ignore'):
+        _module = irradiance.module_irradiance(
+            _series.direct_illuminance, _series.altitude,
+            _series.solar_azimuth, 30, 180)
+    _up = _series.altitude > 0
+    np.testing.assert_allclose(_rows[:, 0], np.where(
+        _up, np.clip(np.nan_to_num(_module), 0, None), 0))
+    np.testing.assert_array_equal(_rows[~_up], 0)
+    # low winter sun shades the rows behind the front one
+    assert (_rows[:, 1:].sum(axis=0) < _rows[:, 0].sum()).all()
+    np.testing.assert_allclose(_rows[:, 1], _rows[:, 2])
@@ -0,0 +1,72 @@
+import datetime
+import types
+import numpy as np
+import pytest
+from classes import timedata, solardata, solarseries
+
+
+def _sun(time_input='10:00', engine='simple', geo=None, weather=None):
+    _geo = geo if geo is not None else types.SimpleNamespace(
+        latitude=48.2, longitude=16.37, revision=0)
+    _time = timedata.Time(time_input=time_input, day_input='2024-06-21',
+                          timezone_input='Europe/Vienna')
+    _weather = weather if weather is not None else types.SimpleNamespace(
+        cloud_coverage=10.0)
+    return solardata.Sun(_time, _geo, _weather, precise=True, engine=engine)
+
+
+def test_minute_ticks_move_the_sun():
+    _sun_data = _sun('10:00')
+    _altitude = _sun_data.altitude
+    _sun_data.timedata.advance(datetime.timedelta(minutes=1))
+    assert _sun_data.hour == pytest.approx(10 + 1 / 60)
+    assert _sun_data.altitude != _altitude
+    assert _sun_data.hour_angle_rad == pytest.approx(
+        _sun('10:01').hour_angle_rad)
+
+
+@pytest.mark.parametrize('engine', solarseries.ENGINES)
+def test_precise_sun_matches_series_off_the_hour(engine):
+    _sun_data = _sun('10:37', engine=engine)
+    _series = solarseries.SunSeries(
+        _sun_data.geodata,
+        times=np.array(['2024-06-21T10:37:00'], dtype='datetime64[s]'),
+        timezone='Europe/Vienna', cloud_coverage=10.0, engine=engine)
+    for _name in ('hour', 'hour_angle_rad', 'altitude', 'solar_azimuth',
+                  'air_mass', 'direct_illuminance'):
+        assert getattr(_sun_data, _name) == pytest.approx(
+            getattr(_series, _name)[0], rel=1e-12, abs=1e-12), _name
+
+
+def test_cache_follows_replaced_data_objects():
+    _sun_data = _sun('10:00')
+    _altitude = _sun_data.altitude
+    _sun_data.geodata = types.SimpleNamespace(
+        latitude=-33.9, longitude=18.4, revision=0)
+    assert _sun_data.altitude != _altitude
+    _other = _sun('15:00')
+    _sun_data.timedata = _other.timedata
+    assert _sun_data.hour == 15
+
+
+def test_cache_follows_weather_changes():
+    from classes import weather
+    _weather = weather.Weather(types.SimpleNamespace(), api_key='unused')
+    _weather.cloud_coverage = 0
+    _sun_data = _sun('12:00', weather=_weather)
+    _clear = _sun_data.clear_sky
+    _weather.cloud_coverage = 90
+    assert _sun_data.clear_sky != _clear
+
+
+@pytest.mark.parametrize('engine, daily', [('simple', True), ('spa', False)])
+def test_declination_and_equation_of_time_cache(engine, daily):
+    _sun_data = _sun('06:00', engine=engine)
+    _values = (_sun_data.declination_angle_rad,
+               _sun_data.equation_of_time_rad)
+    assert ('declination_angle_rad' in _sun_data.daily_cache) is daily
+    _sun_data.timedata.advance(datetime.timedelta(hours=12))
+    assert ((_sun_data.declination_angle_rad,
+             _sun_data.equation_of_time_rad) == _values) is daily
+    assert _sun_data.declination_angle_rad == pytest.approx(
+        _sun('18:00', engine=engine).declination_angle_rad)
@@ -0,0 +1,50 @@
+import types
+import numpy as np
+from classes import solarseries
+
+GEO = types.SimpleNamespace(latitude=48.2, longitude=16.37, revision=0)
+
+
+def test_day_bounds_default_end():
+    _start, _end = solarseries.day_bounds('2023-05-17')
+    assert _end == np.datetime64('2024-05-17')
+
+
+def test_day_bounds_leap_day():
+    _start, _end = solarseries.day_bounds('2024-02-29')
+    assert _start == np.datetime64('2024-02-29')
+    assert _end == np.datetime64('2025-03-01')
+
+
+def test_daylight_table_from_leap_day():
+    _table = solarseries.daylight_table(GEO, start='2024-02-29',
+                                        timezone='Europe/Vienna')
+    assert _table.day[0] == np.datetime64('2024-02-29')
+    assert _table.day[-1] == np.datetime64('2025-02-28')
+    assert _table.day.size == 366
+
+
+def test_interpolated_positions_within_max_error():
+    _times = solarseries.time_range('2024-06-21T00:00', '2024-06-22T00:00',
+                                    '7s')
+    _dense = solarseries.interpolated_positions(
+        GEO, times=_times, timezone='Europe/Vienna', max_error=0.01)
+    _exact = solarseries.SunSeries(GEO, times=_times,
+                                   timezone='Europe/Vienna')
+    assert _dense['altitude'].shape == _times.shape
+    np.testing.assert_allclose(_dense['altitude'], _exact.altitude,
+                               rtol=0, atol=0.01)
+    _azimuth_error = (_dense['solar_azimuth'] - _exact.solar_azimuth
+                      + 180) % 360 - 180
+    assert np.abs(_azimuth_error).max() <= 0.01
+    # sunrise and sunset intervals are evaluated exactly
+    _near_horizon = np.abs(_exact.altitude) < 0.5
+    assert _dense['exact'][_near_horizon].all()
+    assert not _dense['exact'].all()
+
+
+def test_interpolated_positions_empty():
+    _dense = solarseries.interpolated_positions(
+        GEO, times=np.array([], dtype='datetime64[s]'),
+        timezone='Europe/Vienna')
+    assert _dense['altitude'].shape == (0,)
@@ -0,0 +1,68 @@
+import types
+import numpy as np
+import pytest
+from classes import solarseries, solarsites, tzindex
+
+TIME = '2024-06-21T10:37:00'
+FIELDS = ('altitude', 'solar_azimuth', 'direct_illuminance',
+          'horizontal_sky_illuminance', 'daylight_illuminance')
+
+
+@pytest.fixture(autouse=True)
+def _no_timezone_index(monkeypatch):
+    monkeypatch.setattr(tzindex, 'default_index', lambda: None)
+
+
+def _series(latitude, longitude, elevation=0.0, cloud_coverage=0.0):
+    _geo = types.SimpleNamespace(latitude=latitude, longitude=longitude,
+                                 elevation=elevation, revision=0)
+    return solarseries.SunSeries(
+        _geo, times=np.array([TIME], dtype='datetime64[s]'),
+        timezone='Europe/Vienna', cloud_coverage=cloud_coverage)
+
+
+@pytest.mark.parametrize('latitude, longitude', [
+    (48.2, 16.37), (-33.9, 18.4), (64.1, -21.9), (0.0, 100.0)])
+@pytest.mark.parametrize('elevation', [0.0, 2500.0])
+def test_sites_match_series(latitude, longitude, elevation):
+    _sites = solarsites.SunSites(latitude, longitude, time=TIME,
+                                 timezone='Europe/Vienna',
+                                 cloud_coverage=40, elevation=elevation)
+    _series_data = _series(latitude, longitude, elevation, 40)
+    for _name in FIELDS:
+        assert float(getattr(_sites, _name)) == pytest.approx(
+            getattr(_series_data, _name)[0], rel=1e-12, abs=1e-9, nan_ok=True), _name
+
+
+def test_sites_broadcast():
+    _latitude = np.array([[48.2], [-33.9]])
+    _longitude = np.array([16.37, 18.4, -21.9])
+    _elevation = np.array([0.0, 500.0, 2500.0])
+    _sites = solarsites.SunSites(_latitude, 16.37, time=TIME,
+                                 timezone='Europe/Vienna', elevation=0)
+    assert _sites.altitude.shape == (2, 1)
+    _sites = solarsites.SunSites(_latitude, _longitude, time=TIME,
+                                 timezone='Europe/Vienna',
+                                 elevation=_elevation)
+    assert _sites.altitude.shape == (2, 3)
+    for _name, _values in _sites.illuminance().items():
+        assert _values.shape == (2, 3), _name
+    for _i in range(2):
+        for _j in range(3):
+            _series_data = _series(_latitude[_i, 0], _longitude[_j],
+                                   _elevation[_j])
+            for _name in FIELDS:
+                assert getattr(_sites, _name)[_i, _j] == pytest.approx(
+                    getattr(_series_data, _name)[0], rel=1e-12, abs=1e-9, nan_ok=True)
+
+
+def test_elevation_lowers_the_air_mass():
+    _sites = solarsites.SunSites([48.2, 48.2], 16.37, time=TIME,
+                                 timezone='Europe/Vienna',
+                                 elevation=[0, 3000])
+    assert _sites.air_mass[1] < _sites.air_mass[0]
+    assert _sites.direct_illuminance[1] > _sites.direct_illuminance[0]
+    # without DEM tiles the elevation defaults to 0
+    _default = solarsites.SunSites(48.2, 16.37, time=TIME,
+                                   timezone='Europe/Vienna')
+    assert float(_default.elevation) == 0
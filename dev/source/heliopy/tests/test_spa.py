@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from classes import spa
+
+
+def test_nrel_reference_example():
+    # NREL/TP-560-34302, table A5.1: Golden, CO, 2003-10-17 12:30:30 -7h
+    _position = spa.solar_position(
+        np.datetime64('2003-10-17T19:30:30'), latitude=39.742476,
+        longitude=-105.1786, elevation=1830.14, pressure=820,
+        temperature=11, delta_t_seconds=67)
+    assert 90 - _position.apparent_altitude == pytest.approx(50.11162,
+                                                             abs=1e-5)
+    assert _position.solar_azimuth == pytest.approx(194.34024, abs=1e-5)
+    assert np.degrees(_position.hour_angle_rad) == pytest.approx(
+        11.10629, abs=5e-5)
+    assert np.degrees(_position.declination_angle_rad) == pytest.approx(
+        -9.316179, abs=1e-6)
+    assert _position.equation_of_time == pytest.approx(14.641503, abs=1e-4)
+
+
+def test_arrays_broadcast_and_chunk():
+    _times = np.datetime64('2024-06-21T00:00') \
+        + np.arange(spa.CHUNK_SIZE + 5) * np.timedelta64(1, 'm')
+    _position = spa.solar_position(_times, 48.2, 16.37)
+    assert _position.altitude.shape == _times.shape
+    _single = spa.solar_position(_times[-1], 48.2, 16.37)
+    assert _position.altitude[-1] == pytest.approx(float(_single.altitude),
+                                                   abs=1e-12)
+    assert spa.solar_position(_times[:0], 48.2, 16.37).altitude.shape == (0,)
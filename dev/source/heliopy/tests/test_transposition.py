@@ -0,0 +1,59 @@
+import math
+import numpy as np
+import pytest
+from classes import transposition
+
+
+# reference values of pvlib 0.16.1, pvlib.irradiance.perez (all sites
+# composite 1990) and pvlib.irradiance.haydavies, with the air mass
+# 1 / sin(altitude)
+REFERENCE = [
+    # tilt, deg, sky, direct, altitude, azimuth, et, perez, hay-davies
+    (30, 180, 20000, 80000, 60, 200, 128000,
+     23180.28748726068, 21213.736483786186),
+    (45, 90, 30000, 5000, 15, 120, 128000,
+     53552.58682246085, 28113.1936323662),
+    (20, 250, 10000, 90000, 8, 240, 130000,
+     9401.798173545249, 26081.746261340442),
+    (60, 170, 25000, 40000, 35, 150, 128000,
+     27646.02864004848, 25876.74637898799),
+]
+
+
+@pytest.mark.parametrize(
+    'tilt, deg, sky, direct, altitude, azimuth, et, perez, hay_davies',
+    REFERENCE)
+def test_sky_models_match_pvlib(tilt, deg, sky, direct, altitude, azimuth,
+                                et, perez, hay_davies):
+    _cos = transposition.cos_incidence(altitude, azimuth, tilt, deg)
+    _air_mass = 1 / math.sin(math.radians(altitude))
+    assert float(transposition.perez(
+        sky, direct, et, _cos, altitude, tilt, _air_mass)) == pytest.approx(
+            perez, rel=1e-9)
+    assert float(transposition.hay_davies(
+        sky, direct, et, _cos, altitude, tilt)) == pytest.approx(
+            hay_davies, rel=1e-9)
+
+
+@pytest.mark.parametrize('model', transposition.MODELS)
+def test_horizontal_module_gets_the_horizontal_sky(model):
+    _poa = transposition.plane_of_array(
+        altitude=40, azimuth=160, direct=70000, sky=20000,
+        et_illuminance=128000, tilt=0, deg=180, model=model)
+    assert float(_poa.sky_diffuse) == pytest.approx(20000)
+    assert float(_poa.ground_reflected) == 0
+    assert float(_poa.direct) == pytest.approx(
+        70000 * math.sin(math.radians(40)))
+
+
+def test_plane_of_array_grid_and_night():
+    _altitude = np.array([[-5.0], [30.0]])
+    _tilt = np.array([0, 30, 60, 90])
+    _poa = transposition.plane_of_array(
+        _altitude, 180, 60000, 15000, 128000, _tilt, 180)
+    assert _poa.total.shape == (2, 4)
+    assert not _poa.total[0].any()
+    np.testing.assert_allclose(
+        _poa.total, _poa.direct + _poa.sky_diffuse + _poa.ground_reflected)
+    with pytest.raises(ValueError):
+        transposition.plane_of_array(30, 180, 1, 1, 1, 0, 180, model='x')
@@ -0,0 +1,49 @@
+import math
+import numpy as np
+import pytest
+from classes import trig
+
+
+@pytest.mark.parametrize('start, stop, resolution, sliced', [
+    (0, 90, 1, True),
+    (181, 360, 1, True),
+    (0, 180, 0.25, True),
+    (10, 90, 0.1, True),
+    # off the grid of the resolution
+    (0.3, 90, 1, False),
+    (-10, 30, 1, False),
+    # resolutions that do not divide 360
+    (0, 90, 0.7, False),
+    (0, 180, 7, False),
+    # axes that reach or pass 360 degrees
+    (300, 361, 1, False),
+    (350, 420, 0.5, False),
+])
+def test_grid_axis_matches_numpy(start, stop, resolution, sliced):
+    _angles, _sin, _cos = trig.grid_axis(start, stop, resolution)
+    np.testing.assert_array_equal(_angles,
+                                  np.arange(start, stop, resolution))
+    np.testing.assert_allclose(_sin, np.sin(np.radians(_angles)),
+                               rtol=0, atol=1e-12)
+    np.testing.assert_allclose(_cos, np.cos(np.radians(_angles)),
+                               rtol=0, atol=1e-12)
+    _table = trig.grid_table(resolution) \
+        if math.isclose(round(360 / resolution) * resolution, 360) \
+        else (np.empty(0),)
+    assert np.shares_memory(_sin, _table[0]) is sliced
+
+
+def test_grid_table_is_read_only_and_cached():
+    _sin, _cos = trig.grid_table(0.5)
+    assert trig.grid_table(0.5)[0] is _sin
+    assert not _sin.flags.writeable and not _cos.flags.writeable
+    assert _sin.size == 720
+    with pytest.raises(ValueError):
+        trig.grid_table(0.7)
+
+
+def test_sin_cos():
+    assert trig.sin_cos(30) == trig.sin_cos(30.0)
+    assert trig.sin_cos(30)[0] == pytest.approx(0.5)
+    assert trig.sin_cos(30.5) == (math.sin(math.radians(30.5)),
+                                  math.cos(math.radians(30.5)))
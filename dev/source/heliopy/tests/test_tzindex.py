@@ -0,0 +1,92 @@
+import json
+import numpy as np
+import pytest
+from classes import tzindex
+
+FEATURES = [
+    # square with a hole, spanning several grid cells
+    ('Europe/Vienna', {'type': 'Polygon', 'coordinates': [
+        [[10, 45], [20.5, 45], [20.5, 50.5], [10, 50.5], [10, 45]],
+        [[14, 47], [16, 47], [16, 48.5], [14, 48.5]]]}),
+    # the hole is a zone of its own
+    ('Europe/Bratislava', {'type': 'Polygon', 'coordinates': [
+        [[14, 47], [16, 47], [16, 48.5], [14, 48.5], [14, 47]]]}),
+    # concave triangle fan and a separate island
+    ('America/Chicago', {'type': 'MultiPolygon', 'coordinates': [
+        [[[-100, 30], [-90, 30], [-95.3, 34.7], [-90, 40], [-100, 40],
+          [-100, 30]]],
+        [[[-80.5, 25.2], [-79.1, 25.2], [-79.8, 26.9], [-80.5, 25.2]]]]}),
+]
+
+
+def _inside(point, rings):
+    _x, _y = point
+    _crossings = 0
+    for _ring in rings:
+        _points = list(_ring) + ([] if _ring[0] == _ring[-1] else _ring[:1])
+        for (_x1, _y1), (_x2, _y2) in zip(_points[:-1], _points[1:]):
+            if (_y1 > _y) != (_y2 > _y) and \
+                    _x < _x1 + (_y - _y1) * (_x2 - _x1) / (_y2 - _y1):
+                _crossings += 1
+    return _crossings % 2 == 1
+
+
+@pytest.fixture
+def _index(tmp_path):
+    _source = tmp_path / 'zones.json'
+    _source.write_text(json.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'tzid': _zone},
+         'geometry': _geometry} for _zone, _geometry in FEATURES]}))
+    return tzindex.TimezoneIndex(str(_source),
+                                 index_path=str(tmp_path / 'index'))
+
+
+def test_zone_ids_match_brute_force(_index):
+    _random = np.random.default_rng(7)
+    _latitude = np.concatenate([_random.uniform(43, 52, 1500),
+                                _random.uniform(24, 42, 1500)])
+    _longitude = np.concatenate([_random.uniform(8, 22, 1500),
+                                 _random.uniform(-102, -78, 1500)])
+    _ids = _index.zone_ids(_latitude, _longitude)
+    for _id, _lat, _lon in zip(_ids, _latitude, _longitude):
+        _expected = [_index.zones.index(_zone) for _zone, _geometry
+                     in FEATURES if _inside((_lon, _lat), list(
+                         tzindex._rings(_geometry)))]
+        assert [_id] == (_expected or [-1]), (_lat, _lon)
+
+
+def test_timezone_names(_index):
+    assert _index.timezone_at(48.2, 16.37) == 'Europe/Vienna'
+    assert _index.timezone_at(48.0, 15.0) == 'Europe/Bratislava'
+    assert _index.timezone_at(32, -96) == 'America/Chicago'
+    # in the concave notch
+    assert _index.timezone_at(32, -91) == 'Etc/GMT+6'
+    assert _index.timezone_at(0, 0) == 'Etc/GMT'
+    _names = _index.timezones_at([[48.2], [0.0]], [16.37, 100.0])
+    assert _names.shape == (2, 2)
+    assert _names[1, 1] == 'Etc/GMT-7'
+
+
+def test_nautical_timezone():
+    assert tzindex.nautical_timezone(16.37) == 'Etc/GMT-1'
+    assert tzindex.nautical_timezone(-122.4) == 'Etc/GMT+8'
+
+
+def test_sun_sites_use_the_zone_of_every_site(_index, monkeypatch):
+    from classes import solarsites
+    monkeypatch.setattr(tzindex, 'default_index', lambda: _index)
+    _latitude = np.array([48.2, 32.0, 48.0])
+    _longitude = np.array([16.37, -96.0, 15.0])
+    _sites = solarsites.SunSites(_latitude, _longitude,
+                                 time='2024-06-21T10:00:00', elevation=0)
+    assert list(_sites.timezones) == ['Europe/Vienna', 'America/Chicago',
+                                      'Europe/Bratislava']
+    np.testing.assert_array_equal(_sites.utc_time_delta, [2, -5, 2])
+    for _position, _zone in enumerate(_sites.timezones):
+        _site = solarsites.SunSites(_latitude[_position],
+                                    _longitude[_position],
+                                    time='2024-06-21T10:00:00',
+                                    timezone=_zone, elevation=0)
+        assert _sites.altitude[_position] == pytest.approx(_site.altitude)
+        assert _sites.solar_azimuth[_position] == pytest.approx(
+            _site.solar_azimuth)
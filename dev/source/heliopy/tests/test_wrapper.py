@@ -0,0 +1,13 @@
+import pytest
+from classes import geocache, wrapper
+
+
+@pytest.mark.parametrize('_value, _country', [
+    (None, None), ('', None), ('  ', None), ('Austria', 'Austria'),
+    (' AT ', 'AT')])
+def test_country_keeps_none(_value, _country):
+    _main = wrapper.SolarMain.__new__(wrapper.SolarMain)
+    _main.country = _value
+    assert _main.country == _country
+    assert geocache.normalize('Vienna', _main.country)[1] \
+        == ('' if _country is None else _country.strip().lower())